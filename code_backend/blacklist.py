@@ -0,0 +1,276 @@
+"""
+    Blacklisted albums, artists, playlists, tracks and users: kept in memory, stored in the `blacklisted` columns of the main database and in `Databases/blacklist.db`
+"""
+
+from code_backend.shared_config import *
+from code_backend.secondary_methods import absolute_path, check_spotify_id
+from code_backend.database_access import MyAppDatabase, APP_DATABASE
+from code_backend.exceptions import InputException
+
+
+# item types that can be blacklisted, blacklist.db has one table per type (ID, Name, JSON, Blacklisted)
+BLACKLIST_ITEM_TYPES: tuple[str, ...] = ("album", "artist", "playlist", "track", "user")
+
+
+class Blacklist:
+    """
+    Keeps the ids of all blacklisted items per item type in memory, so checking an item (e.g. the current track of the player) needs no Database query.
+
+    An item is blacklisted if its `blacklisted` column is 1 or if it is blacklisted in blacklist.db (attached as schema `blacklist`), which keeps the blacklist when the main database is reset. The sets are loaded on first use (so importing the module does not open the database) and updated incrementally: by add()/remove() and for items updated or removed through the database. The change listener only marks those items, they are loaded again with one query per item type by the next check, so bulk writes (e.g. upsert_items(), the write queue) cost no queries on the writing thread.
+    """
+
+    def __init__(self, database: MyAppDatabase, blacklist_file: str = BLACKLIST_DATABASE_PATH) -> None:
+        """
+        :param database: main database
+        :param blacklist_file: (relative) path to the blacklist database
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(database, MyAppDatabase):
+            raise InputException(item_value=database, valid_values="MyAppDatabase(...)", valid_types=MyAppDatabase)
+
+        self.database: MyAppDatabase = database
+        self.blacklist_file: str = absolute_path(blacklist_file, is_file=True)
+
+        self._lock = threading.Lock()
+        self._attach_lock = threading.Lock()
+        self._attached: bool = False
+        self._loaded: bool = False
+        self._ids: dict[str, set[str]] = {item_type: set() for item_type in BLACKLIST_ITEM_TYPES}
+
+        # changed in the database since they were loaded: every item of the type / single items
+        self._stale_types: set[str] = set()
+        self._stale_ids: dict[str, set[str]] = {item_type: set() for item_type in BLACKLIST_ITEM_TYPES}
+
+        self.database.add_change_listener(self._on_change)
+
+    def _attach(self) -> None:
+        """
+        Attach blacklist.db to the main database and create its tables (once)
+
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        with self._attach_lock:
+            if self._attached:
+                return
+
+            self.database.connections.attach("blacklist", self.blacklist_file)
+            self.database.execute_script("\n".join(
+                f"CREATE TABLE IF NOT EXISTS blacklist.{item_type} (ID TEXT PRIMARY KEY, Name TEXT, JSON TEXT, Blacklisted INTEGER);"
+                for item_type in BLACKLIST_ITEM_TYPES
+            ))
+            self._attached = True
+
+    def _ensure_loaded(self) -> None:
+        """
+        Load the sets on first use, items changed since are loaded again
+
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if not self._loaded:
+            self.reload()
+        elif self._stale_types or any(self._stale_ids.values()):
+            self._refresh()
+
+    @staticmethod
+    def _check_item(item_type: str, item_id: str) -> None:
+        """
+        :param item_type: type of the item
+        :param item_id: id of the item
+        :raises InputException: if input is invalid
+        """
+
+        if item_type not in BLACKLIST_ITEM_TYPES:
+            raise InputException(item_value=item_type, valid_values=BLACKLIST_ITEM_TYPES, valid_types=str)
+
+        if not check_spotify_id(item_id, is_user=item_type == "user"):
+            raise InputException(item_value=item_id, valid_values=f"{item_type} id", valid_types=str)
+
+    def _load_ids(self, item_type: str, item_ids: list[str] | None = None) -> set[str]:
+        """
+        Query the blacklisted ids of an item type (main database and blacklist.db)
+
+        :param item_type: type of the items
+        :param item_ids: only check these items (None: every item)
+        :return: Set containing the blacklisted ids
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        queries = [(f"SELECT ID FROM blacklist.{item_type} WHERE Blacklisted = 1", "ID")]
+        if f"{item_type}s" in self.database.table_struct:
+            # only reads the partial index idx_<table>_blacklisted
+            queries.append((f"SELECT {item_type}_id FROM {item_type}s WHERE blacklisted = 1", f"{item_type}_id"))
+
+        if item_ids is None:
+            sql_query = " UNION ".join(sql_query for sql_query, _ in queries)
+            parameters = ()
+        else:
+            sql_query = " UNION ".join(f"{sql_query} AND {id_column} IN ({', '.join('?' * len(item_ids))})" for sql_query, id_column in queries)
+            parameters = tuple(item_ids) * len(queries)
+
+        return {row[0] for row in self.database.execute_query(f"{sql_query};", parameters, fetch=True)}
+
+    def reload(self) -> None:
+        """
+        Load the blacklisted ids of every item type again
+
+        :return:
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        self._attach()
+        with self._lock:
+            self._stale_types.clear()
+            for item_ids in self._stale_ids.values():
+                item_ids.clear()
+
+        loaded = {item_type: self._load_ids(item_type) for item_type in BLACKLIST_ITEM_TYPES}
+        with self._lock:
+            self._ids = loaded
+            self._loaded = True
+
+    def _refresh(self) -> None:
+        """
+        Load the items marked by the change listener again (one query per item type and DATABASE_BATCH_SIZE ids)
+
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        # items changed while loading stay marked for the next check
+        with self._lock:
+            stale_types, self._stale_types = self._stale_types, set()
+            stale_ids, self._stale_ids = self._stale_ids, {item_type: set() for item_type in BLACKLIST_ITEM_TYPES}
+
+        for item_type in BLACKLIST_ITEM_TYPES:
+            if item_type in stale_types:
+                loaded = self._load_ids(item_type)
+                with self._lock:
+                    self._ids[item_type] = loaded
+
+            elif stale_ids[item_type]:
+                item_ids = list(stale_ids[item_type])
+                blacklisted = set()
+                for batch_start in range(0, len(item_ids), DATABASE_BATCH_SIZE):
+                    blacklisted |= self._load_ids(item_type, item_ids[batch_start:batch_start + DATABASE_BATCH_SIZE])
+
+                with self._lock:
+                    self._ids[item_type] = (self._ids[item_type] - stale_ids[item_type]) | blacklisted
+
+    def _on_change(self, table_name: str | None, item_id: str | None) -> None:
+        """
+        Change listener of the main database: changed items are marked, their blacklisted state is loaded by the next check (no query on the writing thread)
+
+        :param table_name: name of the changed table (None: every table)
+        :param item_id: id of the changed item (None: every item of the table)
+        """
+
+        # sets not loaded yet are loaded with the current state
+        if not self._loaded:
+            return
+
+        item_type = table_name[:-1] if table_name is not None else None
+        if table_name is not None and item_type not in BLACKLIST_ITEM_TYPES:
+            return
+
+        with self._lock:
+            if table_name is None:
+                self._stale_types.update(BLACKLIST_ITEM_TYPES)
+            elif item_id is None:
+                self._stale_types.add(item_type)
+            else:
+                self._stale_ids[item_type].add(item_id)
+
+    def is_blacklisted(self, item_type: str, item_id: str) -> bool:
+        """
+        Check an item without Database query (only items changed in the database since the last check are loaded first)
+
+        :param item_type: 'album', 'artist', 'playlist', 'track' or 'user'
+        :param item_id: id of the item
+        :return: True if the item is blacklisted
+        :raises InputException: if input is invalid
+        """
+
+        if item_type not in BLACKLIST_ITEM_TYPES:
+            raise InputException(item_value=item_type, valid_values=BLACKLIST_ITEM_TYPES, valid_types=str)
+
+        self._ensure_loaded()
+        return item_id in self._ids[item_type]
+
+    def ids(self, item_type: str) -> frozenset[str]:
+        """
+        :param item_type: 'album', 'artist', 'playlist', 'track' or 'user'
+        :return: Set containing the ids of the blacklisted items of the type
+        :raises InputException: if input is invalid
+        """
+
+        if item_type not in BLACKLIST_ITEM_TYPES:
+            raise InputException(item_value=item_type, valid_values=BLACKLIST_ITEM_TYPES, valid_types=str)
+
+        self._ensure_loaded()
+        with self._lock:
+            return frozenset(self._ids[item_type])
+
+    def add(self, item_type: str, item_id: str, item_name: str = "") -> None:
+        """
+        Blacklist an item (in blacklist.db and, if it is stored, in the main database)
+
+        :param item_type: 'album', 'artist', 'playlist', 'track' or 'user'
+        :param item_id: id of the item
+        :param item_name: name of the item, stored in blacklist.db
+        :return:
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        self._check_item(item_type, item_id)
+        self._ensure_loaded()
+
+        self.database.execute_query(f"INSERT OR REPLACE INTO blacklist.{item_type} (ID, Name, Blacklisted) VALUES (?, ?, 1);", (item_id, item_name))
+        self.database.update_item(table_name=f"{item_type}s", item_id=item_id, table_column="blacklisted", new_value=1)
+
+        # the state written above, not loaded again
+        with self._lock:
+            self._ids[item_type].add(item_id)
+            self._stale_ids[item_type].discard(item_id)
+
+    def remove(self, item_type: str, item_id: str) -> None:
+        """
+        Remove an item from the blacklist (in blacklist.db and the main database)
+
+        :param item_type: 'album', 'artist', 'playlist', 'track' or 'user'
+        :param item_id: id of the item
+        :return:
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        self._check_item(item_type, item_id)
+        self._ensure_loaded()
+
+        self.database.execute_query(f"DELETE FROM blacklist.{item_type} WHERE ID = ?;", (item_id,))
+        self.database.update_item(table_name=f"{item_type}s", item_id=item_id, table_column="blacklisted", new_value=0)
+
+        # the state written above, not loaded again
+        with self._lock:
+            self._ids[item_type].discard(item_id)
+            self._stale_ids[item_type].discard(item_id)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        :return: Dict containing the number of blacklisted items, in the form of {item_type: count}
+        """
+
+        self._ensure_loaded()
+        with self._lock:
+            return {item_type: len(item_ids) for item_type, item_ids in self._ids.items()}
+
+
+BLACKLIST = Blacklist(APP_DATABASE)
+
+
+if __name__ == '__main__':
+    """"""
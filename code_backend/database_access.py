@@ -2,10 +2,168 @@ import os
 
 from code_backend.shared_config import *
 from code_backend.secondary_methods import (
-    dict_factory, get_str_from_json_file,
+    dict_factory, get_str_from_json_file, dump_dict_to_database, load_dict_from_database,
     load_sql_query, absolute_path, check_spotify_id
 )
-from code_backend.exceptions import DatabaseException, InputException, SpotifyIdException
+from code_backend.exceptions import CustomException, DatabaseException, InputException, SpotifyIdException
+from code_backend.database_connections import ConnectionManager
+from code_backend.database_migrations import Backfill, Migration, MigrationRunner
+
+
+# scripts changing the tables invalidate the cached schema catalog of DatabaseAccess
+_SCHEMA_CHANGE = re.compile(r"\b(CREATE|DROP|ALTER)\s+(TABLE|VIEW)\b", re.IGNORECASE)
+
+
+# relation tables (migrations/001_relation_tables.sql) of the id list columns: {relation: (source_table, list_column, source_key, target_key)}
+RELATIONS: dict[str, tuple[str, str, str, str]] = {
+    "album_artists": ("albums", "artist_ids", "album_id", "artist_id"),
+    "album_tracks": ("albums", "track_ids", "album_id", "track_id"),
+    "artist_albums": ("artists", "album_ids", "artist_id", "album_id"),
+    "artist_playlists": ("artists", "playlist_ids", "artist_id", "playlist_id"),
+    "artist_top_tracks": ("artists", "top_track_ids", "artist_id", "track_id"),
+    "playlist_tracks": ("playlists", "track_ids", "playlist_id", "track_id"),
+    "track_artists": ("tracks", "artist_ids", "track_id", "artist_id"),
+    "track_playlists": ("tracks", "playlist_ids", "track_id", "playlist_id"),
+    "user_playlists": ("users", "playlist_ids", "user_id", "playlist_id"),
+    "user_top_artists": ("users", "top_artist_ids", "user_id", "artist_id"),
+    "user_top_tracks": ("users", "top_track_ids", "user_id", "track_id")
+}
+# columns referencing a single item: {item_type: [(table, column)]}
+REFERENCE_COLUMNS: dict[str, list[tuple[str, str]]] = {
+    "album": [("tracks", "album_id")],
+    "user": [("playlists", "owner_id")]
+}
+
+
+# full-text search tables (migrations/003_search_index.sql): {item_type: search_table}
+SEARCH_TABLES: dict[str, str] = {
+    "album": "album_search",
+    "artist": "artist_search",
+    "playlist": "playlist_search",
+    "track": "track_search"
+}
+DUMMY_ID = "0000000000000000000000"
+
+# column holding the hash of an item's content, compared by upsert_items() to skip unchanged rows
+HASH_COLUMN = "content_hash"
+
+
+# indexed columns holding fields of the *_json payloads, written with the payload (see _row_values()), so they can be queried with both storage formats: {table_name: {column: (column_type, json_path)}}
+JSON_FIELDS: dict[str, dict[str, tuple[str, str]]] = {
+    "albums": {"release_date": ("TEXT", "$.release_date"), "spotify_popularity": ("INTEGER", "$.popularity")},
+    "artists": {"spotify_popularity": ("INTEGER", "$.popularity")},
+    "tracks": {"release_date": ("TEXT", "$.album.release_date"), "explicit": ("INTEGER", "$.explicit"), "spotify_popularity": ("INTEGER", "$.popularity")}
+}
+
+
+def _parse_id_list(value: Any) -> list[str]:
+    """
+    Get the ids of an id list column value (list or stored list string like "['id', ...]")
+
+    :param value: value of the column
+    :return: List containing the ids
+    """
+
+    if isinstance(value, (list, tuple)):
+        return [str(item_id) for item_id in value]
+
+    if isinstance(value, str) and value.startswith("["):
+        return [str(item_id) for item_id in ast.literal_eval(value)]
+
+    return []
+
+
+def _json_field_values(fields: dict[str, tuple[str, str]], payload: Any) -> dict[str, Any]:
+    """
+    Get the fields of a *_json payload (see JSON_FIELDS), fields of another type than declared (e.g. placeholders of the dummy payloads) are None
+
+    :param fields: Dict containing the fields, in the form of {column: (column_type, json_path)}
+    :param payload: Dict or stored value of the *_json column (JSON text, compressed JSON or string representation of a dict)
+    :return: Dict containing the values, in the form of {column: value}
+    """
+
+    if fields and not isinstance(payload, dict):
+        try:
+            payload = load_dict_from_database(payload) if isinstance(payload, (str, bytes)) else None
+        except CustomException:
+            payload = None
+
+    values = {}
+    for column, (column_type, json_path) in fields.items():
+        value = payload
+        for key in json_path.split(".")[1:]:
+            value = value.get(key) if isinstance(value, dict) else None
+
+        if column_type == "INTEGER" and isinstance(value, int):
+            values[column] = int(value)
+        elif column_type == "TEXT" and isinstance(value, str):
+            values[column] = value
+        else:
+            values[column] = None
+
+    return values
+
+
+class QueryRegistry:
+    """
+    Loads every .sql file of a directory once and hands out the queries by name (file name without .sql, e.g. 'insert_tracks')
+    """
+
+    def __init__(self, query_directory: str = SQL_QUERIES_PATH) -> None:
+        """
+        :param query_directory: (relative) path to the directory containing the .sql files
+        :raises InputException: if input is invalid
+        :raises CustomException: If Exception occurs
+        """
+
+        query_directory = absolute_path(query_directory)
+        if not os.path.isdir(query_directory):
+            raise InputException(item_value=query_directory, valid_values="path to existing directory", valid_types=str)
+
+        self.query_directory: str = query_directory
+        self._queries: dict[str, str] = {}
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        (Re)load every .sql file of the query directory
+
+        :return:
+        :raises CustomException: If Exception occurs
+        """
+
+        self._queries = {
+            file_name.removesuffix(".sql"): load_sql_query(os.path.join(self.query_directory, file_name))
+            for file_name in sorted(os.listdir(self.query_directory)) if file_name.endswith(".sql")
+        }
+
+    @property
+    def names(self) -> list[str]:
+        """
+        :return: List containing the names of all loaded queries
+        """
+
+        return list(self._queries.keys())
+
+    def get(self, query_name: str) -> str:
+        """
+        Get a loaded query by name
+
+        :param query_name: file name of the query without .sql (e.g. 'insert_tracks')
+        :return: sql query
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(query_name, str) or query_name not in self._queries:
+            raise InputException(item_value=query_name, valid_values=tuple(self._queries.keys()), valid_types=str)
+
+        return self._queries[query_name]
+
+    def __getitem__(self, query_name: str) -> str:
+        return self.get(query_name)
+
+    def __contains__(self, query_name: str) -> bool:
+        return query_name in self._queries
 
 
 class DatabaseAccess:
@@ -13,6 +171,12 @@ class DatabaseAccess:
     class acting as Data Access Object for Database. Handling all access to the Database
     """
 
+    # columns owned by the application instead of the stored source (e.g. ratings or flags set by the user): kept by upsert_items() and not part of the content hash
+    local_columns: tuple[str, ...] = ()
+
+    # columns written from the fields of the *_json payloads, in the form of {table_name: {column: (column_type, json_path)}} (see JSON_FIELDS)
+    json_fields: dict[str, dict[str, tuple[str, str]]] = {}
+
     def __init__(self, database_file: str) -> None:
         """
         initialize the database using a path
@@ -26,38 +190,211 @@ class DatabaseAccess:
             raise DatabaseException("Database file not found")
 
         try:
-            self.database = sqlite3.connect(database_file)
-            self.cursor = self.database.cursor()
+            # WAL, tuned pragmas, one read connection per thread and a serialized writer (self.database), opened on first use
+            # identical query strings (inserts, fetches, updates) reuse their compiled statement
+            self.connections = ConnectionManager(database_file, cached_statements=SQLITE_CACHED_STATEMENTS, on_open=self._on_open)
+            self._cursor: sqlite3.Cursor | None = None
             self.sql_query_queue = []
 
+            # format dicts (*_json columns) are stored in (see dump_dict_to_database())
+            self.json_storage: Literal["json", "zlib"] = JSON_STORAGE
+
+            # schema catalog, loaded on first use and invalidated by DDL (see invalidate_schema())
+            self._table_struct: dict[str, dict[str, list]] | None = None
+            self._insert_templates: dict[str, str] = {}
+            self._upsert_templates: dict[str, str] = {}
+
+            # called as listener(table_name, item_id) after items were updated or removed (see add_change_listener())
+            self.change_listeners: list[Callable[[str | None, str | None], None]] = []
+
         except sqlite3.Error as error:
             raise DatabaseException(error_message=error, more_infos=f"Exception occurred while connecting to database: '{database_file}'")
 
+    @property
+    def database(self) -> sqlite3.Connection:
+        """
+        :return: writer connection (see ConnectionManager.writer)
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        return self.connections.writer
+
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """
+        :return: cursor of the writer connection
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if self._cursor is None:
+            self._cursor = self.database.cursor()
+        return self._cursor
+
+    def _on_open(self) -> None:
+        """
+        Called once the connections of the database are opened (first query), overwritten by subclasses
+        """
+
+    def close(self) -> None:
+        """
+        Close every connection of the database (writer and the read connections of all threads), the next query opens them again
+
+        :return:
+        """
+
+        self.connections.close()
+        self._cursor = None
+
+    def add_change_listener(self, listener: Callable[[str | None, str | None], None]) -> None:
+        """
+        Register a function called after items were updated or removed, e.g. to invalidate caches of the items.
+        It is called as listener(table_name, item_id); item_id is None if the whole table changed, table_name is None if the whole database changed
+
+        :param listener: function to call
+        :return:
+        :raises InputException: if input is invalid
+        """
+
+        if not callable(listener):
+            raise InputException(item_value=listener, valid_values="any function", valid_types=Callable)
+
+        self.change_listeners.append(listener)
+
+    def _notify_change(self, table_name: str | None, item_id: str | None = None) -> None:
+        """
+        Call every change listener
+
+        :param table_name: name of the changed table (None: every table)
+        :param item_id: id of the changed item (None: every item of the table)
+        """
+
+        for listener in self.change_listeners:
+            listener(table_name, item_id)
+
     @property
     def table_struct(self) -> dict[str, dict[str, list]]:
         """
         Get the structure of all tables in the database. This only includes the table names, primary keys and column names per table
 
-        :return: Dict containing the database structure, in the form of {table_name: {'ids': [...], 'columns': [...]}}
+        The structure is introspected once per connection and cached until the schema changes (invalidate_schema())
+
+        :return: Dict containing the database structure, in the form of {table_name: {'ids': [...], 'columns': [...], 'generated': [...]}}
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if self._table_struct is None:
+            self._table_struct = self._load_table_struct()
+
+        return self._table_struct
+
+    def _load_table_struct(self) -> dict[str, dict[str, list]]:
+        """
+        Introspect the structure of all tables (sqlite_master and PRAGMA table_xinfo)
+
+        :return: Dict containing the database structure, in the form of {table_name: {'ids': [...], 'columns': [...], 'generated': [...]}}
         :raises DatabaseException: If Exception related to the Database occurs
         """
 
         table_struct = {}
 
-        database_tables = self.execute_script("""SELECT name FROM sqlite_master WHERE type='table';""", fetch=True)
+        # regular tables only, virtual tables (full-text search index) and their shadow tables are left out
+        database_tables = self.execute_script(
+            """SELECT name FROM sqlite_master WHERE type='table' AND name IN (SELECT name FROM pragma_table_list WHERE schema='main' AND type='table');""",
+            fetch=True
+        )
         for current_table in database_tables:
             prim_keys = []
             columns = []
+            generated = []
 
-            table_info = self.execute_script(f"""PRAGMA table_info('{current_table[0]}')""", fetch=True)
-            for _, col_name, _, _, _, col_is_pk in table_info:
+            # generated columns (hidden 2: virtual, 3: stored) can be read, but not written
+            table_info = self.execute_script(f"""PRAGMA table_xinfo('{current_table[0]}')""", fetch=True)
+            for _, col_name, _, _, _, col_is_pk, col_hidden in table_info:
                 if col_is_pk > 0: prim_keys.append(col_name)
-                columns.append(col_name)
+                if col_hidden in (2, 3):
+                    generated.append(col_name)
+                else:
+                    columns.append(col_name)
 
-            table_struct[current_table[0]] = {"ids": prim_keys, "columns": columns}
+            table_struct[current_table[0]] = {"ids": prim_keys, "columns": columns, "generated": generated}
 
         return table_struct
 
+    def invalidate_schema(self) -> None:
+        """
+        Drop the cached schema catalog (table_struct, insert templates), it is introspected again on next use. Needs to be called after the tables were created, altered or dropped
+
+        :return:
+        """
+
+        self._table_struct = None
+        self._insert_templates.clear()
+        self._upsert_templates.clear()
+
+    def table_columns(self, table_name: str, generated: bool = False) -> list[str]:
+        """
+        Get the column names of a table (from the cached schema catalog)
+
+        :param table_name: name of the table
+        :param generated: True: the generated columns (read only) are appended
+        :return: List containing the column names in table order
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
+            raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
+
+        if generated:
+            return self.table_struct[table_name]["columns"] + self.table_struct[table_name]["generated"]
+
+        return self.table_struct[table_name]["columns"]
+
+    def insert_template(self, table_name: str) -> str:
+        """
+        Get the `INSERT OR IGNORE` query of a table, with a named placeholder (:column) for every column. Built once per table from the schema catalog
+
+        :param table_name: name of the table
+        :return: sql query template
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if table_name not in self._insert_templates:
+            columns = self.table_columns(table_name)
+            self._insert_templates[table_name] = (
+                f"INSERT OR IGNORE INTO {table_name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(f':{column}' for column in columns)});"
+            )
+
+        return self._insert_templates[table_name]
+
+    def upsert_template(self, table_name: str) -> str:
+        """
+        Get the `INSERT ... ON CONFLICT DO UPDATE` query of a table: existing rows are only overwritten if their content hash differs, local_columns keep their stored value. Built once per table from the schema catalog
+
+        :param table_name: name of the table (needs a HASH_COLUMN)
+        :return: sql query template
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if table_name not in self._upsert_templates:
+            columns = self.table_columns(table_name)
+            if HASH_COLUMN not in columns:
+                raise InputException(item_value=table_name, valid_values=f"table with column '{HASH_COLUMN}'", valid_types=str)
+
+            primary_key = self.table_struct[table_name]["ids"][0]
+            updated_columns = [column for column in columns if column != primary_key and column not in self.local_columns]
+            self._upsert_templates[table_name] = (
+                f"INSERT INTO {table_name} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(f':{column}' for column in columns)}) "
+                f"ON CONFLICT ({primary_key}) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in updated_columns)} "
+                f"WHERE {table_name}.{HASH_COLUMN} IS NOT excluded.{HASH_COLUMN};"
+            )
+
+        return self._upsert_templates[table_name]
+
     def execute_query(self, sql_query: str, parameters=(), fetch: bool = False) -> None | list:
         """
         Execute a SQL query **with** parameters
@@ -76,24 +413,23 @@ class DatabaseAccess:
         if not isinstance(fetch, bool):
             raise InputException(item_value=fetch, valid_values=(True, False), valid_types=bool)
 
-        with self.database:
-            try:
+        try:
+            if fetch:
+                # reads use the connection of the calling thread and never wait for the writer
+                return self.connections.reader.execute(sql_query, parameters).fetchall()
+
+            with self.connections.write():
                 self.cursor.execute(sql_query, parameters)
-                if fetch:
-                    return self.cursor.fetchall()
-
-            except Exception as error:
-                # Replaces image byte strings with '...' (shortens output immensely)
-                if isinstance(parameters, dict):
-                    pop_type = list(parameters.keys())[0][:-3]
-                    parameters[f"{pop_type}_image"] = parameters[f"{pop_type}_image"][:4] + "..."
-                raise DatabaseException(error_message=error, more_infos=(
-                    f"Exception occurred while trying to execute query: '{sql_query}'"
-                    f"{f"\nwith parameters: {json.dumps(parameters, indent=4) if isinstance(parameters, dict) else parameters}" if parameters else ""}"
-                ))
 
-            finally:
-                self.database.commit()
+        except Exception as error:
+            # Replaces image byte strings with '...' (shortens output immensely)
+            if isinstance(parameters, dict):
+                pop_type = list(parameters.keys())[0][:-3]
+                parameters[f"{pop_type}_image"] = parameters[f"{pop_type}_image"][:4] + "..."
+            raise DatabaseException(error_message=error, more_infos=(
+                f"Exception occurred while trying to execute query: '{sql_query}'"
+                f"{f"\nwith parameters: {json.dumps(parameters, indent=4) if isinstance(parameters, dict) else parameters}" if parameters else ""}"
+            ))
 
     def execute_script(self, sql_script: str, fetch: bool = False):
         """
@@ -112,19 +448,18 @@ class DatabaseAccess:
         if not isinstance(fetch, bool):
             raise InputException(item_value=fetch, valid_values=(True, False), valid_types=bool)
 
-        with self.database:
-            try:
-                if fetch:
-                    self.cursor.execute(sql_script, ())
-                    return self.cursor.fetchall()
-                else:
-                    self.cursor.executescript(sql_script)
+        try:
+            if fetch:
+                return self.connections.reader.execute(sql_script, ()).fetchall()
 
-            except Exception as error:
-                raise DatabaseException(error_message=error, more_infos=f"Exception occurred while trying to execute script: '{sql_script}'")
+            with self.connections.write():
+                self.cursor.executescript(sql_script)
 
-            finally:
-                self.database.commit()
+        except Exception as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while trying to execute script: '{sql_script}'")
+
+        if _SCHEMA_CHANGE.search(sql_script):
+            self.invalidate_schema()
 
     def execute_queue_queries(self) -> None:
         """
@@ -134,8 +469,51 @@ class DatabaseAccess:
         :raises DatabaseException: If Exception related to the Database occurs
         :raises InputException: if input is invalid
         """
-        for sql_query, sql_values in self.sql_query_queue:
-            self.execute_query(sql_query, sql_values)
+
+        if not self.sql_query_queue:
+            return
+
+        # consecutive queries with the same statement are executed together, all in one transaction
+        statements = [
+            (sql_query, [sql_values for _, sql_values in group])
+            for sql_query, group in itertools.groupby(self.sql_query_queue, key=lambda queued: queued[0])
+        ]
+        self.execute_many(statements)
+        self.sql_query_queue.clear()
+
+    def execute_many(self, statements: list[tuple[str, list]], batch_size: int = DATABASE_BATCH_SIZE) -> int:
+        """
+        Execute SQL queries with many parameter sets using `executemany`, everything inside one transaction (one commit). If any query fails, nothing is written
+
+        :param statements: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        :param batch_size: maximum number of parameter sets passed to one `executemany` call
+        :return: number of executed parameter sets
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(statements, list) or not all(isinstance(statement, tuple) and len(statement) == 2 for statement in statements):
+            raise InputException(item_value=statements, valid_values="[(sql_query, [parameters, ...]), ...]", valid_types=list)
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise InputException(item_value=batch_size, valid_values="positive integer", valid_types=int)
+
+        executed = 0
+        try:
+            # commits once at the end or rolls back on an exception
+            with self.connections.write():
+                for sql_query, parameter_list in statements:
+                    for batch_start in range(0, len(parameter_list), batch_size):
+                        self.cursor.executemany(sql_query, parameter_list[batch_start:batch_start + batch_size])
+                    executed += len(parameter_list)
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=(
+                f"Exception occurred while trying to execute {sum(len(parameter_list) for _, parameter_list in statements)} queries, nothing was written. "
+                f"Statements: {[sql_query for sql_query, _ in statements]}"
+            ))
+
+        return executed
 
     def split_queries(self, sql_query: str, parameter: dict):
         """
@@ -172,23 +550,187 @@ class DatabaseAccess:
         :raises InputException: if input is invalid
         """
 
-        if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
-            raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
+        self.execute_query(query_template, self._row_values(table_name, kwargs))
 
-        missing_keys = set(self.table_struct[table_name]["columns"]) - set(kwargs.keys())
+    def _row_values(self, table_name: str, row: dict) -> dict:
+        """
+        Convert a row to the parameters of an insert query: every column of the table gets the value of row or None (default), lists/tuples are stored as string, dicts as JSON (see self.json_storage). The columns of json_fields are taken from the payload
+
+        :param table_name: name of the table
+        :param row: Dict containing the values, in the form of {column: value}
+        :return: Dict containing the parameters, in the form of {column: value}
+        :raises InputException: if input is invalid
+        """
+
+        columns = self.table_columns(table_name)
+        fields = {column: field for column, field in self.json_fields.get(table_name, {}).items() if column in columns}
+
+        missing_keys = set(columns) - set(row.keys()) - {HASH_COLUMN} - set(fields)
         if missing_keys:
             print(InputException(
                 item_value=missing_keys,
-                valid_values=", ".join({f"{i}: Any" for i in self.table_struct[table_name]["columns"]}),
+                valid_values=", ".join({f"{i}: Any" for i in columns}),
                 valid_types=Any)
             )
 
-        # set columns to either kwargs value or None (default)
-        sql_values = {
-            key: str(kwargs.get(key)) if isinstance(kwargs.get(key, None), (list, tuple, dict)) else kwargs.get(key)
-            for key in self.table_struct[table_name]["columns"]
+        # set columns to either row value or None (default)
+        values = {}
+        for key in columns:
+            value = row.get(key)
+            if isinstance(value, dict):
+                value = dump_dict_to_database(value, storage=self.json_storage)
+            elif isinstance(value, (list, tuple)):
+                value = str(value)
+            values[key] = value
+
+        json_column = f"{table_name[:-1]}_json"
+        if fields and row.get(json_column) is not None:
+            values |= _json_field_values(fields, row[json_column])
+
+        if HASH_COLUMN in values:
+            values[HASH_COLUMN] = self.content_hash(table_name, values)
+
+        return values
+
+    def content_hash(self, table_name: str, values: dict) -> str:
+        """
+        Hash of the content of a row, HASH_COLUMN and local_columns are left out
+
+        :param table_name: name of the table
+        :param values: Dict containing the stored values, in the form of {column: value} (see _row_values())
+        :return: hex digest of the sha256 hash
+        :raises InputException: if input is invalid
+        """
+
+        content = tuple(values.get(column) for column in self.table_columns(table_name) if column != HASH_COLUMN and column not in self.local_columns)
+        return sha256(repr(content).encode()).hexdigest()
+
+    def add_items_to_table(self, table_name: str, rows: list[dict], query_template: str | None = None, batch_size: int = DATABASE_BATCH_SIZE) -> dict[str, int | float]:
+        """
+        Adds many items to a table with one transaction (see add_item_to_table() for the handling of single rows)
+
+        :param table_name: Which table to add
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :param query_template: sql query template in the correct format (default: insert_template() of the table)
+        :param batch_size: maximum number of rows passed to one `executemany` call
+        :return: Dict containing the ingestion statistics, in the form of {'rows': ..., 'seconds': ..., 'rows_per_second': ...}
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise InputException(item_value=rows, valid_values="[{column: value}, ...]", valid_types=list)
+
+        if query_template is None:
+            query_template = self.insert_template(table_name)
+
+        start = time.perf_counter()
+        statements = [(query_template, [self._row_values(table_name, row) for row in rows])]
+        statements += self._related_statements(table_name, rows)
+        self.execute_many(statements, batch_size=batch_size)
+        row_count = len(rows)
+        seconds = time.perf_counter() - start
+
+        return {"rows": row_count, "seconds": seconds, "rows_per_second": row_count / seconds if seconds > 0 else float("inf")}
+
+    def upsert_items(self, table_name: str, rows: list[dict], batch_size: int = DATABASE_BATCH_SIZE) -> dict[str, int | float | list]:
+        """
+        Insert new items and update changed ones (`INSERT ... ON CONFLICT DO UPDATE`, see upsert_template()). The content hash of every row is compared with the stored one, so unchanged rows are not written at all. Every batch is written in its own transaction
+
+        :param table_name: name of the table (needs a HASH_COLUMN)
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :param batch_size: number of rows compared and written per transaction
+        :return: Dict containing the statistics, in the form of {'inserted': ..., 'updated': ..., 'unchanged': ..., 'seconds': ..., 'batches': [{'inserted': ..., 'updated': ..., 'unchanged': ...}, ...]}
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise InputException(item_value=rows, valid_values="[{column: value}, ...]", valid_types=list)
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise InputException(item_value=batch_size, valid_values="positive integer", valid_types=int)
+
+        query_template = self.upsert_template(table_name)
+        primary_key = self.table_struct[table_name]["ids"][0]
+
+        start = time.perf_counter()
+        batches = []
+        written_ids = []
+        for batch_start in range(0, len(rows), batch_size):
+            batch = rows[batch_start:batch_start + batch_size]
+            batch_values = [self._row_values(table_name, row) for row in batch]
+
+            # no other write can change the stored hashes between comparing and writing
+            with self.connections.write_lock:
+                item_ids = list(dict.fromkeys(values[primary_key] for values in batch_values))
+                stored_hashes = dict(self.execute_query(
+                    f"SELECT {primary_key}, {HASH_COLUMN} FROM {table_name} WHERE {primary_key} IN ({', '.join('?' * len(item_ids))});", tuple(item_ids), fetch=True
+                ))
+
+                inserted, updated, unchanged = [], [], 0
+                for row, values in zip(batch, batch_values):
+                    if values[primary_key] not in stored_hashes:
+                        inserted.append((row, values))
+                    elif stored_hashes[values[primary_key]] != values[HASH_COLUMN]:
+                        updated.append((row, values))
+                    else:
+                        unchanged += 1
+                    stored_hashes[values[primary_key]] = values[HASH_COLUMN]
+
+                statements = [(query_template, [values for _, values in inserted + updated])] if inserted or updated else []
+                statements += self._related_statements(table_name, [row for row, _ in inserted])
+                statements += self._replaced_related_statements(table_name, [row for row, _ in updated])
+                if statements:
+                    self.execute_many(statements, batch_size=batch_size)
+
+            written_ids += [values[primary_key] for _, values in inserted + updated]
+            batches.append({"inserted": len(inserted), "updated": len(updated), "unchanged": unchanged})
+
+        # inserted items are announced too, e.g. rows inserted as blacklisted
+        for item_id in dict.fromkeys(written_ids):
+            self._notify_change(table_name, item_id)
+
+        return {
+            "inserted": sum(batch["inserted"] for batch in batches),
+            "updated": sum(batch["updated"] for batch in batches),
+            "unchanged": sum(batch["unchanged"] for batch in batches),
+            "seconds": time.perf_counter() - start,
+            "batches": batches
         }
-        self.execute_query(query_template, sql_values)
+
+    def _related_statements(self, table_name: str, rows: list[dict]) -> list[tuple[str, list]]:
+        """
+        Additional queries written in the same transaction as the rows (e.g. relation tables), overwritten by subclasses
+
+        :param table_name: name of the table the rows are added to
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        return []
+
+    def _replaced_related_statements(self, table_name: str, rows: list[dict]) -> list[tuple[str, list]]:
+        """
+        Additional queries written in the same transaction as rows updated by upsert_items(), overwritten by subclasses
+
+        :param table_name: name of the table the rows are updated in
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        return []
+
+    def _removed_related_statements(self, table_name: str, item_id: str | None = None) -> list[tuple[str, list]]:
+        """
+        Additional queries written in the same transaction as removed items (e.g. relation tables), overwritten by subclasses
+
+        :param table_name: name of the table the items are removed from
+        :param item_id: id of the removed item (None: every item of the table)
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        return []
 
     def remove_specific_item(self, table_name: str, item_id: str):
         """
@@ -205,9 +747,11 @@ class DatabaseAccess:
             raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
 
         primary_key = self.table_struct[table_name]["ids"][0]
-        sql_delete_command = f"DELETE FROM {table_name} WHERE {primary_key} = ?"
+        sql_delete_command = f"DELETE FROM {table_name} WHERE {primary_key} = ?;"
 
-        self.execute_query(sql_delete_command, (item_id,))
+        # listeners are notified once the item and its related rows are removed
+        self.execute_many([(sql_delete_command, [(item_id,)])] + self._removed_related_statements(table_name, item_id))
+        self._notify_change(table_name, item_id)
 
     def reset_table(self, table_name: str):
         """
@@ -223,7 +767,8 @@ class DatabaseAccess:
         if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
             raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
 
-        self.execute_script(f"""DELETE * FROM {table_name}""", False)
+        self.execute_many([(f"DELETE FROM {table_name};", [()])] + self._removed_related_statements(table_name))
+        self._notify_change(table_name)
 
     def reset_database(self):
         """
@@ -272,8 +817,8 @@ class DatabaseAccess:
         if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
             raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
 
-        if not isinstance(table_column, str) or table_column not in self.table_struct[table_name]["columns"]:
-            raise InputException(item_value=table_column, valid_values=tuple(self.table_struct[table_name]["columns"]), valid_types=str)
+        if not isinstance(table_column, str) or table_column not in self.table_columns(table_name, generated=True):
+            raise InputException(item_value=table_column, valid_values=tuple(self.table_columns(table_name, generated=True)), valid_types=str)
 
         result = self.execute_query(f"""SELECT {table_column} FROM {table_name};""", (), fetch=True)
 
@@ -305,16 +850,15 @@ class DatabaseAccess:
         if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
             raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
 
-        if not isinstance(target_column, str) or target_column not in self.table_struct[table_name]["columns"]:
-            raise InputException(item_value=target_column, valid_values=tuple(self.table_struct[table_name]["columns"]), valid_types=str)
+        if not isinstance(target_column, str) or target_column not in self.table_columns(table_name, generated=True):
+            raise InputException(item_value=target_column, valid_values=tuple(self.table_columns(table_name, generated=True)), valid_types=str)
 
         if not isinstance(target_value, (str, int, float)) and target_value is not None:
             raise InputException(item_value=target_value, valid_values="any string, int, float or None", valid_types=(str, int, float, None))
 
         try:
-            con = sqlite3.connect(MAIN_DATABASE_PATH)
-            con.row_factory = dict_factory
-            cur = con.cursor()
+            cur = self.connections.reader.cursor()
+            cur.row_factory = dict_factory
             cur.execute(f"""SELECT * FROM {table_name} WHERE {target_column} = ?;""", (target_value,))
             result = {row[f"{table_name[:-1]}_id"]: row for row in cur.fetchall()}
             return result
@@ -324,6 +868,39 @@ class DatabaseAccess:
                 more_infos=f"Exception occurred while fetching rows from table {table_name}, where '{target_column}' == '{target_value}';`"
             )
 
+    def fetch_rows_by_id(self, table_name: str, item_ids: list[str], table_columns: list[str]) -> dict[str, tuple]:
+        """
+        Fetch columns of many items at once (one query per DATABASE_BATCH_SIZE ids)
+
+        :param table_name: name of the table
+        :param item_ids: ids of the items
+        :param table_columns: columns to fetch
+        :return: Dict containing the fetched values, in the form of {item_id: (value, ...)} (missing items are left out)
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(table_name, str) or table_name not in self.table_struct.keys():
+            raise InputException(item_value=table_name, valid_values=tuple(self.table_struct.keys()), valid_types=str)
+
+        if not isinstance(item_ids, list):
+            raise InputException(item_value=item_ids, valid_values="list of ids", valid_types=list)
+
+        if not isinstance(table_columns, list) or not table_columns or not set(table_columns) <= set(self.table_columns(table_name, generated=True)):
+            raise InputException(item_value=table_columns, valid_values=tuple(self.table_columns(table_name, generated=True)), valid_types=list)
+
+        primary_key = self.table_struct[table_name]["ids"][0]
+        unique_ids = list(dict.fromkeys(item_ids))
+
+        result = {}
+        for batch_start in range(0, len(unique_ids), DATABASE_BATCH_SIZE):
+            batch = unique_ids[batch_start:batch_start + DATABASE_BATCH_SIZE]
+            sql_query = f"""SELECT {primary_key}, {', '.join(table_columns)} FROM {table_name} WHERE {primary_key} IN ({', '.join('?' * len(batch))});"""
+            for row in self.execute_query(sql_query, tuple(batch), fetch=True):
+                result[row[0]] = tuple(row[1:])
+
+        return result
+
     def update_item(
             self,
             table_name: str,
@@ -353,18 +930,43 @@ class DatabaseAccess:
             raise InputException(item_value=new_value, valid_values="any string, int, float or None", valid_types=(str, int, float, None))
 
         primary_key = self.table_struct[table_name]["ids"][0]
-        sql_command = f"""UPDATE {table_name} SET {table_column} = ? WHERE {primary_key} = ?;"""
 
-        self.execute_query(sql_command, (str(new_value), item_id,), False)
+        # the columns of json_fields are written with their payload
+        field_values = {}
+        if table_column == f"{table_name[:-1]}_json":
+            fields = {column: field for column, field in self.json_fields.get(table_name, {}).items() if column in self.table_struct[table_name]["columns"]}
+            field_values = _json_field_values(fields, str(new_value) if new_value is not None else None)
+
+        sql_command = f"""UPDATE {table_name} SET {table_column} = ?{''.join(f', {column} = ?' for column in field_values)} WHERE {primary_key} = ?;"""
+
+        self.execute_query(sql_command, (str(new_value), *field_values.values(), item_id,), False)
+        self._notify_change(table_name, item_id)
 
 
 class MyAppDatabase(DatabaseAccess):
     """
     class acting as Data Access Object for Main Database
     """
+
+    # set by the user, never overwritten by refreshed Spotify data
+    local_columns = ("popularity", "blacklisted")
+
+    json_fields = JSON_FIELDS
+
     def __init__(self, database_file: str) -> None:
         super().__init__(database_file)
 
+        # create_tables.sql creates the tables of version 0, every later change of the schema is a migration
+        self.migrations: MigrationRunner = MigrationRunner(self, MAIN_MIGRATIONS)
+
+    def _on_open(self) -> None:
+        """
+        Upgrade databases created by older versions, before the first query uses them
+        """
+
+        if "albums" in self.table_struct:
+            self.migrations.upgrade()
+
     def add_dummies(self) -> None:
         """
         Add dummy data to the database to avoid Exceptions and to test methods
@@ -382,7 +984,7 @@ class MyAppDatabase(DatabaseAccess):
             "track_json": get_str_from_json_file(absolute_path("/Databases/JSON_Files/spotify_track_dummy.json")),
             "user_json": get_str_from_json_file(absolute_path("/Databases/JSON_Files/spotify_user_dummy.json"))
         }
-        sql_script = load_sql_query("code_backend/sql_queries/insert_dummies.sql")
+        sql_script = SQL_QUERIES["insert_dummies"]
         self.split_queries(sql_query=sql_script, parameter=params)
 
     def initialize_tables(self) -> None:
@@ -394,9 +996,11 @@ class MyAppDatabase(DatabaseAccess):
         :raises DatabaseException: If Exception related to the Database occurs
         :raises InputException: if input is invalid
         """
-        sqlite_command = load_sql_query("code_backend/sql_queries/create_tables.sql")
+        sqlite_command = SQL_QUERIES["create_tables"]
 
         self.execute_script(sqlite_command)
+        self.invalidate_schema()
+        self.migrations.upgrade()
         self.add_dummies()
 
     def add_item_to_table(
@@ -418,13 +1022,277 @@ class MyAppDatabase(DatabaseAccess):
         if not isinstance(table_name, str) or table_name not in ['albums', 'artists', 'tracks', 'playlists', 'users', 'devices']:
             raise InputException(item_value=table_name, valid_values=('albums', 'artists', 'tracks', 'playlists', 'users', 'devices'), valid_types=str)
 
-        sql_query = load_sql_query(f"code_backend/sql_queries/insert_{table_name}.sql")
-        return super().add_item_to_table(
+        # the item and its relations are written in one transaction
+        self.add_items_to_table(table_name=table_name, rows=[kwargs])
+
+    def add_items_to_table(
+            self,
+            table_name: Literal['albums', 'artists', 'tracks', 'playlists', 'users', 'genres', 'devices'],
+            rows: list[dict],
+            batch_size: int = DATABASE_BATCH_SIZE
+    ) -> dict[str, int | float]:
+        """
+        Adds many items to a table with one transaction. Items that already exist are ignored, missing keys get the default value 'NULL'.
+
+        :param table_name: Which table to add
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :param batch_size: maximum number of rows passed to one `executemany` call
+        :return: Dict containing the ingestion statistics, in the form of {'rows': ..., 'seconds': ..., 'rows_per_second': ...}
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(table_name, str) or table_name not in ['albums', 'artists', 'tracks', 'playlists', 'users', 'devices']:
+            raise InputException(item_value=table_name, valid_values=('albums', 'artists', 'tracks', 'playlists', 'users', 'devices'), valid_types=str)
+
+        return super().add_items_to_table(
             table_name=table_name,
-            query_template=sql_query,
-            **kwargs
+            rows=rows,
+            query_template=SQL_QUERIES[f"insert_{table_name}"],
+            batch_size=batch_size
         )
 
+    def _related_statements(self, table_name: str, rows: list[dict]) -> list[tuple[str, list]]:
+        """
+        Relation rows of the id list columns (see RELATIONS), inserted like the items themselves with `INSERT OR IGNORE`
+
+        :param table_name: name of the table the rows are added to
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        statements = []
+        for relation, (source_table, list_column, source_key, target_key) in RELATIONS.items():
+            if source_table != table_name:
+                continue
+
+            parameters = [
+                (row[source_key], position, target_id)
+                for row in rows if row.get(source_key) is not None
+                for position, target_id in enumerate(_parse_id_list(row.get(list_column)))
+            ]
+            if parameters:
+                statements.append((f"INSERT OR IGNORE INTO {relation} ({source_key}, position, {target_key}) VALUES (?, ?, ?);", parameters))
+
+        return statements
+
+    def upsert_items(
+            self,
+            table_name: Literal['albums', 'artists', 'tracks', 'playlists', 'users', 'devices'],
+            rows: list[dict],
+            batch_size: int = DATABASE_BATCH_SIZE
+    ) -> dict[str, int | float | list]:
+        """
+        Insert new items and update changed ones (e.g. refreshed follower counts, playlists with new tracks), unchanged items are not written. `popularity` and `blacklisted` of stored items are kept
+
+        :param table_name: Which table to write
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :param batch_size: number of rows compared and written per transaction
+        :return: Dict containing the statistics, in the form of {'inserted': ..., 'updated': ..., 'unchanged': ..., 'seconds': ..., 'batches': [{'inserted': ..., 'updated': ..., 'unchanged': ...}, ...]}
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(table_name, str) or table_name not in ['albums', 'artists', 'tracks', 'playlists', 'users', 'devices']:
+            raise InputException(item_value=table_name, valid_values=('albums', 'artists', 'tracks', 'playlists', 'users', 'devices'), valid_types=str)
+
+        return super().upsert_items(table_name=table_name, rows=rows, batch_size=batch_size)
+
+    def _replaced_related_statements(self, table_name: str, rows: list[dict]) -> list[tuple[str, list]]:
+        """
+        Relation rows of updated items: the stored relations are removed and written again from the id list columns
+
+        :param table_name: name of the table the rows are updated in
+        :param rows: List containing the items, in the form of [{column: value}, ...]
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        statements = []
+        for relation, (source_table, _, source_key, _) in RELATIONS.items():
+            item_ids = [(row[source_key],) for row in rows if source_table == table_name and row.get(source_key) is not None]
+            if item_ids:
+                statements.append((f"DELETE FROM {relation} WHERE {source_key} = ?;", item_ids))
+
+        return statements + self._related_statements(table_name, rows)
+
+    def _removed_related_statements(self, table_name: str, item_id: str | None = None) -> list[tuple[str, list]]:
+        """
+        Relation rows of removed items, removed in the same transaction as the items
+
+        :param table_name: source table of the relations
+        :param item_id: only the relations of this item (None: of every item)
+        :return: List containing the queries, in the form of [(sql_query, [parameters, ...]), ...]
+        """
+
+        return [
+            (f"DELETE FROM {relation} WHERE {source_key} = ?;", [(item_id,)]) if item_id is not None else (f"DELETE FROM {relation};", [()])
+            for relation, (source_table, _, source_key, _) in RELATIONS.items() if source_table == table_name
+        ]
+
+    def migrate_json_storage(self) -> int:
+        """
+        Store every *_json payload in the format of self.json_storage (converts the string representations of dicts written by older versions and payloads of the other format), e.g. after changing JSON_STORAGE. The columns of JSON_FIELDS are written with the converted payloads
+
+        Run `VACUUM` afterwards to give the space freed by the conversion back to the file system
+
+        :return: number of converted payloads
+        :raises CustomException: If Exception occurs
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        converted = 0
+        for table_name in self.table_struct.keys():
+            json_column = f"{table_name[:-1]}_json"
+            if json_column not in self.table_struct[table_name]["columns"]:
+                continue
+
+            if self.json_storage == "zlib":
+                condition = f"typeof({json_column}) = 'text'"
+            else:
+                condition = f"typeof({json_column}) = 'blob' OR ({json_column} != '' AND NOT json_valid({json_column}))"
+
+            primary_key = self.table_struct[table_name]["ids"][0]
+            fields = {column: field for column, field in self.json_fields.get(table_name, {}).items() if column in self.table_struct[table_name]["columns"]}
+            rows = self.execute_query(f"SELECT {primary_key}, {json_column} FROM {table_name} WHERE {condition};", fetch=True)
+
+            updates = []
+            for item_id, payload in rows:
+                value = load_dict_from_database(payload)
+                if value is not None:
+                    updates.append((dump_dict_to_database(value, storage=self.json_storage), *_json_field_values(fields, value).values(), item_id))
+
+            if updates:
+                converted += self.execute_many([(
+                    f"UPDATE {table_name} SET {json_column} = ?{''.join(f', {column} = ?' for column in fields)} WHERE {primary_key} = ?;", updates
+                )])
+
+        return converted
+
+    def related_ids(self, relation: str, item_id: str) -> list[str]:
+        """
+        Get the ids an item refers to in list order (e.g. related_ids('album_tracks', album_id) -> track ids of the album)
+
+        :param relation: name of the relation table (see RELATIONS)
+        :param item_id: id of the source item
+        :return: List containing the target ids
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(relation, str) or relation not in RELATIONS:
+            raise InputException(item_value=relation, valid_values=tuple(RELATIONS.keys()), valid_types=str)
+
+        _, _, source_key, target_key = RELATIONS[relation]
+        result = self.execute_query(f"SELECT {target_key} FROM {relation} WHERE {source_key} = ? ORDER BY position;", (item_id,), fetch=True)
+        return [row[0] for row in result]
+
+    def referencing_ids(self, relation: str, item_id: str) -> list[str]:
+        """
+        Get the ids of the items referring to an item (e.g. referencing_ids('playlist_tracks', track_id) -> playlists containing the track)
+
+        :param relation: name of the relation table (see RELATIONS)
+        :param item_id: id of the target item
+        :return: List containing the source ids
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(relation, str) or relation not in RELATIONS:
+            raise InputException(item_value=relation, valid_values=tuple(RELATIONS.keys()), valid_types=str)
+
+        _, _, source_key, target_key = RELATIONS[relation]
+        result = self.execute_query(f"SELECT DISTINCT {source_key} FROM {relation} WHERE {target_key} = ?;", (item_id,), fetch=True)
+        return [row[0] for row in result]
+
+    def unknown_ids(self, item_type: Literal['album', 'artist', 'playlist', 'track', 'user']) -> set[str]:
+        """
+        Get the ids of items referenced by other items, but without row in their own table (e.g. artists of stored albums that are not stored). Runs as one indexed anti-join
+
+        :param item_type: type of the referenced items
+        :return: Set containing the unknown ids
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(item_type, str) or item_type not in ['album', 'artist', 'playlist', 'track', 'user']:
+            raise InputException(item_value=item_type, valid_values=('album', 'artist', 'playlist', 'track', 'user'), valid_types=str)
+
+        sources = [f"SELECT {target_key} AS item_id FROM {relation}" for relation, (_, _, _, target_key) in RELATIONS.items() if target_key == f"{item_type}_id"]
+        sources += [f"SELECT {column} AS item_id FROM {table_name}" for table_name, column in REFERENCE_COLUMNS.get(item_type, [])]
+
+        sql_query = (
+            f"SELECT DISTINCT reference.item_id FROM ({' UNION ALL '.join(sources)}) AS reference "
+            f"WHERE reference.item_id IS NOT NULL AND reference.item_id NOT IN ('', '[]') "
+            f"AND NOT EXISTS (SELECT 1 FROM {item_type}s AS known WHERE known.{item_type}_id = reference.item_id);"
+        )
+        return {row[0] for row in self.execute_query(sql_query, fetch=True)}
+
+    def rebuild_search_index(self) -> None:
+        """
+        Fill the full-text search index again from the tables (it is kept in sync by triggers, e.g. after the search tables were changed by hand)
+
+        :return:
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        self.execute_script(SQL_QUERIES["rebuild_search_index"])
+
+    def search_items(
+            self,
+            search_query: str,
+            item_types: list[Literal['album', 'artist', 'playlist', 'track']] | None = None,
+            limit: int = 20,
+            offset: int = 0
+    ) -> dict[str, dict]:
+        """
+        Search the stored albums, artists, playlists and tracks (names, artist names of albums/tracks and genre names) using the full-text search index. Every word of search_query has to match the start of a word (e.g. 'bohem rhap' finds 'Bohemian Rhapsody')
+
+        :param search_query: words to search for
+        :param item_types: types of items to search (default: every type)
+        :param limit: maximum number of results per item type
+        :param offset: index of the first result per item type
+        :return: Dict containing the results ordered by relevance, in the form of {item_uri: {'item_type': ..., 'item_id': ..., 'name': ..., 'rank': ...}}
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(search_query, str):
+            raise InputException(item_value=search_query, valid_values="any string", valid_types=str)
+
+        item_types = list(SEARCH_TABLES.keys()) if item_types is None else item_types
+        if not isinstance(item_types, list) or not item_types or not set(item_types) <= set(SEARCH_TABLES.keys()):
+            raise InputException(item_value=item_types, valid_values=tuple(SEARCH_TABLES.keys()), valid_types=list)
+
+        if not isinstance(limit, int) or limit < 1:
+            raise InputException(item_value=limit, valid_values="positive integer", valid_types=int)
+
+        if not isinstance(offset, int) or offset < 0:
+            raise InputException(item_value=offset, valid_values="0 <= offset", valid_types=int)
+
+        # every word as quoted prefix query (quotes keep FTS5 operators like AND, NEAR, * out of user input)
+        words = re.findall(r"\w+", search_query)
+        if not words:
+            return {}
+        match_query = " ".join(f'"{word}"*' for word in words)
+
+        selects = []
+        parameters = []
+        for item_type in item_types:
+            search_table = SEARCH_TABLES[item_type]
+            # matches in the name weigh more than in artist or genre names
+            selects.append(
+                f"SELECT * FROM (SELECT '{item_type}' AS item_type, items.{item_type}_id, items.{item_type}_name, items.{item_type}_uri, bm25({search_table}, 10.0, 2.0, 1.0) AS rank "
+                f"FROM {search_table} JOIN {item_type}s AS items ON items.rowid = {search_table}.rowid "
+                f"WHERE {search_table} MATCH ? AND items.{item_type}_id != ? ORDER BY rank LIMIT ? OFFSET ?)"
+            )
+            parameters += [match_query, DUMMY_ID, limit, offset]
+
+        result = self.execute_query(f"{' UNION ALL '.join(selects)} ORDER BY rank;", tuple(parameters), fetch=True)
+        return {
+            item_uri: {"item_type": item_type, "item_id": item_id, "name": name, "rank": rank}
+            for item_type, item_id, name, item_uri, rank in result
+        }
+
     def remove_specific_item(self, table_name: Literal['albums', 'artists', 'tracks', 'playlists', 'users', 'genres', 'devices'], item_id: str):
         """
         remove item from table by ID
@@ -451,7 +1319,7 @@ class MyAppDatabase(DatabaseAccess):
                 if not check_spotify_id(item_id):
                     raise SpotifyIdException(item_id, table_name[:-1])
 
-        return super().remove_specific_item(table_name=table_name, item_id=item_id)
+        super().remove_specific_item(table_name=table_name, item_id=item_id)
 
     def reset_table(self, table_name: Literal['albums', 'artists', 'tracks', 'playlists', 'users', 'genres', 'devices']):
         """
@@ -479,10 +1347,16 @@ class MyAppDatabase(DatabaseAccess):
         :raises DatabaseException: If Exception related to the Database occurs
         """
 
-        for table_name in self.table_struct.keys():
+        for table_name in list(self.table_struct.keys()):
             self.execute_script(sql_script=f"""DROP TABLE {table_name};""")
 
+        for search_table in SEARCH_TABLES.values():
+            self.execute_script(sql_script=f"""DROP TABLE IF EXISTS {search_table};""")
+
+        self.execute_script(sql_script="""PRAGMA user_version = 0;""")
+        self.invalidate_schema()
         self.initialize_tables()
+        self._notify_change(None)
 
 
     def fetch_row(
@@ -510,7 +1384,7 @@ class MyAppDatabase(DatabaseAccess):
             case "devices":
                 if not check_spotify_id(item_id, is_device=True):
                     raise SpotifyIdException(item_id, table_name[:-1])
-            case "user":
+            case "users":
                 if not check_spotify_id(item_id, is_user=True):
                     raise SpotifyIdException(item_id, table_name[:-1])
             case _:
@@ -597,8 +1471,156 @@ class MyAppDatabase(DatabaseAccess):
         elif table_name in ['albums', 'artists', 'tracks', 'playlists'] and not check_spotify_id(item_id):
             raise SpotifyIdException(item_id, table_name[:-1])
 
-        return super().update_item(table_name=table_name, item_id=item_id, table_column=table_column, new_value=new_value)
+        super().update_item(table_name=table_name, item_id=item_id, table_column=table_column, new_value=new_value)
+
+        # id list columns are mirrored by their relation table
+        for relation, (source_table, list_column, source_key, _) in RELATIONS.items():
+            if source_table == table_name and list_column == table_column:
+                statements = [(f"DELETE FROM {relation} WHERE {source_key} = ?;", [(item_id,)])]
+                statements += self._related_statements(table_name, [{source_key: item_id, list_column: new_value}])
+                self.execute_many(statements)
+
+
+def _backfill_relations(database: MyAppDatabase, connection: sqlite3.Connection, table_name: str, rows: list[tuple]) -> None:
+    """
+    Fill the relation tables from the id list columns of a chunk of items (relations written before are replaced)
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the chunk
+    :param table_name: source table of the relations
+    :param rows: List containing the items, in the form of [(rowid, item_id, id_list, ...), ...] (id lists in the order of RELATIONS)
+    """
+
+    list_columns = [list_column for source_table, list_column, _, _ in RELATIONS.values() if source_table == table_name]
+    items = [dict(zip([f"{table_name[:-1]}_id"] + list_columns, row[1:])) for row in rows]
+
+    for sql_query, parameters in database._replaced_related_statements(table_name, items):
+        connection.executemany(sql_query, parameters)
+
+
+def _backfill_images(database: MyAppDatabase, connection: sqlite3.Connection, table_name: str, rows: list[tuple]) -> None:
+    """
+    Move images stored as base64 text in the *_image column (versions before the image store) into the table `images` and replace them by their hash (see ImageStore.image_hash())
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the chunk
+    :param table_name: table of the *_image column
+    :param rows: List containing the items, in the form of [(rowid, image), ...]
+    """
+
+    for rowid, b64_image in rows:
+        if not b64_image or len(b64_image) == 64:
+            continue
+
+        try:
+            image_bytes = base64.b64decode(b64_image, validate=True)
+        except ValueError:
+            continue
+
+        image_hash = sha256(image_bytes).hexdigest()
+        connection.execute(
+            "INSERT OR IGNORE INTO images (image_hash, image_format, byte_size, image_bytes) VALUES (?, 'JPEG', ?, ?);",
+            (image_hash, len(image_bytes), image_bytes)
+        )
+        connection.execute(f"UPDATE {table_name} SET {table_name[:-1]}_image = ? WHERE rowid = ?;", (image_hash, rowid))
+
+
+def _rebuild_search_index(database: MyAppDatabase, connection: sqlite3.Connection) -> None:
+    """
+    Fill the search index created by the migration from the stored items
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the migration
+    """
+
+    for statement in MigrationRunner._statements(SQL_QUERIES["rebuild_search_index"]):
+        connection.execute(statement)
+
+
+def _add_json_fields(database: MyAppDatabase, connection: sqlite3.Connection) -> None:
+    """
+    Add the columns of JSON_FIELDS and their indexes (filled by _backfill_json_payloads())
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the migration
+    """
+
+    for table_name, fields in JSON_FIELDS.items():
+        columns = {row[1] for row in connection.execute(f"PRAGMA table_xinfo({table_name});")}
+
+        for column, (column_type, _) in fields.items():
+            if column not in columns:
+                connection.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {column_type};")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column} ON {table_name} ({column});")
+
+
+def _backfill_json_payloads(database: MyAppDatabase, connection: sqlite3.Connection, table_name: str, rows: list[tuple]) -> None:
+    """
+    Convert the string representations of dicts written by older versions into the format of database.json_storage and fill the columns of JSON_FIELDS
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the chunk
+    :param table_name: table of the *_json column
+    :param rows: List containing the items, in the form of [(rowid, payload), ...]
+    """
+
+    fields = JSON_FIELDS.get(table_name, {})
+    updates = []
+    for rowid, payload in rows:
+        if not payload:
+            continue
+
+        converted = False
+        if isinstance(payload, bytes):
+            value = load_dict_from_database(payload)
+        else:
+            try:
+                value = json.loads(payload)
+            except ValueError:
+                value = load_dict_from_database(payload)
+                payload = dump_dict_to_database(value, storage=database.json_storage)
+                converted = True
+
+        if fields or converted:
+            updates.append((payload, *_json_field_values(fields, value).values(), rowid))
+
+    connection.executemany(
+        f"UPDATE {table_name} SET {table_name[:-1]}_json = ?{''.join(f', {column} = ?' for column in fields)} WHERE rowid = ?;", updates
+    )
+
+
+def _add_content_hashes(database: MyAppDatabase, connection: sqlite3.Connection) -> None:
+    """
+    Add the HASH_COLUMN compared by upsert_items() (rows without hash are written by their next upsert)
+
+    :param database: main database
+    :param connection: writer connection inside the transaction of the migration
+    """
 
+    for table_name in ('albums', 'artists', 'tracks', 'playlists', 'users', 'devices'):
+        if HASH_COLUMN not in {row[1] for row in connection.execute(f"PRAGMA table_info({table_name});")}:
+            connection.execute(f"ALTER TABLE {table_name} ADD COLUMN {HASH_COLUMN} TEXT;")
+
+
+SQL_QUERIES = QueryRegistry(SQL_QUERIES_PATH)
+MIGRATION_QUERIES = QueryRegistry(SQL_MIGRATIONS_PATH)
+
+# schema versions of the main database (PRAGMA user_version), never change a released migration: add a new one
+MAIN_MIGRATIONS: list[Migration] = [
+    Migration(1, "relation_tables", script=MIGRATION_QUERIES["001_relation_tables"], backfills=tuple(
+        Backfill(table_name, (f"{table_name[:-1]}_id",) + tuple(list_column for source_table, list_column, _, _ in RELATIONS.values() if source_table == table_name), _backfill_relations)
+        for table_name in dict.fromkeys(source_table for source_table, _, _, _ in RELATIONS.values())
+    )),
+    Migration(2, "images", script=MIGRATION_QUERIES["002_images"], backfills=tuple(
+        Backfill(table_name, (f"{table_name[:-1]}_image",), _backfill_images) for table_name in ('albums', 'artists', 'playlists', 'tracks', 'users')
+    )),
+    Migration(3, "search_index", script=MIGRATION_QUERIES["003_search_index"], function=_rebuild_search_index),
+    Migration(4, "json_payloads", function=_add_json_fields, backfills=tuple(
+        Backfill(table_name, (f"{table_name[:-1]}_json",), _backfill_json_payloads) for table_name in ('albums', 'artists', 'devices', 'genres', 'playlists', 'tracks', 'users')
+    )),
+    Migration(5, "content_hashes", function=_add_content_hashes),
+    Migration(6, "blacklist_indexes", script=MIGRATION_QUERIES["006_blacklist_indexes"])
+]
 
 APP_DATABASE = MyAppDatabase(MAIN_DATABASE_PATH)
 
@@ -0,0 +1,215 @@
+"""
+    Connection management for the SQLite databases: WAL journal, tuned pragmas, one read connection per thread and one serialized writer connection
+"""
+
+from contextlib import contextmanager
+
+from code_backend.shared_config import *
+from code_backend.exceptions import DatabaseException, InputException
+from code_backend.secondary_methods import json_payload_text
+
+
+class ConnectionManager:
+    """
+    Hands out the connections of one database file. In WAL mode readers never block behind the writer (and the other way around), so every thread (Tk frontend, Flask token thread, crawler threads) reads with its own connection, while all writes go through one writer connection guarded by a lock.
+
+    Connections are opened on first use, so creating the manager (e.g. when a module is imported) does not touch the file.
+    """
+
+    def __init__(
+            self,
+            database_file: str,
+            pragmas: dict[str, str | int] | None = None,
+            cached_statements: int = SQLITE_CACHED_STATEMENTS,
+            on_open: Callable[[], None] | None = None
+    ) -> None:
+        """
+        :param database_file: absolute path to the database file
+        :param pragmas: Dict containing the pragmas set on every connection, in the form of {pragma: value} (default: SQLITE_PRAGMAS)
+        :param cached_statements: compiled statements kept per connection
+        :param on_open: called once after the writer was opened, before any other thread gets a connection (e.g. to migrate the schema)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(database_file, str) or not os.path.isfile(database_file):
+            raise InputException(item_value=database_file, valid_values="path to existing file", valid_types=str)
+
+        if pragmas is not None and not isinstance(pragmas, dict):
+            raise InputException(item_value=pragmas, valid_values="{pragma: value}", valid_types=dict)
+
+        if on_open is not None and not callable(on_open):
+            raise InputException(item_value=on_open, valid_values="any function", valid_types=Callable)
+
+        self.database_file: str = database_file
+        self.pragmas: dict[str, str | int] = dict(SQLITE_PRAGMAS if pragmas is None else pragmas)
+        self.cached_statements: int = cached_statements
+        self.on_open: Callable[[], None] | None = on_open
+
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self.write_lock = threading.RLock()
+
+        # {schema_name: database_file} attached to the writer and every reader (see attach())
+        self.attached: dict[str, str] = {}
+
+        self._writer: sqlite3.Connection | None = None
+        self._opened: bool = False
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Open a connection and apply the pragmas. Connections are opened without check_same_thread, so close() can close them from any thread; readers are only used by their own thread, the writer only while holding the write lock
+
+        :param read_only: True: writes are rejected (PRAGMA query_only)
+        :return: sqlite3 connection
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        try:
+            connection = sqlite3.connect(self.database_file, check_same_thread=False, cached_statements=self.cached_statements)
+
+            for pragma, value in self.pragmas.items():
+                # changing the journal mode needs a write lock, it is set once by the writer
+                if pragma == "journal_mode" and read_only:
+                    continue
+                connection.execute(f"PRAGMA {pragma} = {value};")
+
+            if read_only:
+                connection.execute("PRAGMA query_only = ON;")
+
+            # JSON text of plain and compressed *_json payloads in queries (e.g. the export, see database_export.py)
+            connection.create_function("json_payload", 1, json_payload_text, deterministic=True)
+
+            return connection
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while connecting to database: '{self.database_file}'")
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        """
+        Get the writer connection (opened on first use, use it while holding the write lock)
+
+        :return: sqlite3 connection
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if not self._opened:
+            with self.write_lock:
+                # on_open() gets the writer from the same thread while it is opened
+                if self._writer is None:
+                    self._writer = self._connect()
+                    try:
+                        # databases attached before close() are attached again
+                        for schema_name, database_file in self.attached.items():
+                            self._writer.execute(f"ATTACH DATABASE ? AS {schema_name};", (database_file,))
+
+                        if self.on_open is not None:
+                            self.on_open()
+                    except BaseException:
+                        self._writer.close()
+                        self._writer = None
+                        raise
+                    self._opened = True
+
+        return self._writer
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """
+        Get the read connection of the calling thread (opened on first use)
+
+        :return: sqlite3 connection, rejecting writes
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        # the writer switches the database to WAL (persistent in the file), so it is opened first
+        if not self._opened:
+            self.writer
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect(read_only=True)
+            self._local.connection = connection
+            self._local.attached = set()
+            with self._readers_lock:
+                self._readers.append(connection)
+
+        # databases attached after the reader was opened are attached by its own thread
+        if len(self._local.attached) != len(self.attached):
+            for schema_name, database_file in list(self.attached.items()):
+                if schema_name not in self._local.attached:
+                    connection.execute(f"ATTACH DATABASE ? AS {schema_name};", (database_file,))
+                    self._local.attached.add(schema_name)
+
+        return connection
+
+    def attach(self, schema_name: str, database_file: str) -> None:
+        """
+        Attach another database file to every connection, its tables are available as <schema_name>.<table_name>
+
+        :param schema_name: name of the attached database in queries (e.g. 'blacklist')
+        :param database_file: absolute path to the database file
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(schema_name, str) or not re.fullmatch(r"[a-z_]+", schema_name) or schema_name in ("main", "temp"):
+            raise InputException(item_value=schema_name, valid_values="lowercase letters and '_' (not 'main' or 'temp')", valid_types=str)
+
+        if not isinstance(database_file, str) or not os.path.isfile(database_file):
+            raise InputException(item_value=database_file, valid_values="path to existing file", valid_types=str)
+
+        if self.attached.get(schema_name) == database_file:
+            return
+
+        try:
+            with self.write_lock:
+                self.writer.execute(f"ATTACH DATABASE ? AS {schema_name};", (database_file,))
+                self.attached[schema_name] = database_file
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while attaching database '{database_file}' as '{schema_name}'")
+
+    @contextmanager
+    def write(self):
+        """
+        Serialized access to the writer connection: the caller holds the write lock, the transaction is committed at the end (rolled back on an exception)
+
+        :return: sqlite3 connection of the writer
+        """
+
+        with self.write_lock:
+            with self.writer:
+                yield self.writer
+
+    @property
+    def journal_mode(self) -> str:
+        """
+        :return: journal mode of the database (e.g. 'wal')
+        """
+
+        with self.write_lock:
+            return self.writer.execute("PRAGMA journal_mode;").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the writer and every read connection, the next use opens them again (with the same attached databases)
+        """
+
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._readers.clear()
+
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = None
+            self._opened = False
+
+        self._local = threading.local()
+
+
+if __name__ == '__main__':
+    """"""
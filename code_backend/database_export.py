@@ -0,0 +1,277 @@
+"""
+    Columnar export of the main database to Parquet or Arrow IPC files (e.g. for analysis with pandas, polars or DuckDB) and the matching import. Needs the optional dependency pyarrow
+"""
+
+from code_backend.shared_config import *
+from code_backend.secondary_methods import absolute_path, dump_dict_to_database
+from code_backend.database_access import MyAppDatabase, APP_DATABASE, RELATIONS, HASH_COLUMN, _parse_id_list
+from code_backend.exceptions import CustomException, InputException
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# file extension of the formats
+EXPORT_FORMATS: dict[str, str] = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# tables exported with one row per item, the id lists are also exported exploded (one file per relation table, see RELATIONS)
+EXPORT_TABLES: tuple[str, ...] = ("albums", "artists", "devices", "genres", "images", "playlists", "tracks", "users")
+
+# columns holding lists, exported as list<string> instead of their stored string
+LIST_COLUMNS: set[str] = {list_column for _, list_column, _, _ in RELATIONS.values()} | {"genre_names", "top_genre_names"}
+
+
+def _check_pyarrow() -> None:
+    """
+    :raises CustomException: if pyarrow is not installed
+    """
+
+    if pyarrow is None:
+        raise CustomException(error_message="pyarrow is not installed", more_infos="The export to Parquet/Arrow needs pyarrow (pip install pyarrow)")
+
+
+def _check_format(file_format: str) -> None:
+    """
+    :param file_format: 'parquet' or 'arrow'
+    :raises InputException: if input is invalid
+    """
+
+    if file_format not in EXPORT_FORMATS:
+        raise InputException(item_value=file_format, valid_values=tuple(EXPORT_FORMATS.keys()), valid_types=str)
+
+
+def _arrow_type(column: str, declared_type: str) -> "pyarrow.DataType":
+    """
+    :param column: name of the column
+    :param declared_type: type of the column in the table definition (e.g. 'TEXT')
+    :return: arrow type of the exported column
+    """
+
+    if column in LIST_COLUMNS:
+        return pyarrow.list_(pyarrow.string())
+
+    return {"INTEGER": pyarrow.int64(), "REAL": pyarrow.float64(), "BLOB": pyarrow.binary()}.get(declared_type.upper(), pyarrow.string())
+
+
+def _table_export(database: MyAppDatabase, table_name: str) -> tuple[str, "pyarrow.Schema"]:
+    """
+    Query and schema of an exported table: the *_json payloads are exported as JSON text (compressed payloads are decompressed by json_payload()), every other column (e.g. the fields of JSON_FIELDS) as stored
+
+    :param database: exported database
+    :param table_name: name of the table
+    :return: sql query and arrow schema
+    """
+
+    json_column = f"{table_name[:-1]}_json"
+    selected, fields = [], []
+    for _, column, declared_type, _, _, _, _ in database.execute_query(f"PRAGMA table_xinfo({table_name});", fetch=True):
+        if column == HASH_COLUMN:
+            continue
+
+        if column == json_column:
+            selected.append(f"json_payload({column})")
+            fields.append(pyarrow.field(column, pyarrow.string()))
+        else:
+            selected.append(column)
+            fields.append(pyarrow.field(column, _arrow_type(column, declared_type)))
+
+    return f"SELECT {', '.join(selected)} FROM {table_name} ORDER BY rowid;", pyarrow.schema(fields)
+
+
+def _write_file(cursor: sqlite3.Cursor, schema: "pyarrow.Schema", file_path: str, file_format: str, chunk_size: int) -> int:
+    """
+    Stream the rows of a query into a file, one record batch per chunk
+
+    :param cursor: cursor of the executed query
+    :param schema: arrow schema of the rows
+    :param file_path: path of the written file
+    :param file_format: 'parquet' or 'arrow'
+    :param chunk_size: rows per record batch
+    :return: number of written rows
+    """
+
+    list_columns = [index for index, field in enumerate(schema) if pyarrow.types.is_list(field.type)]
+
+    if file_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(file_path, schema, compression="zstd")
+    else:
+        writer = pyarrow.ipc.new_file(file_path, schema)
+
+    written = 0
+    with writer:
+        while rows := cursor.fetchmany(chunk_size):
+            columns = [list(column) for column in zip(*rows)]
+            for index in list_columns:
+                columns[index] = [None if value is None else _parse_id_list(value) for value in columns[index]]
+
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(
+                [pyarrow.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+            ))
+            written += len(rows)
+
+    return written
+
+
+def export_database(
+        database: MyAppDatabase = APP_DATABASE,
+        export_directory: str = EXPORT_PATH,
+        file_format: Literal["parquet", "arrow"] = "parquet",
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> dict[str, int]:
+    """
+    Export every table of EXPORT_TABLES and every relation table (exploded id lists) into one file per table (e.g. tracks.parquet, track_artists.parquet). The tables are streamed in chunks of rows, all of them from one snapshot of the database
+
+    :param database: database to export
+    :param export_directory: (relative) path to the directory of the files (created if needed, existing files are replaced)
+    :param file_format: 'parquet' or 'arrow' (Arrow IPC file)
+    :param chunk_size: rows per record batch
+    :return: Dict containing the number of exported rows, in the form of {table_name: rows}
+    :raises CustomException: If Exception occurs (e.g. pyarrow is not installed)
+    :raises DatabaseException: If Exception related to the Database occurs
+    :raises InputException: if input is invalid
+    """
+
+    _check_pyarrow()
+    _check_format(file_format)
+
+    if not isinstance(database, MyAppDatabase):
+        raise InputException(item_value=database, valid_values="MyAppDatabase(...)", valid_types=MyAppDatabase)
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise InputException(item_value=chunk_size, valid_values="positive integer", valid_types=int)
+
+    export_directory = absolute_path(export_directory)
+    os.makedirs(export_directory, exist_ok=True)
+
+    exports = [(table_name, *_table_export(database, table_name)) for table_name in EXPORT_TABLES if table_name in database.table_struct]
+    exports += [
+        (relation, f"SELECT {source_key}, position, {target_key} FROM {relation} ORDER BY {source_key}, position;", pyarrow.schema([
+            pyarrow.field(source_key, pyarrow.string()), pyarrow.field("position", pyarrow.int64()), pyarrow.field(target_key, pyarrow.string())
+        ]))
+        for relation, (_, _, source_key, target_key) in RELATIONS.items() if relation in database.table_struct
+    ]
+
+    exported = {}
+    reader = database.connections.reader
+    try:
+        # one read transaction: every table is exported from the same snapshot, writes of other threads are not blocked (WAL)
+        reader.execute("BEGIN;")
+        for table_name, sql_query, schema in exports:
+            file_path = os.path.join(export_directory, f"{table_name}{EXPORT_FORMATS[file_format]}")
+            exported[table_name] = _write_file(reader.execute(sql_query), schema, file_path, file_format, chunk_size)
+
+    except (sqlite3.Error, pyarrow.ArrowException) as error:
+        raise CustomException(error_message=error, more_infos=f"Exception occurred while exporting the database to '{export_directory}'")
+
+    finally:
+        reader.rollback()
+
+    return exported
+
+
+def _read_batches(file_path: str, file_format: str, chunk_size: int) -> Iterator[list[dict]]:
+    """
+    Read an exported file in chunks
+
+    :param file_path: path to the file
+    :param file_format: 'parquet' or 'arrow'
+    :param chunk_size: rows per chunk (parquet: maximum, arrow: the record batches of the file)
+    :return: Generator of Lists containing the rows, in the form of [{column: value}, ...]
+    """
+
+    if file_format == "parquet":
+        for batch in pyarrow.parquet.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+    else:
+        with pyarrow.ipc.open_file(file_path) as reader:
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index).to_pylist()
+
+
+def _stored_value(database: MyAppDatabase, value: Any) -> Any:
+    """
+    :param database: database the value is written to
+    :param value: imported value
+    :return: value in the format of the database (lists as string, dicts as JSON, see MyAppDatabase.json_storage)
+    """
+
+    if isinstance(value, dict):
+        return dump_dict_to_database(value, storage=database.json_storage)
+
+    if isinstance(value, list):
+        return str(value)
+
+    return value
+
+
+def import_database(
+        database: MyAppDatabase = APP_DATABASE,
+        export_directory: str = EXPORT_PATH,
+        file_format: Literal["parquet", "arrow"] = "parquet",
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> dict[str, int]:
+    """
+    Import the files written by export_database(). Items are written with upsert_items() (unchanged items are skipped, `popularity` and `blacklisted` of stored items are kept), the relation tables are rebuilt from the id lists, so the exploded relation files are not read
+
+    :param database: database to import into
+    :param export_directory: (relative) path to the directory of the exported files
+    :param file_format: 'parquet' or 'arrow'
+    :param chunk_size: rows read and written per chunk
+    :return: Dict containing the number of imported rows, in the form of {table_name: rows}
+    :raises CustomException: If Exception occurs (e.g. pyarrow is not installed)
+    :raises DatabaseException: If Exception related to the Database occurs
+    :raises InputException: if input is invalid
+    """
+
+    _check_pyarrow()
+    _check_format(file_format)
+
+    if not isinstance(database, MyAppDatabase):
+        raise InputException(item_value=database, valid_values="MyAppDatabase(...)", valid_types=MyAppDatabase)
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise InputException(item_value=chunk_size, valid_values="positive integer", valid_types=int)
+
+    export_directory = absolute_path(export_directory)
+    if not os.path.isdir(export_directory):
+        raise InputException(item_value=export_directory, valid_values="path to existing directory", valid_types=str)
+
+    imported = {}
+    for table_name in EXPORT_TABLES:
+        file_path = os.path.join(export_directory, f"{table_name}{EXPORT_FORMATS[file_format]}")
+        if table_name not in database.table_struct or not os.path.isfile(file_path):
+            continue
+
+        columns = database.table_columns(table_name)
+        json_column = f"{table_name[:-1]}_json"
+        imported[table_name] = 0
+
+        try:
+            for rows in _read_batches(file_path, file_format, chunk_size):
+                # the fields of JSON_FIELDS are taken from the payloads again (see DatabaseAccess._row_values())
+                rows = [{column: value for column, value in row.items() if column in columns} for row in rows]
+                for row in rows:
+                    if row.get(json_column):
+                        row[json_column] = json.loads(row[json_column])
+
+                if HASH_COLUMN in columns:
+                    database.upsert_items(table_name=table_name, rows=rows, batch_size=chunk_size)
+                else:
+                    database.execute_many([(database.insert_template(table_name), [
+                        {column: _stored_value(database, row.get(column)) for column in columns} for row in rows
+                    ])], batch_size=chunk_size)
+
+                imported[table_name] += len(rows)
+
+        except pyarrow.ArrowException as error:
+            raise CustomException(error_message=error, more_infos=f"Exception occurred while importing '{file_path}'")
+
+    return imported
+
+
+if __name__ == '__main__':
+    """"""
@@ -0,0 +1,297 @@
+"""
+    Versioned schema migrations: ordered migrations tracked by `PRAGMA user_version`, applied in transactions, with resumable backfills of existing rows in chunks
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+from code_backend.shared_config import *
+from code_backend.exceptions import DatabaseException, InputException
+
+if TYPE_CHECKING:
+    from code_backend.database_access import DatabaseAccess
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """
+    Conversion of the existing rows of a table, run in chunks of rows ordered by rowid (one transaction per chunk)
+    """
+
+    table_name: str
+    columns: tuple[str, ...]
+    # called with the database, the writer connection (inside the transaction of the chunk), the table name and the rows in the form of [(rowid, *columns), ...]
+    function: Callable[["DatabaseAccess", sqlite3.Connection, str, list[tuple]], None]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One version of the schema: the script and function run in one transaction, the backfills afterwards. Both have to be idempotent (e.g. `CREATE TABLE IF NOT EXISTS`), an interrupted migration is run again from its last finished step
+    """
+
+    version: int
+    name: str
+    script: str = ""  # sql statements
+    function: Callable[["DatabaseAccess", sqlite3.Connection], None] | None = None  # called with the database and the writer connection after the script
+    backfills: tuple[Backfill, ...] = ()
+
+
+class MigrationRunner:
+    """
+    Upgrades a database to the latest version of its migrations. The version of the database is `PRAGMA user_version`, the table `schema_migrations` keeps when each migration ran and the position of its running backfill, so an upgrade interrupted by an exception or a closed app continues where it stopped.
+
+    The runner holds the write lock of the database during the upgrade, every step is committed on its own (rolled back on an exception).
+    """
+
+    def __init__(
+            self,
+            database: "DatabaseAccess",
+            migrations: list[Migration],
+            chunk_size: int = MIGRATION_CHUNK_SIZE,
+            progress: Callable[[Migration, str, int, int], None] | None = None
+    ) -> None:
+        """
+        :param database: database to upgrade
+        :param migrations: List containing the migrations (version 1, 2, ...)
+        :param chunk_size: rows converted per transaction by the backfills
+        :param progress: called after every chunk with the migration, the table name, the converted and the total number of rows (default: print the progress)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(migrations, list) or not all(isinstance(migration, Migration) for migration in migrations):
+            raise InputException(item_value=migrations, valid_values="[Migration(...), ...]", valid_types=list)
+
+        versions = [migration.version for migration in migrations]
+        if versions != list(range(1, len(migrations) + 1)):
+            raise InputException(item_value=versions, valid_values="consecutive versions starting at 1", valid_types=list)
+
+        if not isinstance(chunk_size, int) or chunk_size < 1:
+            raise InputException(item_value=chunk_size, valid_values="0 < chunk_size", valid_types=int)
+
+        if progress is not None and not callable(progress):
+            raise InputException(item_value=progress, valid_values="function(migration, table_name, done, total)", valid_types=Callable)
+
+        self.database: "DatabaseAccess" = database
+        self.migrations: list[Migration] = migrations
+        self.chunk_size: int = chunk_size
+        self.progress: Callable[[Migration, str, int, int], None] = self._print_progress if progress is None else progress
+
+    @staticmethod
+    def _print_progress(migration: Migration, table_name: str, done: int, total: int) -> None:
+        """
+        Default progress report of the backfills
+
+        :param migration: running migration
+        :param table_name: table of the running backfill
+        :param done: converted rows
+        :param total: rows to convert
+        """
+
+        print(f"{CCYAN}Migration {migration.version} ({migration.name}): {table_name} {done}/{total} rows{TEXTCOLOR}")
+
+    @property
+    def current_version(self) -> int:
+        """
+        :return: schema version of the database (0: no migration applied)
+        """
+
+        with self.database.connections.write_lock:
+            return self.database.connections.writer.execute("PRAGMA user_version;").fetchone()[0]
+
+    @property
+    def latest_version(self) -> int:
+        """
+        :return: version of the last migration
+        """
+
+        return len(self.migrations)
+
+    def pending(self) -> list[Migration]:
+        """
+        :return: List containing the migrations not applied yet, in the order they are applied
+        """
+
+        current_version = self.current_version
+        return [migration for migration in self.migrations if migration.version > current_version]
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Explicit transaction on the writer (executescript() would commit the open transaction first), committed at the end and rolled back on an exception
+
+        :return: sqlite3 connection of the writer
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        connection = self.database.connections.writer
+        connection.execute("BEGIN IMMEDIATE;")
+        try:
+            yield connection
+            connection.commit()
+
+        except sqlite3.Error as error:
+            connection.rollback()
+            raise DatabaseException(error_message=error, more_infos="Exception occurred while migrating the database, the step was rolled back")
+
+        except BaseException:
+            connection.rollback()
+            raise
+
+    @staticmethod
+    def _statements(sql_script: str) -> list[str]:
+        """
+        Split a script into its statements (complete statements can contain ';', e.g. triggers)
+
+        :param sql_script: sql statements
+        :return: List containing the statements
+        """
+
+        statements, statement = [], ""
+        for line in sql_script.splitlines(keepends=True):
+            statement += line
+            if sqlite3.complete_statement(statement):
+                statements.append(statement.strip())
+                statement = ""
+
+        return [statement for statement in statements if statement.strip(" \n;")]
+
+    def _state(self, version: int) -> tuple[int, int] | None:
+        """
+        :param version: version of the migration
+        :return: index of the running backfill and rowid of the last converted row (None: the migration did not start)
+        """
+
+        row = self.database.connections.writer.execute(
+            "SELECT backfill_step, backfill_position FROM schema_migrations WHERE version = ?;", (version,)
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def _run_backfill(self, migration: Migration, step: int, position: int) -> None:
+        """
+        Convert the rows after a position in chunks, the position is stored with every chunk
+
+        :param migration: running migration
+        :param step: index of the backfill in migration.backfills
+        :param position: rowid of the last converted row
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        backfill = migration.backfills[step]
+        if backfill.table_name not in self.database.table_struct:
+            return
+
+        writer = self.database.connections.writer
+        total = writer.execute(f"SELECT count(*) FROM {backfill.table_name};").fetchone()[0]
+        done = writer.execute(f"SELECT count(*) FROM {backfill.table_name} WHERE rowid <= ?;", (position,)).fetchone()[0]
+        columns = ", ".join(("rowid",) + backfill.columns)
+
+        while True:
+            with self._transaction() as connection:
+                rows = connection.execute(
+                    f"SELECT {columns} FROM {backfill.table_name} WHERE rowid > ? ORDER BY rowid LIMIT ?;", (position, self.chunk_size)
+                ).fetchall()
+                if not rows:
+                    break
+
+                backfill.function(self.database, connection, backfill.table_name, rows)
+                position = rows[-1][0]
+                connection.execute("UPDATE schema_migrations SET backfill_position = ? WHERE version = ?;", (position, migration.version))
+
+            done += len(rows)
+            self.progress(migration, backfill.table_name, done, total)
+
+    def _apply(self, migration: Migration) -> None:
+        """
+        Apply one migration (or continue it if it was interrupted)
+
+        :param migration: migration to apply
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        state = self._state(migration.version)
+        if state is None:
+            with self._transaction() as connection:
+                for statement in self._statements(migration.script):
+                    connection.execute(statement)
+                if migration.function is not None:
+                    migration.function(self.database, connection)
+
+                connection.execute(
+                    "INSERT INTO schema_migrations (version, name, started, backfill_step, backfill_position) VALUES (?, ?, ?, 0, 0);",
+                    (migration.version, migration.name, datetime.now().isoformat(timespec="seconds"))
+                )
+            self.database.invalidate_schema()
+            state = (0, 0)
+
+        step, position = state
+        for step in range(step, len(migration.backfills)):
+            self._run_backfill(migration, step, position)
+            position = 0
+            with self._transaction() as connection:
+                connection.execute("UPDATE schema_migrations SET backfill_step = ?, backfill_position = 0 WHERE version = ?;", (step + 1, migration.version))
+
+        with self._transaction() as connection:
+            connection.execute("UPDATE schema_migrations SET finished = ? WHERE version = ?;", (datetime.now().isoformat(timespec="seconds"), migration.version))
+            connection.execute(f"PRAGMA user_version = {migration.version};")
+
+    def upgrade(self, target_version: int | None = None) -> list[int]:
+        """
+        Apply the pending migrations in order
+
+        :param target_version: last version to apply (default: latest_version)
+        :return: List containing the applied versions
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if target_version is None:
+            target_version = self.latest_version
+
+        if not isinstance(target_version, int) or not 0 <= target_version <= self.latest_version:
+            raise InputException(item_value=target_version, valid_values=f"0 <= target_version <= {self.latest_version}", valid_types=int)
+
+        applied = []
+        with self.database.connections.write_lock:
+            pending = [migration for migration in self.pending() if migration.version <= target_version]
+            if not pending:
+                return applied
+
+            with self._transaction() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations "
+                    "(version INTEGER PRIMARY KEY, name TEXT, started TEXT, finished TEXT, backfill_step INTEGER, backfill_position INTEGER);"
+                )
+            self.database.invalidate_schema()
+
+            for migration in pending:
+                self._apply(migration)
+                applied.append(migration.version)
+
+        self.database._notify_change(None)
+        return applied
+
+    def reapply(self, version: int) -> list[int]:
+        """
+        Apply a migration and every later one again (e.g. to backfill rows imported from an old backup)
+
+        :param version: first version to apply again
+        :return: List containing the applied versions
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(version, int) or not 1 <= version <= self.latest_version:
+            raise InputException(item_value=version, valid_values=f"1 <= version <= {self.latest_version}", valid_types=int)
+
+        with self.database.connections.write_lock:
+            with self._transaction() as connection:
+                if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'schema_migrations';").fetchone():
+                    connection.execute("DELETE FROM schema_migrations WHERE version >= ?;", (version,))
+                connection.execute(f"PRAGMA user_version = {min(self.current_version, version - 1)};")
+
+            return self.upgrade()
+
+
+if __name__ == '__main__':
+    """"""
@@ -0,0 +1,255 @@
+"""
+    Write-behind queue of the main database: producers (e.g. the New* classes of music_classes.py) queue rows and return immediately, a writer thread stores them in batched transactions
+"""
+
+import atexit
+import queue
+
+from code_backend.shared_config import *
+from code_backend.database_access import DatabaseAccess, APP_DATABASE, HASH_COLUMN
+from code_backend.exceptions import DatabaseException, InputException
+
+
+# queued by close(): the writer thread writes everything queued before and stops
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of rows written by one background thread: with upsert_items(), rows of tables without HASH_COLUMN (e.g. images) with `INSERT OR IGNORE`. The writer collects rows for up to `flush_interval` seconds (or until `batch_size` rows are collected), rows of the same item are coalesced (the last one is written) and every table is written in batched transactions.
+
+    If the queue is full, producers wait for the writer (backpressure) and fail after `put_timeout` seconds. Rows are not readable from the database before they were written: call flush() first. Exceptions of the writer are raised by the next flush() or close().
+    """
+
+    def __init__(
+            self,
+            database: DatabaseAccess,
+            max_size: int = WRITE_QUEUE_SIZE,
+            batch_size: int = DATABASE_BATCH_SIZE,
+            flush_interval: float = WRITE_FLUSH_INTERVAL,
+            put_timeout: float = WRITE_QUEUE_TIMEOUT
+    ) -> None:
+        """
+        :param database: database the rows are written to
+        :param max_size: rows the queue holds before producers are blocked
+        :param batch_size: maximum number of rows written per batch
+        :param flush_interval: seconds rows are collected before they are written
+        :param put_timeout: seconds a producer waits for space in the full queue
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(database, DatabaseAccess):
+            raise InputException(item_value=database, valid_values="DatabaseAccess(...)", valid_types=DatabaseAccess)
+
+        if not isinstance(max_size, int) or max_size < 1:
+            raise InputException(item_value=max_size, valid_values="positive integer", valid_types=int)
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise InputException(item_value=batch_size, valid_values="positive integer", valid_types=int)
+
+        if not isinstance(flush_interval, (int, float)) or flush_interval < 0:
+            raise InputException(item_value=flush_interval, valid_values="0 <= flush_interval", valid_types=(int, float))
+
+        if not isinstance(put_timeout, (int, float)) or put_timeout < 0:
+            raise InputException(item_value=put_timeout, valid_values="0 <= put_timeout", valid_types=(int, float))
+
+        self.database: DatabaseAccess = database
+        self.max_size: int = max_size
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.put_timeout: float = put_timeout
+
+        # entries: (table_name, item_id, row), threading.Event of flush() or _STOP
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed: bool = False
+        self._error: Exception | None = None
+        self._stats = {"queued": 0, "written": 0, "coalesced": 0, "transactions": 0, "blocked": 0, "errors": 0}
+
+    def _start(self) -> None:
+        """
+        Start the writer thread (on the first queued row), remaining rows are written when the interpreter exits
+        """
+
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def put(self, table_name: str, row: dict) -> None:
+        """
+        Queue a row, returns as soon as the row is queued
+
+        :param table_name: name of the table
+        :param row: Dict containing the item, in the form of {column: value}
+        :return:
+        :raises DatabaseException: if the queue is closed or stays full for `put_timeout` seconds
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(table_name, str) or table_name not in self.database.table_struct:
+            raise InputException(item_value=table_name, valid_values=tuple(self.database.table_struct.keys()), valid_types=str)
+
+        primary_key = self.database.table_struct[table_name]["ids"][0]
+        if not isinstance(row, dict) or row.get(primary_key) is None:
+            raise InputException(item_value=row, valid_values=f"{{'{primary_key}': ..., column: value}}", valid_types=dict)
+
+        if self._closed:
+            raise DatabaseException(error_message="Write queue is closed", more_infos=f"Row of table '{table_name}' was not written")
+
+        self._start()
+        if self._queue.full():
+            with self._lock:
+                self._stats["blocked"] += 1
+
+        try:
+            self._queue.put((table_name, row[primary_key], row), timeout=self.put_timeout)
+
+        except queue.Full:
+            raise DatabaseException(
+                error_message="Write queue is full",
+                more_infos=f"{self.max_size} rows were waiting for the writer for {self.put_timeout} seconds, row of table '{table_name}' was not written"
+            )
+
+        with self._lock:
+            self._stats["queued"] += 1
+
+    def _run(self) -> None:
+        """
+        Writer thread: collect the queued rows and write them, until close() is called
+        """
+
+        while True:
+            entry = self._queue.get()
+            pending: dict[str, dict[str, dict]] = {}  # {table_name: {item_id: row}}
+            collected = 0
+            deadline = time.monotonic() + self.flush_interval
+
+            while True:
+                if entry is _STOP or isinstance(entry, threading.Event):
+                    break
+
+                table_name, item_id, row = entry
+                rows = pending.setdefault(table_name, {})
+                if item_id in rows:
+                    with self._lock:
+                        self._stats["coalesced"] += 1
+                rows[item_id] = row
+
+                collected += 1
+                if collected >= self.batch_size:
+                    break
+
+                try:
+                    entry = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+
+            self._write(pending)
+
+            if isinstance(entry, threading.Event):
+                entry.set()
+            elif entry is _STOP:
+                return
+
+    def _write(self, pending: dict[str, dict[str, dict]]) -> None:
+        """
+        Write the collected rows, every table with upsert_items() (tables without HASH_COLUMN with one `INSERT OR IGNORE` transaction)
+
+        :param pending: Dict containing the rows, in the form of {table_name: {item_id: row}}
+        """
+
+        for table_name, rows in pending.items():
+            try:
+                columns = self.database.table_columns(table_name)
+                if HASH_COLUMN in columns:
+                    stats = self.database.upsert_items(table_name=table_name, rows=list(rows.values()), batch_size=self.batch_size)
+                    written, transactions = stats["inserted"] + stats["updated"] + stats["unchanged"], len(stats["batches"])
+                else:
+                    written = self.database.execute_many([(self.database.insert_template(table_name), [
+                        {column: row.get(column) for column in columns} for row in rows.values()
+                    ])], batch_size=self.batch_size)
+                    transactions = 1
+
+                with self._lock:
+                    self._stats["written"] += written
+                    self._stats["transactions"] += transactions
+
+            # the writer thread keeps running, the exception is raised by the next flush()
+            except Exception as error:
+                with self._lock:
+                    self._stats["errors"] += 1
+                    self._error = self._error or error
+
+    def _raise_error(self) -> None:
+        """
+        Raise the first exception of the writer since the last call
+
+        :raises CustomException: If Exception occurred while writing
+        """
+
+        with self._lock:
+            error, self._error = self._error, None
+
+        if error is not None:
+            raise error
+
+    def flush(self, timeout: float | None = None) -> None:
+        """
+        Wait until every row queued before was written
+
+        :param timeout: seconds to wait (None: no timeout)
+        :return:
+        :raises CustomException: If Exception occurred while writing the queued rows
+        :raises DatabaseException: if the rows were not written within the timeout
+        """
+
+        if self._thread is None or not self._thread.is_alive():
+            self._raise_error()
+            return
+
+        written = threading.Event()
+        self._queue.put(written)
+        if not written.wait(timeout):
+            raise DatabaseException(error_message="Write queue was not flushed", more_infos=f"{self._queue.qsize()} entries are still queued after {timeout} seconds")
+
+        self._raise_error()
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Write every queued row and stop the writer thread, rows queued afterwards are rejected
+
+        :param timeout: seconds to wait for the writer (None: no timeout)
+        :return:
+        :raises CustomException: If Exception occurred while writing the queued rows
+        """
+
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+        self._raise_error()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        :return: Dict containing the statistics, in the form of {'queued': ..., 'written': ..., 'coalesced': ..., 'transactions': ..., 'blocked': ..., 'errors': ..., 'pending': ...}
+        """
+
+        with self._lock:
+            return self._stats | {"pending": self._queue.qsize()}
+
+
+WRITE_QUEUE = WriteBehindQueue(APP_DATABASE)
+
+
+if __name__ == '__main__':
+    """"""
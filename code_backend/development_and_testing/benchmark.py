@@ -0,0 +1,277 @@
+"""
+    Small benchmark runner used by dev_bench_1.py (Web API), dev_bench_2.py (database) and dev_bench_3.py (playlist organization, images)
+
+    Every run is saved as JSON in development_and_testing/benchmark_results/runs/ and compared against the stored baseline of its suite, so regressions of throughput and latency show up::
+
+        python -m code_backend.development_and_testing.dev_bench_2                  # run and compare against the baseline
+        python -m code_backend.development_and_testing.dev_bench_2 --save-baseline  # run and store the results as new baseline
+        python -m code_backend.development_and_testing.benchmark                    # run every suite
+"""
+
+import argparse
+import logging
+import math
+import platform
+import statistics
+from datetime import datetime
+
+from code_backend.shared_config import *
+from code_backend.exceptions import InputException
+
+
+BENCHMARK_RESULTS_PATH = os.path.join(ROOT_DIR_PATH, 'code_backend', 'development_and_testing', 'benchmark_results')  # baselines (<suite>_baseline.json)
+BENCHMARK_RUNS_PATH = os.path.join(BENCHMARK_RESULTS_PATH, 'runs')  # results of every run, not versioned
+BENCHMARK_REPEAT = 5  # timed runs per benchmark (after one warm-up run)
+BENCHMARK_TOLERANCE = 0.2  # relative slowdown of the p50 latency (and loss of throughput) reported as regression
+
+# request log of the local stand-in server
+logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Timings of one benchmark, latencies in seconds per run
+    """
+
+    name: str
+    runs: int
+    items: int
+    mean: float
+    p50: float
+    p95: float
+    throughput: float  # items per second, based on the p50 latency
+
+
+def _percentile(timings: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile
+
+    :param timings: measured timings
+    :param percent: 0 < percent <= 100
+    :return: timing of the percentile
+    """
+
+    ordered = sorted(timings)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class BenchmarkSuite:
+    """
+    Collects the results of related benchmarks, saves them and compares them against a baseline
+    """
+
+    def __init__(self, suite_name: str, results_path: str = BENCHMARK_RESULTS_PATH) -> None:
+        """
+        :param suite_name: name of the suite, used for the result files (e.g. 'database')
+        :param results_path: directory containing the baseline files, the results of every run are saved in its subdirectory 'runs'
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(suite_name, str) or not re.fullmatch(r"[a-z0-9_]+", suite_name):
+            raise InputException(item_value=suite_name, valid_values="lowercase letters, digits and '_'", valid_types=str)
+
+        self.suite_name: str = suite_name
+        self.results_path: str = results_path
+        self.results: dict[str, BenchmarkResult] = {}
+
+    def run(
+            self,
+            name: str,
+            function: Callable,
+            repeat: int = BENCHMARK_REPEAT,
+            items: int = 1,
+            setup: Callable[[], tuple] | None = None
+    ) -> BenchmarkResult:
+        """
+        Time a function. It is called once as warm-up and `repeat` times timed
+
+        :param name: name of the benchmark (unique within the suite)
+        :param function: function to time
+        :param repeat: number of timed runs
+        :param items: number of items processed by one call of function (used for the throughput)
+        :param setup: not timed, called before every run; the returned tuple is passed as arguments to function (e.g. a fresh copy of a list that gets consumed)
+        :return: BenchmarkResult
+        :raises InputException: if input is invalid
+        """
+
+        if not callable(function):
+            raise InputException(item_value=function, valid_values="any function", valid_types=Callable)
+
+        if not isinstance(repeat, int) or repeat < 1:
+            raise InputException(item_value=repeat, valid_values="positive integer", valid_types=int)
+
+        if not isinstance(items, int) or items < 1:
+            raise InputException(item_value=items, valid_values="positive integer", valid_types=int)
+
+        timings = []
+        for run_index in range(repeat + 1):
+            arguments = setup() if setup is not None else ()
+
+            start = time.perf_counter()
+            function(*arguments)
+            duration = time.perf_counter() - start
+
+            # the first run fills caches, connection pools, ... and is not part of the result
+            if run_index > 0:
+                timings.append(duration)
+
+        p50 = _percentile(timings, 50)
+        result = BenchmarkResult(
+            name=name,
+            runs=repeat,
+            items=items,
+            mean=statistics.fmean(timings),
+            p50=p50,
+            p95=_percentile(timings, 95),
+            throughput=items / p50 if p50 > 0 else float("inf")
+        )
+        self.results[name] = result
+
+        print(f"{name:<45} p50 {result.p50 * 1000:>10.3f} ms   p95 {result.p95 * 1000:>10.3f} ms   {result.throughput:>12.1f} items/s")
+        return result
+
+    def to_dict(self) -> dict:
+        """
+        :return: Dict containing the suite, in the form of {'suite': ..., 'created': ..., 'python': ..., 'results': {name: result}}
+        """
+
+        return {
+            "suite": self.suite_name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "results": {name: vars(result) for name, result in self.results.items()}
+        }
+
+    def save(self) -> str:
+        """
+        Save the results of this run as runs/<suite>_<timestamp>.json
+
+        :return: path of the result file
+        """
+
+        runs_path = os.path.join(self.results_path, "runs")
+        os.makedirs(runs_path, exist_ok=True)
+        file_path = os.path.join(runs_path, f"{self.suite_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+        with open(file_path, "w", encoding="utf-8") as result_file:
+            json.dump(self.to_dict(), result_file, indent=4)
+
+        return file_path
+
+    @property
+    def baseline_path(self) -> str:
+        """
+        :return: path of the baseline file of this suite
+        """
+
+        return os.path.join(self.results_path, f"{self.suite_name}_baseline.json")
+
+    def save_baseline(self) -> str:
+        """
+        Store the results of this run as baseline of the suite (overwrites the previous baseline)
+
+        :return: path of the baseline file
+        """
+
+        os.makedirs(self.results_path, exist_ok=True)
+
+        with open(self.baseline_path, "w", encoding="utf-8") as baseline_file:
+            json.dump(self.to_dict(), baseline_file, indent=4)
+
+        return self.baseline_path
+
+    def load_baseline(self) -> dict[str, BenchmarkResult] | None:
+        """
+        :return: Dict containing the baseline results, in the form of {name: BenchmarkResult} (None if no baseline is stored)
+        """
+
+        if not os.path.isfile(self.baseline_path):
+            return None
+
+        with open(self.baseline_path, "r", encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+        return {name: BenchmarkResult(**result) for name, result in baseline["results"].items()}
+
+    def compare(self, baseline: dict[str, BenchmarkResult] | None = None, tolerance: float = BENCHMARK_TOLERANCE) -> list[str]:
+        """
+        Compare the results of this run against a baseline and print the changes
+
+        :param baseline: Dict containing the baseline results, in the form of {name: BenchmarkResult} (default: stored baseline of the suite)
+        :param tolerance: relative slowdown of p50 latency/throughput still accepted (0.2: 20% slower)
+        :return: List containing the names of the regressed benchmarks
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(tolerance, (int, float)) or tolerance < 0:
+            raise InputException(item_value=tolerance, valid_values="0 <= tolerance", valid_types=(int, float))
+
+        baseline = baseline if baseline is not None else self.load_baseline()
+        if baseline is None:
+            print(f"{CYELLOW}No baseline stored for suite '{self.suite_name}' (run with --save-baseline){TEXTCOLOR}")
+            return []
+
+        regressions = []
+        for name, result in self.results.items():
+            if name not in baseline:
+                print(f"{name:<45} {CYELLOW}not part of the baseline{TEXTCOLOR}")
+                continue
+
+            latency_change = result.p50 / baseline[name].p50 - 1 if baseline[name].p50 > 0 else 0.0
+            throughput_change = result.throughput / baseline[name].throughput - 1 if baseline[name].throughput > 0 else 0.0
+
+            if latency_change > tolerance or throughput_change < -tolerance:
+                regressions.append(name)
+                color = CRED
+            elif latency_change < -tolerance:
+                color = CGREEN
+            else:
+                color = TEXTCOLOR
+
+            print(f"{color}{name:<45} p50 {latency_change:>+8.1%}   throughput {throughput_change:>+8.1%}{TEXTCOLOR}")
+
+        return regressions
+
+
+def main(suite_name: str, register: Callable[[BenchmarkSuite, int], None], arguments: list[str] | None = None) -> list[str]:
+    """
+    Command line entry point of a benchmark file: run the benchmarks, save the results and compare them against the baseline
+
+    :param suite_name: name of the suite
+    :param register: function running the benchmarks, called as register(suite, repeat)
+    :param arguments: command line arguments (default: sys.argv)
+    :return: List containing the names of the regressed benchmarks
+    """
+
+    parser = argparse.ArgumentParser(description=f"Benchmarks '{suite_name}'")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="timed runs per benchmark")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE, help="accepted relative slowdown before a benchmark counts as regression")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as new baseline")
+    parsed = parser.parse_args(arguments)
+
+    suite = BenchmarkSuite(suite_name)
+    print(f"{TBOLD}Benchmark suite '{suite_name}'{TEND}")
+    register(suite, parsed.repeat)
+
+    print(f"Results saved to '{suite.save()}'")
+    if parsed.save_baseline:
+        print(f"Baseline saved to '{suite.save_baseline()}'")
+        return []
+
+    regressions = suite.compare(tolerance=parsed.tolerance)
+    if regressions:
+        print(f"{CRED}{len(regressions)} regression(s): {', '.join(regressions)}{TEXTCOLOR}")
+    return regressions
+
+
+if __name__ == '__main__':
+    """"""
+    from code_backend.development_and_testing import dev_bench_1, dev_bench_2, dev_bench_3
+
+    all_regressions = []
+    for bench_module in (dev_bench_1, dev_bench_2, dev_bench_3):
+        all_regressions += main(bench_module.SUITE_NAME, bench_module.run_benchmarks)
+
+    sys.exit(1 if all_regressions else 0)
@@ -2,10 +2,114 @@
 File to develop and debug methods, class and more
 
 Currently developing:
+    Benchmarks of the Web API layer (api_request_data overhead, paginated fetches), run against the local stand-in server (fake_spotify_server.py)
 """
+import tempfile
+from contextlib import contextmanager
+
 from code_backend.shared_config import *
 from code_backend.secondary_methods import *
+import code_backend.spotify_web_api as spotify
+from code_backend.http_client import HttpClient, TokenBucket
+from code_backend.response_cache import ResponseCache
+from code_backend.token_manager import TokenManager
+from code_backend.development_and_testing.fake_spotify_server import FakeSpotifyServer, FakeCatalog
+from code_backend.development_and_testing.benchmark import BenchmarkSuite, main
+
+
+SUITE_NAME = "web_api"
+BENCH_TOKEN_KEY = "BENCH_TOKEN"
+
+
+@contextmanager
+def fake_api(server: FakeSpotifyServer, cache_file: str, cache_enabled: bool):
+    """
+    Point spotify_web_api to the running stand-in server, with a fake token and without rate limit (restored afterward)
+
+    :param server: running FakeSpotifyServer
+    :param cache_file: file of the response cache
+    :param cache_enabled: whether GET requests use the response cache
+    """
+
+    os.environ[BENCH_TOKEN_KEY] = json.dumps({"access_token": "bench", "token_type": "Bearer", "expires": int(time.time()) + 3600})
+    original = (spotify.SPOTIFY_API_URL, spotify.REGULAR_TOKEN_MANAGER, spotify.RESPONSE_CACHE)
+
+    # the token bucket would measure RATE_LIMIT_PER_SECOND instead of the client
+    http_client = HttpClient(rate_limiter=TokenBucket(rate=1_000_000, capacity=1_000_000))
+    response_cache = ResponseCache(cache_file=cache_file, http_client=http_client, enabled=cache_enabled)
+
+    spotify.SPOTIFY_API_URL = server.base_url
+    spotify.REGULAR_TOKEN_MANAGER = TokenManager(BENCH_TOKEN_KEY)
+    spotify.RESPONSE_CACHE = response_cache
+    try:
+        yield
+
+    finally:
+        spotify.SPOTIFY_API_URL, spotify.REGULAR_TOKEN_MANAGER, spotify.RESPONSE_CACHE = original
+        response_cache.close()
+        http_client.close()
+        os.environ.pop(BENCH_TOKEN_KEY, None)
+
+
+def run_benchmarks(suite: BenchmarkSuite, repeat: int) -> None:
+    """
+    :param suite: suite collecting the results
+    :param repeat: timed runs per benchmark
+    """
+
+    catalog = FakeCatalog(artist_count=40, playlist_count=3, tracks_per_playlist=1000, seed=10)
+    server = FakeSpotifyServer(catalog)
+    server.start()
+
+    album_id = next(iter(catalog.albums.keys()))
+    playlist_id = next(iter(catalog.playlists.keys()))
+    track_ids = list(catalog.tracks.keys())[:50]
+    request_count = 50
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # baseline of the overhead: plain requests on a keep-alive session
+            with requests.Session() as session:
+                album_url = f"{server.base_url}/albums/{album_id}"
+                suite.run(
+                    "raw_requests_get",
+                    lambda: [session.get(album_url, headers={"Authorization": "Bearer bench"}).json() for _ in range(request_count)],
+                    repeat=repeat,
+                    items=request_count
+                )
+
+            with fake_api(server, os.path.join(temp_dir, "uncached.db"), cache_enabled=False):
+                suite.run(
+                    "api_request_data_get",
+                    lambda: [spotify.api_request_data(f"{spotify.SPOTIFY_API_URL}/albums/{album_id}", "GET") for _ in range(request_count)],
+                    repeat=repeat,
+                    items=request_count
+                )
+                suite.run(
+                    "get_several_tracks_50",
+                    lambda: spotify.get_several_tracks(track_ids),
+                    repeat=repeat,
+                    items=len(track_ids)
+                )
+                suite.run(
+                    "get_playlist_items_1000_paginated",
+                    lambda: spotify.get_playlist_items(playlist_id),
+                    repeat=repeat,
+                    items=len(catalog.playlist_tracks[playlist_id])
+                )
+
+            with fake_api(server, os.path.join(temp_dir, "cached.db"), cache_enabled=True):
+                suite.run(
+                    "api_request_data_get_cache_hit",
+                    lambda: [spotify.api_request_data(f"{spotify.SPOTIFY_API_URL}/albums/{album_id}", "GET") for _ in range(request_count)],
+                    repeat=repeat,
+                    items=request_count
+                )
+
+    finally:
+        server.stop()
 
 
 if __name__ == '__main__':
-    """"""
\ No newline at end of file
+    """"""
+    main(SUITE_NAME, run_benchmarks)
@@ -1,7 +1,375 @@
 """
 File to develop and debug methods, class and more
+
+Currently developing:
+    Benchmarks of the database layer (add_item_to_table, upsert_items, write-behind queue, fetch_row/fetch_column, model classes, JSON fields, blacklist checks, local search, Parquet export, ItemQueues.update_queues), run on a temporary database filled with synthetic rows
 """
+import shutil
+import tempfile
+from contextlib import contextmanager
+
 from code_backend.spotify_web_api import *
+import code_backend.music_classes as music_classes
+from code_backend.database_access import MyAppDatabase
+from code_backend.blacklist import Blacklist
+from code_backend.database_writer import WriteBehindQueue
+import code_backend.database_export as database_export
+from code_backend.secondary_methods import load_dict_from_database
+from code_backend.development_and_testing.benchmark import BenchmarkSuite, main, BENCHMARK_RUNS_PATH
+
+
+SUITE_NAME = "database"
+
+
+class SyntheticRows:
+    """
+    Generates rows in the format the New* classes of music_classes.py write to the database
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        """
+        :param seed: seed of the random generator, the same seed generates the same rows
+        """
+
+        self.random = random.Random(seed)
+
+    def new_id(self) -> str:
+        """
+        :return: random Spotify ID
+        """
+
+        return "".join(self.random.choices(string.ascii_letters + string.digits, k=22))
+
+    def _base(self, item_type: str, item_id: str) -> dict:
+        return {
+            f"{item_type}_id": item_id,
+            f"{item_type}_name": f"{item_type} {item_id[:6]}",
+            f"{item_type}_uri": f"spotify:{item_type}:{item_id}",
+            f"{item_type}_url": f"https://open.spotify.com/{item_type}/{item_id}",
+            # shortened base64 JPEG, the real images are ~10-60 kB
+            f"{item_type}_image": base64.b64encode(self.random.randbytes(2048)).decode(),
+            "popularity": MAX_POPULARITY,
+            "blacklisted": 0,
+            f"{item_type}_json": {"id": item_id, "type": item_type, "uri": f"spotify:{item_type}:{item_id}"}
+        }
+
+    def album(self, artist_ids: list[str], track_ids: list[str]) -> dict:
+        return self._base("album", self.new_id()) | {
+            "genre_names": [], "total_duration": 180_000 * len(track_ids), "track_count": len(track_ids),
+            "artist_ids": artist_ids, "track_ids": track_ids
+        }
+
+    def artist(self, album_ids: list[str], top_track_ids: list[str]) -> dict:
+        return self._base("artist", self.new_id()) | {
+            "genre_names": [], "follower": self.random.randint(0, 10_000_000),
+            "album_ids": album_ids, "playlist_ids": [], "top_track_ids": top_track_ids
+        }
+
+    def track(self, album_id: str, artist_ids: list[str]) -> dict:
+        track = self._base("track", self.new_id()) | {
+            "genre_names": [], "track_duration": self.random.randint(60_000, 400_000),
+            "album_id": album_id, "artist_ids": artist_ids, "playlist_ids": []
+        }
+        track["track_json"] |= {
+            "explicit": self.random.random() < 0.2, "popularity": self.random.randint(0, 100),
+            "album": {"id": album_id, "release_date": f"{self.random.randint(1960, 2024)}-01-01"},
+            "artists": [{"id": artist_id, "uri": f"spotify:artist:{artist_id}"} for artist_id in artist_ids]
+        }
+        return track
+
+    def playlist(self, owner_id: str, track_ids: list[str]) -> dict:
+        return self._base("playlist", self.new_id()) | {
+            "genre_names": [], "total_duration": 180_000 * len(track_ids), "track_count": len(track_ids),
+            "owner_id": owner_id, "track_ids": track_ids
+        }
+
+    def user(self, playlist_ids: list[str], top_artist_ids: list[str], top_track_ids: list[str]) -> dict:
+        return self._base("user", self.new_id()) | {
+            "top_genre_names": [], "follower": self.random.randint(0, 1000),
+            "playlist_ids": playlist_ids, "top_artist_ids": top_artist_ids, "top_track_ids": top_track_ids
+        }
+
+
+def fill_database(database: MyAppDatabase, rows: SyntheticRows, artist_count: int, albums_per_artist: int = 3, tracks_per_album: int = 12) -> dict[str, list[str]]:
+    """
+    Fill the database with a connected catalog, about 10% of the referenced ids have no row (these end up in the queues of ItemQueues)
+
+    :param database: database to fill
+    :param rows: row generator
+    :param artist_count: number of artists
+    :param albums_per_artist: albums per artist
+    :param tracks_per_album: tracks per album
+    :return: Dict containing the stored ids, in the form of {table_name: [ids]}
+    """
+
+    stored = {"albums": [], "artists": [], "tracks": [], "playlists": [], "users": []}
+
+    for _ in range(artist_count):
+        artist_id = rows.new_id()
+        album_ids = []
+        top_track_ids = []
+
+        for _ in range(albums_per_artist):
+            album_id = rows.new_id()
+            tracks = [rows.track(album_id, [artist_id]) for _ in range(tracks_per_album)]
+            for current_track in tracks:
+                database.add_item_to_table(table_name="tracks", **current_track)
+                stored["tracks"].append(current_track["track_id"])
+
+            # unknown featured artists
+            album = rows.album([artist_id] + [rows.new_id() for _ in range(rows.random.random() < 0.3)], [current_track["track_id"] for current_track in tracks])
+            album["album_id"] = album_id
+            database.add_item_to_table(table_name="albums", **album)
+            stored["albums"].append(album_id)
+            album_ids.append(album_id)
+            top_track_ids.append(tracks[0]["track_id"])
+
+        artist = rows.artist(album_ids + [rows.new_id()], top_track_ids)
+        artist["artist_id"] = artist_id
+        database.add_item_to_table(table_name="artists", **artist)
+        stored["artists"].append(artist_id)
+
+    for _ in range(max(artist_count // 10, 1)):
+        owner_id = rows.new_id()
+        playlist = rows.playlist(owner_id, rows.random.sample(stored["tracks"], min(100, len(stored["tracks"]))) + [rows.new_id() for _ in range(10)])
+        database.add_item_to_table(table_name="playlists", **playlist)
+        stored["playlists"].append(playlist["playlist_id"])
+
+        user = rows.user([playlist["playlist_id"]], rows.random.sample(stored["artists"], min(10, len(stored["artists"]))), rows.random.sample(stored["tracks"], min(50, len(stored["tracks"]))))
+        user["user_id"] = owner_id
+        database.add_item_to_table(table_name="users", **user)
+        stored["users"].append(owner_id)
+
+    return stored
+
+
+@contextmanager
+def temporary_database():
+    """
+    Create an initialized MyAppDatabase in a temporary directory, which is used as APP_DATABASE of music_classes.py meanwhile
+
+    :return: MyAppDatabase
+    """
+
+    # DatabaseAccess only accepts paths inside the project (absolute_path())
+    os.makedirs(BENCHMARK_RUNS_PATH, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=BENCHMARK_RUNS_PATH) as temp_dir:
+        database_file = os.path.join(temp_dir, "bench_database.db")
+        open(database_file, "w").close()
+
+        database = MyAppDatabase(database_file)
+        database.initialize_tables()
+
+        original_database = music_classes.APP_DATABASE
+        music_classes.APP_DATABASE = database
+        database.add_change_listener(music_classes.MODEL_CACHE.invalidate)
+        music_classes.MODEL_CACHE.clear()
+        try:
+            yield database
+
+        finally:
+            music_classes.APP_DATABASE = original_database
+            music_classes.MODEL_CACHE.clear()
+            database.close()
+
+
+def run_benchmarks(suite: BenchmarkSuite, repeat: int) -> None:
+    """
+    :param suite: suite collecting the results
+    :param repeat: timed runs per benchmark
+    """
+
+    rows = SyntheticRows(seed=20)
+    insert_count = 500
+
+    with temporary_database() as database:
+        def insert_tracks(tracks: list[dict]):
+            for current_track in tracks:
+                database.add_item_to_table(table_name="tracks", **current_track)
+
+        suite.run(
+            "add_item_to_table_tracks",
+            insert_tracks,
+            repeat=repeat,
+            items=insert_count,
+            setup=lambda: ([rows.track(rows.new_id(), [rows.new_id()]) for _ in range(insert_count)],)
+        )
+        suite.run(
+            "add_items_to_table_tracks_bulk",
+            lambda tracks: database.add_items_to_table(table_name="tracks", rows=tracks),
+            repeat=repeat,
+            items=insert_count,
+            setup=lambda: ([rows.track(rows.new_id(), [rows.new_id()]) for _ in range(insert_count)],)
+        )
+
+        # periodic refresh of a library: most items are unchanged, some got new values
+        refreshed_tracks = [rows.track(rows.new_id(), [rows.new_id()]) for _ in range(insert_count)]
+        database.upsert_items(table_name="tracks", rows=refreshed_tracks)
+
+        def changed_tracks() -> tuple:
+            for current_track in rows.random.sample(refreshed_tracks, insert_count // 10):
+                current_track["track_json"]["popularity"] = rows.random.randint(0, 100)
+            return refreshed_tracks,
+
+        suite.run(
+            "upsert_items_tracks_unchanged",
+            lambda tracks: database.upsert_items(table_name="tracks", rows=tracks),
+            repeat=repeat,
+            items=insert_count,
+            setup=lambda: (refreshed_tracks,)
+        )
+        suite.run(
+            "upsert_items_tracks_10_percent_changed",
+            lambda tracks: database.upsert_items(table_name="tracks", rows=tracks),
+            repeat=repeat,
+            items=insert_count,
+            setup=changed_tracks
+        )
+
+        # rows of single items (New* classes): one upsert per item vs. queued and written by the writer thread
+        def upsert_single_tracks(tracks: list[dict]):
+            for current_track in tracks:
+                database.upsert_items(table_name="tracks", rows=[current_track])
+
+        write_queue = WriteBehindQueue(database)
+
+        def queue_single_tracks(tracks: list[dict]):
+            for current_track in tracks:
+                write_queue.put(table_name="tracks", row=current_track)
+            write_queue.flush()
+
+        suite.run(
+            "upsert_items_single_rows_inline",
+            upsert_single_tracks,
+            repeat=repeat,
+            items=insert_count,
+            setup=lambda: ([rows.track(rows.new_id(), [rows.new_id()]) for _ in range(insert_count)],)
+        )
+        suite.run(
+            "write_queue_single_rows",
+            queue_single_tracks,
+            repeat=repeat,
+            items=insert_count,
+            setup=lambda: ([rows.track(rows.new_id(), [rows.new_id()]) for _ in range(insert_count)],)
+        )
+        write_queue.close()
+
+    with temporary_database() as database:
+        stored = fill_database(database, rows, artist_count=100)
+        lookup_ids = rows.random.sample(stored["tracks"], 500)
+
+        suite.run(
+            "fetch_row_tracks",
+            lambda: [database.fetch_row(table_name="tracks", item_id=track_id) for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids)
+        )
+        suite.run(
+            "fetch_row_tracks_single_column",
+            lambda: [database.fetch_row(table_name="tracks", item_id=track_id, table_column="track_name") for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids)
+        )
+
+        def clear_model_cache() -> tuple:
+            music_classes.MODEL_CACHE.clear()
+            return ()
+
+        def uncached_tracks() -> tuple:
+            music_classes.MODEL_CACHE.clear()
+            return [music_classes.Track(track_id) for track_id in lookup_ids],
+
+        suite.run(
+            "track_model_core_columns",
+            lambda: [music_classes.Track(track_id).blacklisted for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids),
+            setup=clear_model_cache
+        )
+        suite.run(
+            "track_model_identity_map",
+            lambda: [music_classes.Track(track_id).blacklisted for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids)
+        )
+        suite.run(
+            "track_model_prefetch_json",
+            lambda tracks: music_classes.Track.prefetch(tracks, ["track_json"]),
+            repeat=repeat,
+            items=len(lookup_ids),
+            setup=uncached_tracks
+        )
+
+        track_count = len(database.fetch_column(table_name="tracks", table_column="track_id"))
+        suite.run(
+            "fetch_column_tracks",
+            lambda: database.fetch_column(table_name="tracks", table_column="artist_ids"),
+            repeat=repeat,
+            items=track_count
+        )
+
+        def explicit_tracks_parsed() -> list[str]:
+            payloads = database.fetch_rows_by_id(table_name="tracks", item_ids=stored["tracks"], table_columns=["track_json"])
+            return [track_id for track_id, (payload,) in payloads.items() if load_dict_from_database(payload).get("explicit")]
+
+        suite.run(
+            "json_field_python_parse",
+            explicit_tracks_parsed,
+            repeat=repeat,
+            items=track_count
+        )
+        suite.run(
+            "json_field_generated_column",
+            lambda: database.fetch_rows(table_name="tracks", target_column="explicit", target_value=1),
+            repeat=repeat,
+            items=track_count
+        )
+
+        # pyarrow is optional
+        if database_export.pyarrow is not None:
+            export_directory = os.path.join(os.path.dirname(database.connections.database_file), "export")
+            suite.run(
+                "export_database_parquet",
+                lambda: database_export.export_database(database, export_directory, file_format="parquet"),
+                repeat=repeat,
+                items=track_count
+            )
+
+        # blacklist decision of Player.skip_blacklisted_items() (album, collection, artist, track)
+        blacklist = Blacklist(database, blacklist_file=shutil.copy(BLACKLIST_DATABASE_PATH, os.path.dirname(database.connections.database_file)))
+        for track_id in lookup_ids[::10]:
+            blacklist.add("track", track_id)
+
+        suite.run(
+            "blacklist_check_columns",
+            lambda: [database.fetch_row(table_name="tracks", item_id=track_id, table_column="blacklisted")[0] == 1 for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids)
+        )
+        suite.run(
+            "blacklist_check_memory",
+            lambda: [blacklist.is_blacklisted("track", track_id) for track_id in lookup_ids],
+            repeat=repeat,
+            items=len(lookup_ids)
+        )
+
+        # names are '<item_type> <first 6 characters of the id>'
+        search_queries = [f"track {track_id[:3]}" for track_id in lookup_ids[:100]]
+        suite.run(
+            "search_items_local",
+            lambda: [database.search_items(search_query) for search_query in search_queries],
+            repeat=repeat,
+            items=len(search_queries)
+        )
+
+        suite.run(
+            "item_queues_update_queues",
+            lambda: music_classes.ItemQueues().update_queues(),
+            repeat=repeat,
+            items=sum(len(ids) for ids in stored.values())
+        )
+
 
 if __name__ == '__main__':
-    """"""
\ No newline at end of file
+    """"""
+    main(SUITE_NAME, run_benchmarks)
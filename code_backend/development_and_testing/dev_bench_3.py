@@ -1,8 +1,94 @@
 """
 File to develop and debug methods, class and more
+
+Currently developing:
+    Benchmarks of the playlist organization (all_shuffle, remove_duplicates) and the image encoding of secondary_methods.py, run on synthetic tracks and images
 """
 from code_backend.shared_config import *
+from code_backend.secondary_methods import image_to_b64, file_image_bytes, spotify_image_bytes
+from code_backend.organize_playlist import all_shuffle, all_shuffle_dict, remove_duplicates
+from code_backend.development_and_testing.fake_spotify_server import FakeSpotifyServer, FakeCatalog
+from code_backend.image_store import ImageStore
+from code_backend.development_and_testing.benchmark import BenchmarkSuite, main
+from code_backend.development_and_testing.dev_bench_2 import temporary_database
+
+
+SUITE_NAME = "organize_and_images"
+
+
+def synthetic_tracks(track_count: int, duplicate_share: float = 0.1, seed: int = 0) -> list[dict]:
+    """
+    Tracks in the format of remove_duplicates(), a share of them are duplicates (same name and artist, other uri)
+
+    :param track_count: number of tracks
+    :param duplicate_share: share of duplicates (0 <= duplicate_share < 1)
+    :param seed: seed of the random generator
+    :return: List containing the tracks, in the form of [{'uri': ..., 'name': ..., 'artist': ...}]
+    """
+
+    generator = random.Random(seed)
+    tracks = []
+
+    for index in range(track_count):
+        if tracks and generator.random() < duplicate_share:
+            original = generator.choice(tracks)
+            tracks.append({"uri": f"spotify:track:{index:022d}", "name": original["name"], "artist": original["artist"]})
+        else:
+            tracks.append({"uri": f"spotify:track:{index:022d}", "name": f"track {index}", "artist": f"artist {generator.randint(0, track_count // 10)}"})
+
+    return tracks
+
+
+def run_benchmarks(suite: BenchmarkSuite, repeat: int) -> None:
+    """
+    :param suite: suite collecting the results
+    :param repeat: timed runs per benchmark
+    """
+
+    # <-- organize_playlist -->
+    for track_count in (1_000, 10_000):
+        tracks = synthetic_tracks(track_count)
+        track_uris = [current_track["uri"] for current_track in tracks]
+
+        # all_shuffle() consumes the passed list
+        suite.run(f"all_shuffle_{track_count}", all_shuffle, repeat=repeat, items=track_count, setup=lambda: (list(track_uris),))
+        suite.run(
+            f"all_shuffle_dict_{track_count}",
+            all_shuffle_dict,
+            repeat=repeat,
+            items=track_count,
+            setup=lambda: ({current_track["uri"]: current_track for current_track in tracks},)
+        )
+        suite.run(f"remove_duplicates_{track_count}", lambda: remove_duplicates(tracks, get_removed=True), repeat=repeat, items=track_count)
+
+    # <-- image encoding -->
+    # cover images of the Web API are 640x640 JPEGs
+    cover = Image.effect_noise((640, 640), 64).convert("RGB")
+    suite.run("image_to_b64_jpeg_640", lambda: image_to_b64(cover, "JPEG"), repeat=repeat)
+    suite.run("image_to_b64_png_640", lambda: image_to_b64(cover, "PNG"), repeat=repeat)
+    suite.run("file_image_bytes_no_image", lambda: file_image_bytes(NO_IMAGE_PATH), repeat=repeat)
+
+    server = FakeSpotifyServer(FakeCatalog(artist_count=1))
+    server.start()
+    image_urls = [f"{server.base_url.removesuffix('/v1')}/images/{index}.jpg" for index in range(20)]
+    try:
+        suite.run("spotify_image_bytes_fake_server", lambda: [spotify_image_bytes(image_url) for image_url in image_urls], repeat=repeat, items=len(image_urls))
+
+        # covers of 20 tracks from 2 albums, stored in a fresh image store every run
+        track_cover_urls = image_urls[:2] * 10
+        with temporary_database() as database:
+            suite.run(
+                "image_store_track_covers_fake_server",
+                lambda store: [store.put_url(image_url) for image_url in track_cover_urls],
+                repeat=repeat,
+                items=len(track_cover_urls),
+                setup=lambda: (ImageStore(database),)
+            )
+
+    finally:
+        server.stop()
 
 
 if __name__ == '__main__':
-    """"""
\ No newline at end of file
+    """"""
+    main(SUITE_NAME, run_benchmarks)
@@ -0,0 +1,528 @@
+"""
+    Local stand-in for the Spotify Web API (Flask), serving a generated catalog for offline load tests and benchmarks
+
+    Usage::
+
+        server = FakeSpotifyServer(FakeCatalog(artist_count=20), latency=0.01)
+        base_url = server.start()   # e.g. http://127.0.0.1:50123/v1
+        ...                         # run the backend with SPOTIFY_API_URL=base_url
+        server.stop()
+
+    Standalone: ``python -m code_backend.development_and_testing.fake_spotify_server --port 8090``, afterward set ``SPOTIFY_API_URL=http://127.0.0.1:8090/v1`` in .env
+"""
+
+import argparse
+
+from flask import abort
+from werkzeug.serving import make_server
+
+from code_backend.shared_config import *
+from code_backend.exceptions import InputException
+
+
+# replaced by the host of the server in every response, so image urls point to the running server
+_HOST_PLACEHOLDER = "http://fake-spotify.local/"
+
+
+class FakeCatalog:
+    """
+    Deterministic catalog of artists, albums, tracks, playlists and users in the form of Spotify Web API objects
+    """
+
+    def __init__(
+            self,
+            artist_count: int = 20,
+            albums_per_artist: int = 3,
+            tracks_per_album: int = 12,
+            playlist_count: int = 5,
+            tracks_per_playlist: int = 120,
+            user_count: int = 3,
+            seed: int = 0
+    ) -> None:
+        """
+        :param artist_count: number of generated artists
+        :param albums_per_artist: number of albums per artist
+        :param tracks_per_album: number of tracks per album
+        :param playlist_count: number of generated playlists
+        :param tracks_per_playlist: number of tracks per playlist (may contain a track more than once if the catalog is smaller)
+        :param user_count: number of generated users (owners of the playlists)
+        :param seed: seed of the random generator, the same seed generates the same catalog
+        :raises InputException: if input is invalid
+        """
+
+        for current_value in (artist_count, albums_per_artist, tracks_per_album, playlist_count, tracks_per_playlist, user_count):
+            if not isinstance(current_value, int) or current_value < 1:
+                raise InputException(item_value=current_value, valid_values="positive integer", valid_types=int)
+
+        self._random = random.Random(seed)
+
+        self.users: dict[str, dict] = {}
+        self.artists: dict[str, dict] = {}
+        self.albums: dict[str, dict] = {}
+        self.tracks: dict[str, dict] = {}
+        self.playlists: dict[str, dict] = {}
+        self.album_tracks: dict[str, list[str]] = {}
+        self.artist_albums: dict[str, list[str]] = {}
+        self.playlist_tracks: dict[str, list[str]] = {}
+        self.user_playlists: dict[str, list[str]] = {}
+
+        for index in range(user_count):
+            self._add_user(index)
+
+        for index in range(artist_count):
+            artist_id = self._add_artist(index)
+            for album_index in range(albums_per_artist):
+                self._add_album(artist_id, album_index, tracks_per_album)
+
+        track_ids = list(self.tracks.keys())
+        user_ids = list(self.users.keys())
+        for index in range(playlist_count):
+            if tracks_per_playlist <= len(track_ids):
+                playlist_track_ids = self._random.sample(track_ids, tracks_per_playlist)
+            else:
+                playlist_track_ids = self._random.choices(track_ids, k=tracks_per_playlist)
+            self._add_playlist(index, user_ids[index % len(user_ids)], playlist_track_ids)
+
+    def _new_id(self) -> str:
+        """
+        :return: random base62 Spotify ID (22 characters)
+        """
+
+        return "".join(self._random.choices(string.digits + string.ascii_letters, k=22))
+
+    @staticmethod
+    def _simple(item_type: str, item_id: str, name: str) -> dict:
+        """
+        :return: fields every Spotify object contains
+        """
+
+        return {
+            "external_urls": {"spotify": f"https://open.spotify.com/{item_type}/{item_id}"},
+            "href": f"{_HOST_PLACEHOLDER}v1/{item_type}s/{item_id}",
+            "id": item_id,
+            "name": name,
+            "type": item_type,
+            "uri": f"spotify:{item_type}:{item_id}"
+        }
+
+    @staticmethod
+    def _images(item_id: str) -> list[dict]:
+        return [{"url": f"{_HOST_PLACEHOLDER}images/{item_id}.jpg", "height": 64, "width": 64}]
+
+    def _add_user(self, index: int) -> None:
+        user_id = f"fake_user_{index}"
+        user = self._simple("user", user_id, user_id)
+        user.pop("name")
+        user.update({"display_name": f"Fake User {index}", "followers": {"href": None, "total": self._random.randint(0, 1000)}, "images": self._images(user_id)})
+
+        self.users[user_id] = user
+        self.user_playlists[user_id] = []
+
+    def _add_artist(self, index: int) -> str:
+        artist_id = self._new_id()
+        artist = self._simple("artist", artist_id, f"Fake Artist {index}")
+        artist.update({
+            "followers": {"href": None, "total": self._random.randint(0, 10 ** 6)},
+            "genres": [],
+            "images": self._images(artist_id),
+            "popularity": self._random.randint(0, 100)
+        })
+
+        self.artists[artist_id] = artist
+        self.artist_albums[artist_id] = []
+        return artist_id
+
+    def _add_album(self, artist_id: str, index: int, track_count: int) -> None:
+        album_id = self._new_id()
+        artist = self.artists[artist_id]
+        simple_artist = {key: artist[key] for key in ("external_urls", "href", "id", "name", "type", "uri")}
+
+        album = self._simple("album", album_id, f"{artist['name']} - Album {index}")
+        album.update({
+            "album_type": "album",
+            "artists": [simple_artist],
+            "images": self._images(album_id),
+            "release_date": f"{2000 + index}-01-01",
+            "release_date_precision": "day",
+            "total_tracks": track_count
+        })
+        simple_album = dict(album)
+
+        album_track_ids = []
+        for track_number in range(1, track_count + 1):
+            track_id = self._new_id()
+            track = self._simple("track", track_id, f"{album['name']} - Track {track_number}")
+            track.update({
+                "album": simple_album,
+                "artists": [simple_artist],
+                "disc_number": 1,
+                "duration_ms": self._random.randint(90_000, 360_000),
+                "explicit": False,
+                "external_ids": {"isrc": f"FAKE{track_id[:8].upper()}"},
+                "is_local": False,
+                "is_playable": True,
+                "popularity": self._random.randint(0, 100),
+                "track_number": track_number
+            })
+            self.tracks[track_id] = track
+            album_track_ids.append(track_id)
+
+        album.update({"copyrights": [], "external_ids": {}, "genres": [], "label": "Fake Label", "popularity": self._random.randint(0, 100)})
+        self.albums[album_id] = album
+        self.album_tracks[album_id] = album_track_ids
+        self.artist_albums[artist_id].append(album_id)
+
+    def _add_playlist(self, index: int, owner_id: str, track_ids: list[str]) -> None:
+        playlist_id = self._new_id()
+        owner = self.users[owner_id]
+
+        playlist = self._simple("playlist", playlist_id, f"Fake Playlist {index}")
+        playlist.update({
+            "collaborative": False,
+            "description": "generated by fake_spotify_server.py",
+            "images": self._images(playlist_id),
+            "owner": {key: owner[key] for key in ("display_name", "external_urls", "href", "id", "type", "uri")},
+            "public": True,
+            "snapshot_id": self._new_id(),
+            "tracks": {"href": f"{_HOST_PLACEHOLDER}v1/playlists/{playlist_id}/tracks", "total": len(track_ids)}
+        })
+
+        self.playlists[playlist_id] = playlist
+        self.playlist_tracks[playlist_id] = track_ids
+        self.user_playlists[owner_id].append(playlist_id)
+
+
+class FakeSpotifyServer:
+    """
+    Flask server answering Spotify Web API requests using a `FakeCatalog`.
+
+    Supports single and several item endpoints, offset paging (`limit` <= 50), ETags (`If-None-Match` -> 304), artificial latency and throttling (every `throttle_every`-th request returns 429 with `Retry-After`). Latency and throttling can be changed while the server is running.
+    """
+
+    def __init__(
+            self,
+            catalog: FakeCatalog | None = None,
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            throttle_every: int | None = None,
+            retry_after: int = 1
+    ) -> None:
+        """
+        :param catalog: served catalog (None: FakeCatalog with default size)
+        :param latency: seconds every request is delayed
+        :param latency_jitter: maximum additional random delay in seconds
+        :param throttle_every: every n-th request is answered with 429 (None: never)
+        :param retry_after: value of the Retry-After header of 429 responses in seconds
+        :raises InputException: if input is invalid
+        """
+
+        if catalog is not None and not isinstance(catalog, FakeCatalog):
+            raise InputException(item_value=catalog, valid_values="FakeCatalog(...)", valid_types=(FakeCatalog, None))
+
+        if throttle_every is not None and (not isinstance(throttle_every, int) or throttle_every < 1):
+            raise InputException(item_value=throttle_every, valid_values="positive integer or None", valid_types=(int, None))
+
+        self.catalog: FakeCatalog = catalog if catalog is not None else FakeCatalog()
+        self.latency: float = latency
+        self.latency_jitter: float = latency_jitter
+        self.throttle_every: int | None = throttle_every
+        self.retry_after: int = retry_after
+
+        self.stats: dict[str, int] = {"requests": 0, "throttled": 0, "not_modified": 0}
+        self._stats_lock = threading.Lock()
+        self._server = None
+        self._thread: threading.Thread | None = None
+
+        self.app: Flask = self.create_app()
+
+    def create_app(self) -> Flask:
+        """
+        Create the Flask app with every supported endpoint
+
+        :return: Flask app
+        """
+
+        app = Flask(__name__)
+        catalog = self.catalog
+
+        @app.before_request
+        def simulate_network():
+            with self._stats_lock:
+                self.stats["requests"] += 1
+                request_number = self.stats["requests"]
+
+            if self.latency or self.latency_jitter:
+                time.sleep(self.latency + random.uniform(0, self.latency_jitter))
+
+            if request.path.startswith("/images/"):
+                return None
+
+            if self.throttle_every and request_number % self.throttle_every == 0:
+                with self._stats_lock:
+                    self.stats["throttled"] += 1
+                response = self._error(429, "API rate limit exceeded")
+                response.headers["Retry-After"] = str(self.retry_after)
+                return response
+
+            if not request.headers.get("Authorization"):
+                return self._error(401, "No token provided")
+
+        # <-- albums -->
+        @app.get("/v1/albums/<album_id>")
+        def album(album_id):
+            return self._json(self._full_album(self._lookup(catalog.albums, album_id)))
+
+        @app.get("/v1/albums")
+        def several_albums():
+            return self._json({"albums": [self._full_album(catalog.albums.get(album_id)) for album_id in self._ids(20)]})
+
+        @app.get("/v1/albums/<album_id>/tracks")
+        def album_tracks(album_id):
+            self._lookup(catalog.albums, album_id)
+            return self._json(self._page([self._simple_track(track_id) for track_id in catalog.album_tracks[album_id]]))
+
+        # <-- artists -->
+        @app.get("/v1/artists/<artist_id>")
+        def artist(artist_id):
+            return self._json(self._lookup(catalog.artists, artist_id))
+
+        @app.get("/v1/artists")
+        def several_artists():
+            return self._json({"artists": [catalog.artists.get(artist_id) for artist_id in self._ids(50)]})
+
+        @app.get("/v1/artists/<artist_id>/albums")
+        def artist_albums(artist_id):
+            self._lookup(catalog.artists, artist_id)
+            return self._json(self._page([self._simple_album(album_id) for album_id in catalog.artist_albums[artist_id]]))
+
+        @app.get("/v1/artists/<artist_id>/top-tracks")
+        def artist_top_tracks(artist_id):
+            self._lookup(catalog.artists, artist_id)
+            track_ids = [track_id for album_id in catalog.artist_albums[artist_id] for track_id in catalog.album_tracks[album_id]]
+            top_tracks = sorted((catalog.tracks[track_id] for track_id in track_ids), key=lambda track: -track["popularity"])[:10]
+            return self._json({"tracks": top_tracks})
+
+        # <-- tracks -->
+        @app.get("/v1/tracks/<track_id>")
+        def track(track_id):
+            return self._json(self._lookup(catalog.tracks, track_id))
+
+        @app.get("/v1/tracks")
+        def several_tracks():
+            return self._json({"tracks": [catalog.tracks.get(track_id) for track_id in self._ids(50)]})
+
+        # <-- playlists -->
+        @app.get("/v1/playlists/<playlist_id>")
+        def playlist(playlist_id):
+            full_playlist = dict(self._lookup(catalog.playlists, playlist_id))
+            full_playlist["tracks"] = self._page(self._playlist_items(playlist_id), limit=100)
+            return self._json(full_playlist)
+
+        @app.get("/v1/playlists/<playlist_id>/tracks")
+        def playlist_items(playlist_id):
+            self._lookup(catalog.playlists, playlist_id)
+            return self._json(self._page(self._playlist_items(playlist_id)))
+
+        # <-- users -->
+        @app.get("/v1/me")
+        def current_user():
+            return self._json(next(iter(catalog.users.values())))
+
+        @app.get("/v1/users/<user_id>")
+        def user(user_id):
+            return self._json(self._lookup(catalog.users, user_id))
+
+        @app.get("/v1/users/<user_id>/playlists")
+        def user_playlists(user_id):
+            self._lookup(catalog.users, user_id)
+            return self._json(self._page([catalog.playlists[playlist_id] for playlist_id in catalog.user_playlists[user_id]]))
+
+        @app.get("/v1/me/playlists")
+        def current_user_playlists():
+            return user_playlists(next(iter(catalog.users.keys())))
+
+        @app.get("/v1/me/tracks")
+        def saved_tracks():
+            first_playlist = next(iter(catalog.playlist_tracks.keys()))
+            return self._json(self._page(self._playlist_items(first_playlist)))
+
+        @app.get("/v1/me/top/<item_type>")
+        def top_items(item_type):
+            items = catalog.artists if item_type == "artists" else catalog.tracks
+            return self._json(self._page(sorted(items.values(), key=lambda item: -item["popularity"])))
+
+        @app.get("/v1/markets")
+        def markets():
+            return self._json({"markets": ["DE", "US", "GB"]})
+
+        # <-- images -->
+        @app.get("/images/<image_name>")
+        def image(image_name):
+            seed = int(sha256(image_name.encode()).hexdigest()[:6], 16)
+            buffer = BytesIO()
+            Image.new("RGB", (64, 64), color=(seed >> 16 & 255, seed >> 8 & 255, seed & 255)).save(buffer, format="JPEG")
+            return app.response_class(buffer.getvalue(), mimetype="image/jpeg")
+
+        @app.errorhandler(400)
+        def bad_request(error):
+            return self._error(400, "Invalid limit, offset or ids")
+
+        @app.errorhandler(404)
+        def not_found(error):
+            return self._error(404, "Non existing id or endpoint")
+
+        return app
+
+    # <-- response helpers -->
+    def _json(self, content: dict):
+        """
+        Serialize a response, answering 304 if the ETag matches `If-None-Match`
+
+        :param content: JSON content
+        :return: Flask response
+        """
+
+        body = json.dumps(content).replace(_HOST_PLACEHOLDER, request.host_url)
+        etag = f'"{sha256(body.encode()).hexdigest()[:32]}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            with self._stats_lock:
+                self.stats["not_modified"] += 1
+            response = self.app.response_class(status=304)
+        else:
+            response = self.app.response_class(body, mimetype="application/json")
+
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "public, max-age=3600"
+        return response
+
+    def _error(self, status_code: int, message: str):
+        """
+        :return: Flask response containing a Spotify error object
+        """
+
+        response = jsonify({"error": {"status": status_code, "message": message}})
+        response.status_code = status_code
+        return response
+
+    @staticmethod
+    def _lookup(items: dict, item_id: str) -> dict:
+        """
+        :return: item of the catalog (aborts with 404 if unknown)
+        """
+
+        if item_id not in items:
+            abort(404)
+        return items[item_id]
+
+    @staticmethod
+    def _ids(max_ids: int) -> list[str]:
+        """
+        :return: ids of the `ids` query parameter (aborts with 400 if more than `max_ids`)
+        """
+
+        item_ids = [item_id for item_id in request.args.get("ids", "").split(",") if item_id]
+        if not item_ids or len(item_ids) > max_ids:
+            abort(400)
+        return item_ids
+
+    def _page(self, items: list, limit: int = 50) -> dict:
+        """
+        Create a paging object using the `offset` and `limit` query parameters
+
+        :param items: every item of the endpoint
+        :param limit: maximum limit of the endpoint
+        :return: Spotify paging object
+        """
+
+        offset = int(request.args.get("offset", 0))
+        page_limit = int(request.args.get("limit", 20))
+        if not 0 < page_limit <= limit or offset < 0:
+            abort(400)
+
+        next_offset = offset + page_limit
+        base_url = request.base_url
+        return {
+            "href": f"{base_url}?offset={offset}&limit={page_limit}",
+            "items": items[offset: next_offset],
+            "limit": page_limit,
+            "next": f"{base_url}?offset={next_offset}&limit={page_limit}" if next_offset < len(items) else None,
+            "offset": offset,
+            "previous": f"{base_url}?offset={max(0, offset - page_limit)}&limit={page_limit}" if offset > 0 else None,
+            "total": len(items)
+        }
+
+    def _full_album(self, album: dict | None) -> dict | None:
+        if album is None:
+            return None
+        track_ids = self.catalog.album_tracks[album["id"]]
+        return {**album, "tracks": {"items": [self._simple_track(track_id) for track_id in track_ids[:50]], "total": len(track_ids)}}
+
+    def _simple_album(self, album_id: str) -> dict:
+        return self.catalog.tracks[self.catalog.album_tracks[album_id][0]]["album"]
+
+    def _simple_track(self, track_id: str) -> dict:
+        return {key: value for key, value in self.catalog.tracks[track_id].items() if key not in ("album", "external_ids", "popularity")}
+
+    def _playlist_items(self, playlist_id: str) -> list[dict]:
+        return [
+            {"added_at": "2024-01-01T00:00:00Z", "is_local": False, "track": self.catalog.tracks[track_id]}
+            for track_id in self.catalog.playlist_tracks[playlist_id]
+        ]
+
+    # <-- server control -->
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Start the server in a daemon thread
+
+        :param host: interface to listen on
+        :param port: port to listen on (0: random free port)
+        :return: API base url (use as SPOTIFY_API_URL), e.g. http://127.0.0.1:50123/v1
+        """
+
+        if self._server is None:
+            self._server = make_server(host, port, self.app, threaded=True)
+            self._thread = threading.Thread(target=self._server.serve_forever, name="fake_spotify_server", daemon=True)
+            self._thread.start()
+
+        return self.base_url
+
+    @property
+    def base_url(self) -> str | None:
+        """
+        :return: API base url of the running server (None if not running)
+        """
+
+        if self._server is None:
+            return None
+        return f"http://{self._server.host}:{self._server.port}/v1"
+
+    def stop(self) -> None:
+        """
+        Stop the server
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._server = self._thread = None
+
+
+if __name__ == '__main__':
+    """"""
+    parser = argparse.ArgumentParser(description="Local stand-in for the Spotify Web API")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every request is delayed")
+    parser.add_argument("--throttle-every", type=int, default=None, help="every n-th request is answered with 429")
+    parser.add_argument("--artists", type=int, default=20, help="number of generated artists")
+    arguments = parser.parse_args()
+
+    fake_server = FakeSpotifyServer(FakeCatalog(artist_count=arguments.artists), latency=arguments.latency, throttle_every=arguments.throttle_every)
+    print(f"{CSPOGREEN}Fake Spotify Web API running, set SPOTIFY_API_URL={fake_server.start(port=arguments.port)}{TEXTCOLOR}")
+    print(f"Example playlist id: {next(iter(fake_server.catalog.playlists.keys()))}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fake_server.stop()
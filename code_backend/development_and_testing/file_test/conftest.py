@@ -0,0 +1,48 @@
+import tempfile
+
+from code_backend.shared_config import *
+from code_backend.database_access import MyAppDatabase
+import pytest
+
+
+@pytest.fixture
+def temp_dir():
+    # DatabaseAccess only accepts paths inside the project (absolute_path())
+    with tempfile.TemporaryDirectory(dir=os.path.join(ROOT_DIR_PATH, "Databases")) as temp_dir:
+        yield temp_dir
+
+
+@pytest.fixture
+def make_database(temp_dir):
+    databases = []
+
+    def make(file_name: str = "test_database.db") -> MyAppDatabase:
+        database_file = os.path.join(temp_dir, file_name)
+        open(database_file, "w").close()
+
+        app_database = MyAppDatabase(database_file)
+        app_database.initialize_tables()
+        databases.append(app_database)
+        return app_database
+
+    yield make
+
+    for app_database in databases:
+        app_database.close()
+
+
+@pytest.fixture
+def database(make_database):
+    return make_database()
+
+
+@pytest.fixture
+def make_track():
+    def make(track_id: str, **columns) -> dict:
+        return {
+            "track_id": track_id, "track_name": "name", "track_uri": f"spotify:track:{track_id}", "track_url": "", "track_image": "",
+            "genre_names": [], "track_duration": 1000, "album_id": "0" * 22, "artist_ids": ["1" * 22], "playlist_ids": [],
+            "popularity": 20, "blacklisted": 0, "track_json": {"id": track_id}
+        } | columns
+
+    return make
@@ -0,0 +1,45 @@
+from code_backend.shared_config import *
+from code_backend.development_and_testing.benchmark import BenchmarkSuite, BenchmarkResult, _percentile
+from code_backend.secondary_methods import load_list_from_database, image_to_b64
+from code_backend.exceptions import InputException
+import pytest
+
+
+def test_run_uses_setup_and_skips_warm_up(tmp_path):
+    suite = BenchmarkSuite("unit", results_path=str(tmp_path))
+    calls = []
+
+    result = suite.run("consume", lambda items: calls.append(items.pop()), repeat=3, items=10, setup=lambda: ([1, 2],))
+
+    assert len(calls) == 4
+    assert result.runs == 3
+    assert result.p50 <= result.p95
+    assert result.throughput > 0
+    assert _percentile([3, 1, 2, 4], 50) == 2
+
+    with pytest.raises(InputException):
+        suite.run("invalid", lambda: None, repeat=0)
+
+
+def test_save_and_compare_against_baseline(tmp_path):
+    suite = BenchmarkSuite("unit", results_path=str(tmp_path))
+    suite.results = {
+        "fast": BenchmarkResult("fast", 5, 100, 0.01, 0.01, 0.02, 10_000),
+        "slow": BenchmarkResult("slow", 5, 100, 0.05, 0.05, 0.06, 2_000)
+    }
+
+    assert suite.compare() == []
+    assert os.path.isfile(suite.save())
+    suite.save_baseline()
+
+    suite.results["slow"] = BenchmarkResult("slow", 5, 100, 0.08, 0.08, 0.09, 1_250)
+    assert suite.load_baseline()["fast"].throughput == 10_000
+    assert suite.compare(tolerance=0.2) == ["slow"]
+    assert suite.compare(tolerance=1.0) == []
+
+
+def test_helpers_used_by_benchmarks():
+    # tracks.album_id is stored as single id
+    assert load_list_from_database(["['a', 'b']", "c", "[]"]) == ["a", "b", "c"]
+
+    assert isinstance(image_to_b64(Image.new("RGBA", (4, 4)), "JPEG"), str)
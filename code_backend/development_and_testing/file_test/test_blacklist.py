@@ -0,0 +1,72 @@
+import shutil
+
+from code_backend.shared_config import *
+from code_backend.blacklist import Blacklist
+from code_backend.exceptions import InputException
+import pytest
+
+
+@pytest.fixture
+def blacklist(temp_dir, database):
+    blacklist_file = shutil.copy(BLACKLIST_DATABASE_PATH, os.path.join(temp_dir, "blacklist.db"))
+    return Blacklist(database, blacklist_file=blacklist_file)
+
+
+def test_checks_need_no_queries(blacklist, make_track):
+    blacklist.database.add_item_to_table(table_name="tracks", **make_track("1" * 22))
+    blacklist.add("track", "1" * 22, item_name="name")
+    blacklist.add("artist", "2" * 22)
+
+    statements = []
+    blacklist.database.database.set_trace_callback(statements.append)
+    blacklist.database.connections.reader.set_trace_callback(statements.append)
+
+    assert blacklist.is_blacklisted("track", "1" * 22) and blacklist.is_blacklisted("artist", "2" * 22)
+    assert not blacklist.is_blacklisted("album", "1" * 22)
+    assert statements == []
+
+    assert blacklist.database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="blacklisted") == (1,)
+    assert blacklist.stats == {"album": 0, "artist": 1, "playlist": 0, "track": 1, "user": 0}
+
+    blacklist.remove("track", "1" * 22)
+    assert not blacklist.is_blacklisted("track", "1" * 22)
+    assert blacklist.database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="blacklisted") == (0,)
+
+    with pytest.raises(InputException):
+        blacklist.add("genre", "1" * 22)
+
+
+def test_database_changes_update_the_sets(blacklist, make_track):
+    database = blacklist.database
+    database.add_item_to_table(table_name="tracks", **make_track("3" * 22))
+
+    database.update_item(table_name="tracks", item_id="3" * 22, table_column="blacklisted", new_value=1)
+    assert blacklist.ids("track") == {"3" * 22}
+
+    # rows inserted as blacklisted (e.g. by the write queue)
+    database.upsert_items(table_name="tracks", rows=[make_track("5" * 22, blacklisted=1)])
+    assert blacklist.ids("track") == {"3" * 22, "5" * 22}
+
+    plan = database.execute_query("EXPLAIN QUERY PLAN SELECT track_id FROM tracks WHERE blacklisted = 1;", fetch=True)
+    assert "idx_tracks_blacklisted" in str(plan)
+
+    # blacklist.db keeps the blacklist when the main database is reset
+    blacklist.add("album", "4" * 22)
+    database.reset_database()
+    assert blacklist.ids("track") == set() and blacklist.ids("album") == {"4" * 22}
+
+
+def test_bulk_writes_are_loaded_with_one_query(blacklist, make_track):
+    database = blacklist.database
+    blacklist.ids("track")
+
+    statements = []
+    database.database.set_trace_callback(statements.append)
+    database.connections.reader.set_trace_callback(statements.append)
+
+    rows = [make_track(f"{index:022d}", blacklisted=index % 2) for index in range(1, 101)]
+    database.upsert_items(table_name="tracks", rows=rows, batch_size=20)
+    assert not [statement for statement in statements if "blacklist." in statement]
+
+    assert len(blacklist.ids("track")) == 50
+    assert len([statement for statement in statements if "blacklist." in statement]) == 1
@@ -0,0 +1,275 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from code_backend.shared_config import *
+from code_backend.database_access import MyAppDatabase, QueryRegistry, SQL_QUERIES, MAIN_MIGRATIONS
+import code_backend.database_access as database_access
+from code_backend.secondary_methods import load_dict_from_database
+from code_backend.exceptions import InputException, DatabaseException
+import pytest
+
+
+def test_schema_is_introspected_once(database, make_track):
+    statements = []
+    database.database.set_trace_callback(statements.append)
+    database.connections.reader.set_trace_callback(statements.append)
+
+    for index in range(1, 21):
+        database.add_item_to_table(table_name="tracks", **make_track(f"{index:022d}"))
+
+    # loaded once (lazily after initialize_tables()), not per insert
+    assert len([statement for statement in statements if "sqlite_master" in statement]) == 1
+    assert len([statement for statement in statements if statement.startswith("PRAGMA table_xinfo")]) == len(database.table_struct)
+    assert len(database.fetch_column(table_name="tracks", table_column="track_id")) == 21
+
+
+def test_schema_changes_invalidate_catalog(database):
+    assert "blob_test" not in database.table_struct
+
+    database.execute_script("CREATE TABLE blob_test (blob_id TEXT PRIMARY KEY, content BLOB);")
+    assert database.table_columns("blob_test") == ["blob_id", "content"]
+    assert database.insert_template("blob_test") == "INSERT OR IGNORE INTO blob_test (blob_id, content) VALUES (:blob_id, :content);"
+
+    database.reset_database()
+    assert "blob_test" not in database.table_struct
+    assert "tracks" in database.table_struct
+
+    with pytest.raises(InputException):
+        database.table_columns("blob_test")
+
+
+def test_queries_are_loaded_once(database, monkeypatch, make_track):
+    assert {"create_tables", "insert_dummies", "insert_tracks"} <= set(SQL_QUERIES.names)
+    assert SQL_QUERIES["insert_tracks"].startswith("INSERT OR IGNORE INTO tracks")
+
+    def fail(file_path):
+        raise AssertionError(f"'{file_path}' loaded from disk")
+
+    monkeypatch.setattr(database_access, "load_sql_query", fail)
+    database.add_item_to_table(table_name="tracks", **make_track("1" * 22))
+    assert database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="track_name") == ("name",)
+
+    with pytest.raises(InputException):
+        SQL_QUERIES.get("insert_unknown")
+
+    with pytest.raises(InputException):
+        QueryRegistry("code_backend/no_queries")
+
+
+def test_bulk_insert_in_one_transaction(database, make_track):
+    rows = [make_track(f"{index:022d}") for index in range(1, 1201)]
+    statements = []
+    database.database.set_trace_callback(statements.append)
+
+    stats = database.add_items_to_table(table_name="tracks", rows=rows, batch_size=500)
+
+    assert stats["rows"] == 1200 and stats["rows_per_second"] > 0
+    assert statements.count("COMMIT") == 1
+    assert len(database.fetch_column(table_name="tracks", table_column="track_id")) == 1201
+    assert database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="artist_ids") is None
+    assert database.fetch_row(table_name="tracks", item_id=f"{5:022d}", table_column="artist_ids") == (str(["1" * 22]),)
+
+
+def test_failed_bulk_write_is_rolled_back(database, make_track):
+    database.sql_query_queue = [
+        (database.insert_template("tracks"), database._row_values("tracks", make_track("2" * 22))),
+        ("INSERT INTO tracks (track_id) VALUES (?);", ("2" * 22,))
+    ]
+
+    with pytest.raises(DatabaseException):
+        database.execute_queue_queries()
+
+    assert database.fetch_row(table_name="tracks", item_id="2" * 22) is None
+
+
+def test_wal_readers_and_serialized_writer(database, make_track):
+    assert database.connections.journal_mode == "wal"
+    database.add_item_to_table(table_name="tracks", **make_track("3" * 22))
+
+    with pytest.raises(sqlite3.OperationalError):
+        database.connections.reader.execute("DELETE FROM tracks;")
+
+    # readers of other threads are not blocked while the writer holds its lock
+    with database.connections.write_lock:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            names = list(executor.map(lambda _: database.fetch_row(table_name="tracks", item_id="3" * 22, table_column="track_name"), range(8)))
+
+    assert names == [("name",)] * 8
+    assert len(database.connections._readers) >= 2
+    assert list(database.fetch_rows(table_name="tracks", target_column="track_duration", target_value=1000).keys()) == ["3" * 22]
+
+
+def test_connections_are_opened_on_first_use(temp_dir):
+    database_file = os.path.join(temp_dir, "unused.db")
+    open(database_file, "w").close()
+
+    # e.g. APP_DATABASE, created when the module is imported
+    unused_database = MyAppDatabase(database_file)
+    assert os.path.getsize(database_file) == 0 and not os.path.exists(f"{database_file}-wal")
+
+    assert unused_database.connections.journal_mode == "wal"
+    assert os.path.getsize(database_file) > 0
+    unused_database.close()
+
+
+def test_closed_connections_are_opened_again(database, make_track, temp_dir):
+    attached_file = os.path.join(temp_dir, "attached.db")
+    open(attached_file, "w").close()
+    database.connections.attach("other", attached_file)
+    database.execute_query("CREATE TABLE other.items (id TEXT);")
+    database.add_item_to_table(table_name="tracks", **make_track("1" * 22))
+    database.cursor
+
+    database.close()
+
+    assert database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="track_name") == ("name",)
+    assert database.cursor.execute("SELECT track_name FROM tracks WHERE track_id = ?;", ("1" * 22,)).fetchone() == ("name",)
+    assert database.execute_query("SELECT COUNT(*) FROM other.items;", fetch=True) == [(0,)]
+    assert database.connections.reader.execute("SELECT COUNT(*) FROM other.items;").fetchone() == (0,)
+
+
+def test_id_lists_are_mirrored_by_relation_tables(database, make_track):
+    track = make_track("4" * 22)
+    track["artist_ids"] = ["5" * 22, "6" * 22]
+    database.add_item_to_table(table_name="tracks", **track)
+
+    assert database.related_ids("track_artists", "4" * 22) == ["5" * 22, "6" * 22]
+    assert database.referencing_ids("track_artists", "6" * 22) == ["4" * 22]
+    assert {"5" * 22, "6" * 22} <= database.unknown_ids("artist")
+    assert "0" * 22 not in database.unknown_ids("album")
+
+    database.update_item(table_name="tracks", item_id="4" * 22, table_column="artist_ids", new_value=str(["6" * 22]))
+    assert database.related_ids("track_artists", "4" * 22) == ["6" * 22]
+    assert "5" * 22 not in database.unknown_ids("artist")
+
+    # listeners see the item and its relation rows removed
+    notified = []
+    database.add_change_listener(lambda table_name, item_id: notified.append(database.related_ids("track_artists", item_id) if item_id else None))
+    database.remove_specific_item(table_name="tracks", item_id="4" * 22)
+    assert database.referencing_ids("track_artists", "6" * 22) == []
+    assert notified == [[]]
+
+    database.add_item_to_table(table_name="tracks", **track)
+    database.reset_table(table_name="tracks")
+    assert database.execute_query("SELECT count(*) FROM track_artists;", fetch=True) == [(0,)]
+
+    with pytest.raises(InputException):
+        database.unknown_ids("genre")
+
+
+def test_relation_tables_are_backfilled(database, make_track):
+    database.add_item_to_table(table_name="tracks", **make_track("7" * 22))
+    database.execute_script("DROP TABLE track_artists;")
+    assert "track_artists" not in database.table_struct
+
+    assert database.migrations.reapply(1) == [migration.version for migration in MAIN_MIGRATIONS]
+    assert database.related_ids("track_artists", "7" * 22) == ["1" * 22]
+
+
+def test_search_index_is_kept_in_sync(database, make_track):
+    track = make_track("8" * 22)
+    track["track_name"] = "Bohemian Rhapsody"
+    track["artist_ids"] = ["9" * 22]
+    database.add_item_to_table(table_name="tracks", **track)
+
+    assert list(database.search_items("bohem rhap").keys()) == [f"spotify:track:{'8' * 22}"]
+    assert database.search_items("queen") == {}
+
+    # artists stored after their tracks add their name to the tracks
+    database.add_item_to_table(
+        table_name="artists", artist_id="9" * 22, artist_name="Queen", artist_uri=f"spotify:artist:{'9' * 22}", artist_url="", artist_image="",
+        genre_names=["rock"], follower=0, album_ids=[], playlist_ids=[], top_track_ids=[], popularity=0, blacklisted=0, artist_json={}
+    )
+    results = database.search_items("queen")
+    assert list(results.keys()) == [f"spotify:artist:{'9' * 22}", f"spotify:track:{'8' * 22}"]
+    assert database.search_items("queen", item_types=["track"], limit=1)[f"spotify:track:{'8' * 22}"]["name"] == "Bohemian Rhapsody"
+
+    database.update_item(table_name="tracks", item_id="8" * 22, table_column="track_name", new_value="Radio Ga Ga")
+    assert database.search_items("bohemian") == {}
+    assert database.search_items('"radio" ga*') != {}
+
+    database.remove_specific_item(table_name="tracks", item_id="8" * 22)
+    assert database.search_items("radio") == {}
+    assert "track_search" not in database.table_struct
+
+
+def test_search_index_is_rebuilt(database, make_track):
+    database.add_item_to_table(table_name="tracks", **make_track("8" * 22))
+    database.execute_script("DELETE FROM track_search;")
+    assert database.search_items("name") == {}
+
+    database.rebuild_search_index()
+    assert list(database.search_items("name").keys()) == [f"spotify:track:{'8' * 22}"]
+
+
+def test_json_payloads_and_their_field_columns(database, make_track):
+    track = make_track("a" * 22)
+    track["track_json"] = {"id": "a" * 22, "explicit": True, "popularity": 71, "album": {"release_date": "1975-10-31"}}
+    database.add_item_to_table(table_name="tracks", **track)
+
+    assert json.loads(database.fetch_row(table_name="tracks", item_id="a" * 22, table_column="track_json")[0]) == track["track_json"]
+    assert database.fetch_row(table_name="tracks", item_id="a" * 22, table_column="release_date, explicit, spotify_popularity") == ("1975-10-31", 1, 71)
+    assert list(database.fetch_rows(table_name="tracks", target_column="explicit", target_value=1).keys()) == ["a" * 22]
+
+    plan = database.execute_query("EXPLAIN QUERY PLAN SELECT track_id FROM tracks WHERE release_date > '1970';", fetch=True)
+    assert "idx_tracks_release_date" in str(plan)
+
+    # other SQLite clients can read the table
+    with sqlite3.connect(database.connections.database_file) as connection:
+        assert connection.execute("SELECT * FROM tracks WHERE track_id = ?;", ("a" * 22,)).fetchone() is not None
+
+    # compressed payloads are smaller, their fields can be queried as well
+    database.json_storage = "zlib"
+    assert database.migrate_json_storage() == 7  # dummy item of every table and the track
+    stored = database.fetch_row(table_name="tracks", item_id="a" * 22, table_column="track_json, spotify_popularity")
+    assert isinstance(stored[0], bytes) and stored[1] == 71
+    assert load_dict_from_database(stored[0]) == track["track_json"]
+
+    track = make_track("c" * 22, track_json={"id": "c" * 22, "explicit": False, "popularity": "placeholder", "album": {"release_date": "1980"}})
+    database.upsert_items(table_name="tracks", rows=[track])
+    assert isinstance(database.fetch_row(table_name="tracks", item_id="c" * 22, table_column="track_json")[0], bytes)
+    assert database.fetch_row(table_name="tracks", item_id="c" * 22, table_column="release_date, explicit, spotify_popularity") == ("1980", 0, None)
+    assert database.execute_query("SELECT track_id FROM tracks WHERE release_date >= '1975' ORDER BY release_date;", fetch=True) == [("a" * 22,), ("c" * 22,)]
+
+    database.update_item(table_name="tracks", item_id="c" * 22, table_column="track_json", new_value=json.dumps({"id": "c" * 22, "explicit": True}))
+    assert database.fetch_row(table_name="tracks", item_id="c" * 22, table_column="release_date, explicit") == (None, 1)
+
+    # the preset dictionary matches the compact JSON of dump_dict_to_database()
+    assert b'": ' not in JSON_ZLIB_DICTIONARY and b', "' not in JSON_ZLIB_DICTIONARY
+
+
+def test_dict_strings_of_older_versions_are_converted(database, make_track):
+    database.add_item_to_table(table_name="tracks", **make_track("b" * 22))
+    database.execute_query("UPDATE tracks SET track_json = ? WHERE track_id = ?;", (str({"id": "b" * 22, "explicit": False}), "b" * 22))
+    assert database.fetch_row(table_name="tracks", item_id="b" * 22, table_column="explicit") == (None,)
+
+    assert database.migrate_json_storage() == 1
+    assert database.fetch_row(table_name="tracks", item_id="b" * 22, table_column="explicit") == (0,)
+
+
+def test_upsert_writes_only_changed_rows(database, make_track):
+    rows = [make_track(f"{index:022d}") for index in range(1, 6)]
+    stats = database.upsert_items(table_name="tracks", rows=rows, batch_size=2)
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (5, 0, 0)
+    assert stats["batches"] == [{"inserted": 2, "updated": 0, "unchanged": 0}, {"inserted": 2, "updated": 0, "unchanged": 0}, {"inserted": 1, "updated": 0, "unchanged": 0}]
+
+    # set by the user, kept by refreshes
+    database.update_item(table_name="tracks", item_id=f"{1:022d}", table_column="blacklisted", new_value=1)
+    rows[1]["track_name"] = "Renamed Track"
+    rows[2]["artist_ids"] = ["5" * 22]
+
+    changed = []
+    database.add_change_listener(lambda table_name, item_id: changed.append(item_id))
+    stats = database.upsert_items(table_name="tracks", rows=rows)
+
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 2, 3)
+    assert changed == [f"{2:022d}", f"{3:022d}"]
+    assert database.fetch_row(table_name="tracks", item_id=f"{1:022d}", table_column="blacklisted") == (1,)
+    assert list(database.search_items("renamed").keys()) == [f"spotify:track:{2:022d}"]
+    assert database.related_ids("track_artists", f"{3:022d}") == ["5" * 22]
+
+    # add_item_to_table() stores the content hash as well
+    database.add_item_to_table(table_name="tracks", **make_track("c" * 22))
+    assert database.upsert_items(table_name="tracks", rows=[make_track("c" * 22)])["unchanged"] == 1
+
+    with pytest.raises(InputException):
+        database.upsert_items(table_name="genres", rows=[])
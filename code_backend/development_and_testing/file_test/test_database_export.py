@@ -0,0 +1,40 @@
+from code_backend.shared_config import *
+from code_backend.database_export import export_database, import_database
+from code_backend.exceptions import InputException
+import pytest
+
+pyarrow = pytest.importorskip("pyarrow")
+import pyarrow.parquet
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_export_and_import_round_trip(temp_dir, make_database, make_track, file_format):
+    source = make_database("source.db")
+    source.add_items_to_table(table_name="tracks", rows=[make_track(
+        f"{index:022d}", genre_names=["rock"], artist_ids=["1" * 22, "2" * 22],
+        track_json={"id": f"{index:022d}", "explicit": True, "album": {"release_date": "1975"}}
+    ) for index in range(1, 26)])
+    source.json_storage = "zlib"
+    source.migrate_json_storage()
+
+    export_directory = os.path.join(temp_dir, "export")
+    exported = export_database(source, export_directory, file_format=file_format, chunk_size=10)
+    assert exported["tracks"] == 26 and exported["track_artists"] == 50
+
+    if file_format == "parquet":
+        tracks = pyarrow.parquet.read_table(os.path.join(export_directory, "tracks.parquet"))
+        assert tracks.num_rows == 26 and tracks.to_batches()[0].num_rows == 10
+        assert tracks.column("artist_ids").type == pyarrow.list_(pyarrow.string())
+        assert tracks.column("explicit").to_pylist().count(1) == 25
+        assert json.loads(tracks.column("track_json")[1].as_py())["album"]["release_date"] == "1975"
+
+    target = make_database("target.db")
+    imported = import_database(target, export_directory, file_format=file_format, chunk_size=10)
+    assert imported["tracks"] == 26 and "track_artists" not in imported
+
+    assert target.fetch_row(table_name="tracks", item_id=f"{1:022d}", table_column="artist_ids, genre_names, explicit") == (str(["1" * 22, "2" * 22]), "['rock']", 1)
+    assert target.related_ids("track_artists", f"{1:022d}") == ["1" * 22, "2" * 22]
+    assert import_database(target, export_directory, file_format=file_format)["tracks"] == 26
+
+    with pytest.raises(InputException):
+        export_database(source, export_directory, file_format="csv")
@@ -0,0 +1,87 @@
+from code_backend.shared_config import *
+from code_backend.database_access import MyAppDatabase, MAIN_MIGRATIONS
+from code_backend.database_migrations import Backfill, Migration, MigrationRunner
+from code_backend.secondary_methods import dump_dict_to_database
+from code_backend.exceptions import InputException, DatabaseException
+import pytest
+
+
+def _add_tracks(database: MyAppDatabase, count: int) -> None:
+    database.execute_many([("INSERT INTO tracks (track_id, track_name) VALUES (?, 'name');", [(f"{index:022d}",) for index in range(1, count + 1)])])
+
+
+def test_new_databases_are_at_the_latest_version(database):
+    assert database.migrations.current_version == database.migrations.latest_version == len(MAIN_MIGRATIONS)
+    assert database.migrations.pending() == []
+    assert database.migrations.upgrade() == []
+
+    finished = database.execute_query("SELECT version FROM schema_migrations WHERE finished IS NOT NULL ORDER BY version;", fetch=True)
+    assert finished == [(migration.version,) for migration in MAIN_MIGRATIONS]
+
+    database.reset_database()
+    assert database.migrations.current_version == len(MAIN_MIGRATIONS)
+
+
+def test_interrupted_backfill_is_resumed(database):
+    _add_tracks(database, 5)
+    calls, progress = [], []
+
+    def mark(app_database, connection, table_name, rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("app closed")
+        connection.executemany("INSERT INTO marked_tracks (track_id) VALUES (?);", [(track_id,) for _, track_id in rows])
+
+    migration = Migration(len(MAIN_MIGRATIONS) + 1, "marked_tracks", script="CREATE TABLE IF NOT EXISTS marked_tracks (track_id TEXT PRIMARY KEY);", backfills=(
+        Backfill("tracks", ("track_id",), mark),
+    ))
+    runner = MigrationRunner(database, MAIN_MIGRATIONS + [migration], chunk_size=2, progress=lambda *args: progress.append(args[1:]))
+
+    with pytest.raises(RuntimeError):
+        runner.upgrade()
+
+    # the first chunk is committed, the failed one rolled back
+    assert runner.current_version == len(MAIN_MIGRATIONS)
+    assert database.execute_query("SELECT count(*) FROM marked_tracks;", fetch=True) == [(2,)]
+
+    assert runner.upgrade() == [migration.version]
+    assert calls == [2, 2, 2, 2]  # dummy track and 5 tracks, the chunk after the first one twice
+    assert database.execute_query("SELECT count(*) FROM marked_tracks;", fetch=True) == [(6,)]
+    assert progress == [("tracks", 2, 6), ("tracks", 4, 6), ("tracks", 6, 6)]
+    assert runner.current_version == migration.version
+
+
+def test_failed_migration_is_rolled_back(database):
+    def fail(app_database, connection):
+        connection.execute("SELECT * FROM unknown_table;")
+
+    migration = Migration(len(MAIN_MIGRATIONS) + 1, "failing", script="CREATE TABLE failing_table (failing_id TEXT PRIMARY KEY);", function=fail)
+    runner = MigrationRunner(database, MAIN_MIGRATIONS + [migration])
+
+    with pytest.raises(DatabaseException):
+        runner.upgrade()
+
+    assert runner.current_version == len(MAIN_MIGRATIONS)
+    assert "failing_table" not in database.table_struct
+    assert database.execute_query("SELECT 1 FROM schema_migrations WHERE version = ?;", (migration.version,), fetch=True) == []
+
+    with pytest.raises(InputException):
+        MigrationRunner(database, [migration])
+
+    with pytest.raises(InputException):
+        runner.upgrade(target_version=migration.version + 1)
+
+
+
+def test_json_fields_of_stored_payloads_are_filled(database):
+    # rows written before migration 4: string representation of a dict and a compressed payload, no fields
+    rows = [
+        (f"{1:022d}", str({"id": f"{1:022d}", "explicit": True, "album": {"release_date": "1975"}})),
+        (f"{2:022d}", dump_dict_to_database({"id": f"{2:022d}", "popularity": 50}, storage="zlib"))
+    ]
+    database.execute_many([("INSERT INTO tracks (track_id, track_name, track_json) VALUES (?, 'name', ?);", rows)])
+
+    assert database.migrations.reapply(4) == [migration.version for migration in MAIN_MIGRATIONS[3:]]
+    assert database.fetch_row(table_name="tracks", item_id=f"{1:022d}", table_column="release_date, explicit, spotify_popularity") == ("1975", 1, None)
+    assert database.fetch_row(table_name="tracks", item_id=f"{2:022d}", table_column="release_date, explicit, spotify_popularity") == (None, None, 50)
+    assert json.loads(database.fetch_row(table_name="tracks", item_id=f"{1:022d}", table_column="track_json")[0])["explicit"] is True
@@ -0,0 +1,54 @@
+from code_backend.shared_config import *
+from code_backend.database_writer import WriteBehindQueue
+from code_backend.exceptions import InputException, DatabaseException
+import pytest
+
+
+def test_queued_rows_are_coalesced_and_written_in_batches(database, make_track):
+    write_queue = WriteBehindQueue(database, flush_interval=10)
+
+    for index in range(1, 11):
+        write_queue.put(table_name="tracks", row=make_track(f"{index:022d}"))
+    write_queue.put(table_name="tracks", row=make_track(f"{1:022d}", track_name="renamed"))
+    write_queue.flush(timeout=10)
+
+    assert len(database.fetch_column(table_name="tracks", table_column="track_id")) == 11
+    assert database.fetch_row(table_name="tracks", item_id=f"{1:022d}", table_column="track_name") == ("renamed",)
+
+    stats = write_queue.stats
+    assert (stats["queued"], stats["written"], stats["coalesced"], stats["pending"]) == (11, 10, 1, 0)
+    assert stats["transactions"] == 1
+
+    # tables without content hash are written with INSERT OR IGNORE
+    for _ in range(2):
+        write_queue.put(table_name="images", row={"image_hash": "a" * 64, "image_format": "JPEG", "byte_size": 1, "image_bytes": b"a"})
+        write_queue.flush(timeout=10)
+    assert database.execute_query("SELECT COUNT(*) FROM images WHERE image_hash = ?;", ("a" * 64,), fetch=True) == [(1,)]
+
+    # exceptions of the writer thread are raised by the next flush()
+    write_queue.put(table_name="images", row={"image_hash": "b" * 64, "image_format": "JPEG", "byte_size": 1, "image_bytes": object()})
+    with pytest.raises(DatabaseException):
+        write_queue.flush(timeout=10)
+
+    write_queue.close(timeout=10)
+    with pytest.raises(DatabaseException):
+        write_queue.put(table_name="tracks", row=make_track("2" * 22))
+
+    with pytest.raises(InputException):
+        write_queue.put(table_name="tracks", row={"track_name": "no id"})
+
+
+def test_full_queue_blocks_producers(database, make_track):
+    write_queue = WriteBehindQueue(database, max_size=2, batch_size=1, flush_interval=10, put_timeout=0.5)
+
+    # the writer waits for the write lock, so the queue fills up
+    with database.connections.write_lock:
+        for index in range(1, 4):
+            write_queue.put(table_name="tracks", row=make_track(f"{index:022d}"))
+
+        with pytest.raises(DatabaseException):
+            write_queue.put(table_name="tracks", row=make_track(f"{4:022d}"))
+
+    write_queue.close(timeout=10)
+    assert write_queue.stats["blocked"] >= 1
+    assert len(database.fetch_column(table_name="tracks", table_column="track_id")) == 4
@@ -0,0 +1,70 @@
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+from code_backend.development_and_testing.fake_spotify_server import FakeSpotifyServer, FakeCatalog
+from code_backend.response_cache import ResponseCache
+from code_backend.token_manager import TokenManager
+from code_backend.exceptions import HttpException
+import pytest
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    server = FakeSpotifyServer(FakeCatalog(artist_count=4, tracks_per_playlist=130, seed=1), retry_after=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_api(fake_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(spotify, "SPOTIFY_API_URL", fake_server.base_url)
+    monkeypatch.setenv("FAKE_TOKEN", json.dumps({"access_token": "fake", "token_type": "Bearer", "expires": int(time.time()) + 3600}))
+    monkeypatch.setattr(spotify, "REGULAR_TOKEN_MANAGER", TokenManager("FAKE_TOKEN"))
+    monkeypatch.setattr(spotify, "RESPONSE_CACHE", ResponseCache(cache_file=str(tmp_path / "http_cache.db")))
+    fake_server.throttle_every = None
+    return fake_server
+
+
+def test_catalog_is_deterministic():
+    assert list(FakeCatalog(seed=3).tracks.keys()) == list(FakeCatalog(seed=3).tracks.keys())
+    assert list(FakeCatalog(seed=3).tracks.keys()) != list(FakeCatalog(seed=4).tracks.keys())
+
+
+def test_catalog_endpoints(fake_api):
+    catalog = fake_api.catalog
+    album_id = next(iter(catalog.albums.keys()))
+    artist_id = next(iter(catalog.artists.keys()))
+    track_ids = list(catalog.tracks.keys())[:30]
+
+    album = spotify.get_album(album_id)
+    assert list(album.keys()) == [f"spotify:album:{album_id}"]
+    assert album[f"spotify:album:{album_id}"]["images"][0]["url"].startswith(fake_api.base_url.removesuffix("v1"))
+
+    assert len(spotify.get_several_tracks(track_ids)) == 30
+    assert len(spotify.get_artists_albums(artist_id)) == 3
+    assert len(spotify.get_album_tracks(album_id)) == 12
+
+    with pytest.raises(HttpException):
+        spotify.get_album("0" * 22)
+
+
+def test_paging_and_throttling(fake_api):
+    playlist_id = next(iter(fake_api.catalog.playlists.keys()))
+    fake_api.throttle_every = 2
+    throttled_before = fake_api.stats["throttled"]
+
+    tracks = spotify.get_playlist_items(playlist_id)
+
+    assert list(tracks.keys()) == [f"spotify:track:{track_id}" for track_id in fake_api.catalog.playlist_tracks[playlist_id]]
+    assert fake_api.stats["throttled"] > throttled_before
+
+
+def test_etag_revalidation(fake_api):
+    artist_id = next(iter(fake_api.catalog.artists.keys()))
+    spotify.RESPONSE_CACHE.ttl_policy["artists"] = 0
+
+    first = spotify.get_artist(artist_id)
+    second = spotify.get_artist(artist_id)
+
+    assert first == second
+    assert spotify.RESPONSE_CACHE.stats["revalidated"] == 1
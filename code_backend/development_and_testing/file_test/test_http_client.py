@@ -0,0 +1,162 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from code_backend.shared_config import *
+from code_backend.http_client import HttpClient, TokenBucket, SingleFlight
+from code_backend.exceptions import InputException
+import pytest
+
+
+class _LocalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+    # {path: [status codes to return before 200]}
+    failures = {}
+    # {path: Retry-After of 429 responses} (default: 0)
+    retry_after = {}
+
+    def do_GET(self):
+        _LocalHandler.client_ports.add(self.client_address[1])
+        status_codes = _LocalHandler.failures.get(self.path, [])
+        status_code = status_codes.pop(0) if status_codes else 200
+
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status_code)
+        if status_code == 429:
+            self.send_header("Retry-After", _LocalHandler.retry_after.get(self.path, "0"))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LocalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_connections_are_reused(local_server):
+    client = HttpClient(pool_maxsize=1)
+    _LocalHandler.client_ports.clear()
+
+    for current_offset in range(0, 500, 50):
+        response = client.request("GET", f"{local_server}/v1/playlists/x/tracks?offset={current_offset}")
+        assert response.json()["path"].endswith(f"offset={current_offset}")
+
+    assert len(_LocalHandler.client_ports) == 1
+    client.close()
+
+
+def test_configure_pool():
+    client = HttpClient()
+    client.configure_pool(pool_maxsize=4, timeout=2)
+    assert client.session.get_adapter("https://api.spotify.com")._pool_maxsize == 4
+    assert client.timeout == 2
+
+    with pytest.raises(InputException):
+        client.configure_pool(pool_maxsize=0)
+
+
+def test_throttled_and_failed_requests_are_retried(local_server):
+    client = HttpClient()
+    _LocalHandler.failures["/throttled"] = [429, 429]
+    _LocalHandler.failures["/server_error"] = [500, 503]
+
+    assert client.request("GET", f"{local_server}/throttled").status_code == 200
+    assert client.request("GET", f"{local_server}/server_error").status_code == 200
+    assert client.stats["throttled"] == 2
+    assert client.stats["server_errors"] == 2
+    assert client.stats["retried"] == 4
+    assert client.stats["requests"] == 6
+
+
+def test_retries_are_limited(local_server):
+    client = HttpClient(max_retries=1)
+    _LocalHandler.failures["/always_throttled"] = [429, 429, 429]
+
+    assert client.request("GET", f"{local_server}/always_throttled").status_code == 429
+    assert client.stats["retried"] == 1
+
+
+def test_retry_after_is_not_capped(local_server):
+    response = requests.Response()
+    response.headers["Retry-After"] = "120"
+    assert HttpClient._retry_after(response, attempt=0) == 120
+
+    # waiting longer than max_retry_after raises instead of retrying early
+    client = HttpClient(max_retry_after=60)
+    _LocalHandler.failures["/long_throttled"] = [429]
+    _LocalHandler.retry_after["/long_throttled"] = "3600"
+
+    with pytest.raises(requests.exceptions.RetryError):
+        client.request("GET", f"{local_server}/long_throttled")
+    assert client.stats["retried"] == 0
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+
+    # 5 tokens burst, 10 tokens refilled with 100 tokens/s
+    assert time.monotonic() - start >= 0.09
+
+    bucket.block_for(0.1)
+    assert bucket.acquire() >= 0.09
+
+
+def test_single_flight():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(url):
+        calls.append(url)
+        started.set()
+        release.wait(timeout=5)
+        return {"url": url}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(single_flight.do("a", slow_fetch, "a")))
+    leader.start()
+    started.wait(timeout=5)
+
+    followers = [threading.Thread(target=lambda: results.append(single_flight.do("a", slow_fetch, "a"))) for _ in range(4)]
+    for follower in followers:
+        follower.start()
+    while single_flight.stats["duplicates"] < 4:
+        time.sleep(0.01)
+    release.set()
+
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert calls == ["a"]
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == {"url": "a"} for result, _ in results)
+    # every caller gets its own copy, the executing one included
+    assert len({id(result) for result, _ in results}) == 5
+    assert single_flight.stats == {"calls": 5, "executed": 1, "duplicates": 4}
+    assert single_flight.in_flight == 0
+
+    # finished calls are not cached
+    assert single_flight.do("a", slow_fetch, "a") == ({"url": "a"}, False)
+
+
+def test_single_flight_shares_exceptions():
+    single_flight = SingleFlight()
+
+    def failing_fetch():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        single_flight.do("b", failing_fetch)
+
+    assert single_flight.in_flight == 0
@@ -0,0 +1,90 @@
+from code_backend.shared_config import *
+from code_backend.database_writer import WriteBehindQueue
+from code_backend.image_store import ImageStore
+from code_backend.exceptions import InputException
+import pytest
+
+
+@pytest.fixture
+def store(database):
+    return ImageStore(database, cache_size=2)
+
+
+def _jpeg(color: str) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (8, 8), color).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def test_images_are_stored_once(store):
+    red = _jpeg("red")
+    image_hash = store.put(red)
+
+    assert store.put(red) == image_hash
+    assert store.database.execute_query("SELECT count(*) FROM images;", fetch=True) == [(1,)]
+    assert store.stats["stored"] == 1 and store.stats["deduplicated"] == 1
+
+    # bytes not cached anymore are loaded from the database
+    store.put(_jpeg("blue"))
+    store.put(_jpeg("green"))
+    assert store.get(image_hash) == red
+    assert store.stats["loaded"] == 1
+    assert store.get_image(image_hash).size == (8, 8)
+    assert base64.b64decode(store.get_b64(image_hash)) == red
+
+    # unknown hashes (e.g. dummy items) fall back to NO_IMAGE_PATH
+    assert store.get("") is None
+    assert store.get_image("").size == Image.open(NO_IMAGE_PATH).size
+
+    with pytest.raises(InputException):
+        store.put(b"")
+
+
+def test_b64_rows_are_migrated_and_unused_images_removed(store):
+    red = _jpeg("red")
+    store.database.execute_query("INSERT INTO albums (album_id, album_image) VALUES (?, ?);", ("1" * 22, base64.b64encode(red).decode()))
+
+    store.database.migrations.reapply(2)
+    image_hash = store.database.fetch_row(table_name="albums", item_id="1" * 22, table_column="album_image")[0]
+    assert image_hash == store.image_hash(red)
+    assert store.get(image_hash) == red
+
+    # items without image do not keep unused images
+    store.database.execute_query("INSERT INTO albums (album_id, album_image) VALUES (?, NULL);", ("2" * 22,))
+    store.put(_jpeg("blue"))
+    assert store.remove_unused() == 1
+    assert store.database.execute_query("SELECT image_hash FROM images;", fetch=True) == [(image_hash,)]
+
+
+def test_cached_images_are_stored_again_after_reset(store):
+    red = _jpeg("red")
+    image_hash = store.put(red)
+
+    store.database.reset_database()
+    assert store.put(red) == image_hash
+    assert store.get(image_hash) == red
+    assert store.database.execute_query("SELECT count(*) FROM images;", fetch=True) == [(1,)]
+
+
+def test_images_are_written_with_the_queued_rows(database, make_track):
+    # the writer thread only writes after flush_interval, unless the queue is flushed
+    write_queue = WriteBehindQueue(database, flush_interval=60)
+    store = ImageStore(database, cache_size=0, write_queue=write_queue)
+
+    red = _jpeg("red")
+    image_hash = store.put(red)
+    write_queue.put(table_name="tracks", row=make_track("1" * 22, track_image=image_hash))
+    assert database.execute_query("SELECT count(*) FROM images;", fetch=True) == [(0,)]
+
+    # images of queued rows are not unused
+    assert store.remove_unused() == 0
+    assert database.fetch_row(table_name="tracks", item_id="1" * 22, table_column="track_image") == (image_hash,)
+
+    # images not written yet are read after flushing the queue
+    blue = _jpeg("blue")
+    assert store.get(store.put(blue)) == blue
+
+    write_queue.close(timeout=10)
+
+    with pytest.raises(InputException):
+        ImageStore(database, write_queue="queue")
@@ -0,0 +1,140 @@
+from code_backend.shared_config import *
+from code_backend.database_writer import WriteBehindQueue
+from code_backend.image_store import ImageStore
+import code_backend.music_classes as music_classes
+from code_backend.music_classes import Album, Track, IdentityMap, ItemQueues, MODEL_CACHE
+from code_backend.exceptions import InputException
+import pytest
+
+
+@pytest.fixture
+def database(database, monkeypatch):
+    monkeypatch.setattr(music_classes, "APP_DATABASE", database)
+    database.add_change_listener(music_classes.MODEL_CACHE.invalidate)
+    music_classes.MODEL_CACHE.clear()
+    yield database
+    music_classes.MODEL_CACHE.clear()
+
+
+@pytest.fixture
+def add_tracks(database, make_track):
+    def add(count: int) -> list[str]:
+        track_ids = [f"{index:022d}" for index in range(1, count + 1)]
+        database.add_items_to_table(table_name="tracks", rows=[make_track(track_id, track_name=f"track {track_id}") for track_id in track_ids])
+        return track_ids
+
+    return add
+
+
+def test_heavy_columns_are_loaded_on_access(database, add_tracks):
+    track_id = add_tracks(1)[0]
+    statements = []
+    database.connections.reader.set_trace_callback(statements.append)
+
+    track = Track(track_id)
+    assert track.track_name == f"track {track_id}" and track.blacklisted == 0
+    assert "track_json" not in track.__dict__
+    assert len(statements) == 1 and "track_json" not in statements[0]
+
+    assert track.track_json == json.dumps({"id": track_id}, separators=(",", ":"))
+    assert track.track_json == json.dumps({"id": track_id}, separators=(",", ":"))
+    assert len(statements) == 2
+
+    with pytest.raises(AttributeError):
+        track.unknown_column
+
+
+def test_prefetch_loads_columns_of_many_items(database, add_tracks):
+    tracks = [Track(track_id) for track_id in add_tracks(30)]
+    statements = []
+    database.connections.reader.set_trace_callback(statements.append)
+
+    Track.prefetch(tracks, ["track_json", "artist_ids"])
+    assert [current_track.artist_ids for current_track in tracks] == [str(["1" * 22])] * 30
+    assert len(statements) == 1
+
+    with pytest.raises(InputException):
+        Track.prefetch(tracks, ["no_column"])
+
+
+def test_identity_map_returns_same_instance_until_changed(database, add_tracks):
+    track_id = add_tracks(1)[0]
+    MODEL_CACHE.reset_stats()
+
+    track = Track(track_id)
+    assert Track(track_id) is track
+    assert MODEL_CACHE.stats["hits"] == 1 and MODEL_CACHE.stats["hit_rate"] == 0.5
+
+    database.update_item(table_name="tracks", item_id=track_id, table_column="blacklisted", new_value=1)
+    updated_track = Track(track_id)
+    assert updated_track is not track and updated_track.blacklisted == 1
+
+    database.remove_specific_item(table_name="tracks", item_id=track_id)
+    assert MODEL_CACHE.stats["invalidated"] == 2
+    assert len(MODEL_CACHE) == 0
+
+
+def test_items_without_row_are_not_kept(database, monkeypatch, add_tracks):
+    track_id = f"{1:022d}"
+    # the requested track is not written, e.g. the write was rejected
+    monkeypatch.setattr(music_classes.request_batcher, "get_track", lambda track_id: {})
+    monkeypatch.setattr(music_classes, "NewTrack", lambda spotify_track: None)
+
+    assert Track(track_id) is not Track(track_id)
+    assert len(MODEL_CACHE) == 0
+
+    add_tracks(1)
+    assert Track(track_id).track_name == f"track {track_id}"
+    assert Track(track_id) is Track(track_id)
+
+
+def test_missing_item_is_requested_and_written(database, monkeypatch):
+    album_id = "2" * 22
+    album = {
+        "id": album_id, "name": "album", "uri": f"spotify:album:{album_id}", "external_urls": {"spotify": ""}, "images": [{}],
+        "total_tracks": 1, "artists": [{"id": "1" * 22}]
+    }
+    track_uri = f"spotify:track:{'3' * 22}"
+
+    # the writer thread only writes after flush_interval, unless the row is flushed
+    write_queue = WriteBehindQueue(database, flush_interval=60)
+    monkeypatch.setattr(music_classes, "WRITE_QUEUE", write_queue)
+    monkeypatch.setattr(music_classes, "IMAGE_STORE", ImageStore(database, write_queue=write_queue))
+    monkeypatch.setattr(music_classes.request_batcher, "get_album", lambda album_id: {album["uri"]: album})
+    monkeypatch.setattr(music_classes.spotify, "get_album_tracks", lambda album_id, get_duration: ({track_uri: {}}, 1000))
+
+    assert Album(album_id).album_name == "album"
+    assert Album(album_id).track_ids == str(["3" * 22])
+    assert database.fetch_row(table_name="albums", item_id=album_id, table_column="total_duration") == (1000,)
+
+    write_queue.close(timeout=10)
+
+
+def test_queued_items_are_not_queued_again(database, make_track, monkeypatch):
+    write_queue = WriteBehindQueue(database, flush_interval=60)
+    monkeypatch.setattr(music_classes, "WRITE_QUEUE", write_queue)
+
+    # the album refers to two tracks, one of them is waiting in the write queue
+    database.add_item_to_table(table_name="albums", album_id="2" * 22, album_name="album", track_ids=["3" * 22, "4" * 22], artist_ids=[])
+    write_queue.put(table_name="tracks", row=make_track("3" * 22))
+
+    item_queues = ItemQueues()
+    item_queues.update_queues()
+    assert "3" * 22 not in item_queues.track_queue and "4" * 22 in item_queues.track_queue
+
+    write_queue.close(timeout=10)
+
+
+def test_identity_map_expires_and_evicts():
+    identity_map = IdentityMap(max_size=2, ttl=60)
+    for index in range(3):
+        identity_map.put("tracks", str(index), index)
+
+    assert identity_map.get("tracks", "0") is None
+    assert identity_map.get("tracks", "2") == 2
+    assert identity_map.stats["evicted"] == 1
+
+    identity_map.ttl = 0
+    time.sleep(0.01)
+    assert identity_map.get("tracks", "2") is None
+    assert identity_map.stats["expired"] == 1
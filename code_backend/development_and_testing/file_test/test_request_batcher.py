@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+from code_backend.request_batcher import RequestBatcher
+from code_backend.exceptions import InputException, CustomException
+import pytest
+
+
+def _fake_several(calls: list):
+    def fetch_several(item_ids, ignore_market=False):
+        calls.append((list(item_ids), ignore_market))
+        if "failing" in item_ids:
+            raise ValueError("request failed")
+        return {
+            f"spotify:track:{item_id}": {"id": item_id, "uri": f"spotify:track:{item_id}"}
+            for item_id in item_ids if item_id != "missing"
+        }
+    return fetch_several
+
+
+def test_concurrent_lookups_are_batched():
+    calls = []
+    fetch_several = _fake_several(calls)
+    item_ids = [f"track{index}" for index in range(45)]
+
+    # the first lookup is fetched immediately, the others are collected while it is in flight
+    def slow_first_fetch(ids, ignore_market=False):
+        while not calls and batcher.stats["lookups"] < len(item_ids):
+            time.sleep(0.001)
+        return fetch_several(ids, ignore_market)
+
+    batcher = RequestBatcher(slow_first_fetch, batch_size=20, window=0.05)
+
+    with ThreadPoolExecutor(max_workers=45) as executor:
+        items = list(executor.map(batcher.get, item_ids))
+
+    assert [item["id"] for item in items] == item_ids
+    assert sorted(len(batch) for batch, _ in calls) == [1, 4, 20, 20]
+    assert batcher.stats == {"lookups": 45, "batches": 4, "fetched_ids": 45}
+
+
+def test_single_lookup_does_not_wait_for_the_window():
+    calls = []
+    batcher = RequestBatcher(_fake_several(calls), batch_size=20, window=10)
+
+    started = time.monotonic()
+    assert batcher.get("a")["id"] == "a" and batcher.get("b")["id"] == "b"
+    assert time.monotonic() - started < 1
+    assert calls == [(["a"], False), (["b"], False)]
+
+
+def test_keyword_arguments_are_batched_separately():
+    calls = []
+    batcher = RequestBatcher(_fake_several(calls), batch_size=20, window=0.01)
+
+    futures = [batcher.submit("a"), batcher.submit("b", ignore_market=True), batcher.submit("a")]
+    items = [future.result(timeout=1) for future in futures]
+    assert [item["id"] for item in items] == ["a", "b", "a"]
+    # callers of the same item get their own copy
+    assert items[0] == items[2] and items[0] is not items[2]
+    assert sorted(calls) == [(["a"], False), (["b"], True)]
+
+
+def test_relinked_missing_and_failed_items():
+    def fetch_relinked(item_ids):
+        return {"spotify:track:new": {"id": "new", "uri": "spotify:track:new", "linked_from": {"id": "old"}}}
+
+    relinked = RequestBatcher(fetch_relinked, batch_size=50, window=0.01)
+    assert relinked.get("old")["id"] == "new"
+    old, new = relinked.submit("old"), relinked.submit("new")
+    assert old.result(timeout=1) == new.result(timeout=1) and old.result() is not new.result()
+
+    batcher = RequestBatcher(_fake_several([]), batch_size=50, window=10)
+    missing, failing = batcher.submit("missing"), batcher.submit("failing")
+    batcher.flush()
+
+    with pytest.raises(ValueError):
+        failing.result(timeout=1)
+    with pytest.raises(ValueError):
+        missing.result(timeout=1)
+
+    batcher.submit("existing")
+    missing = batcher.submit("missing")
+    batcher.flush()
+    with pytest.raises(CustomException):
+        missing.result(timeout=1)
+
+    with pytest.raises(InputException):
+        RequestBatcher(fetch_relinked, batch_size=0)
+
+
+def test_unknown_ids_only_fail_their_caller(monkeypatch):
+    known_id, unknown_id = "1" * 22, "2" * 22
+
+    # the API returns null for unknown ids
+    def api_request_data(url, request_type, json_data):
+        return {"tracks": [{"id": known_id, "uri": f"spotify:track:{known_id}"} if track_id == known_id else None for track_id in url.split("ids=")[1].split("%2C")]}
+
+    monkeypatch.setattr(spotify, "api_request_data", api_request_data)
+    batcher = RequestBatcher(lambda track_ids: spotify.get_several_tracks(track_ids=track_ids), batch_size=50, window=10)
+
+    known, unknown = batcher.submit(known_id), batcher.submit(unknown_id)
+    batcher.flush()
+    assert known.result(timeout=1)["id"] == known_id
+    with pytest.raises(CustomException):
+        unknown.result(timeout=1)
+
+    # relinked tracks whose original track is unknown are kept
+    relinked = {f"spotify:track:{known_id}": {"id": known_id, "uri": f"spotify:track:{known_id}", "linked_from": {"id": unknown_id}}}
+    assert spotify.get_original_tracks(relinked) == relinked
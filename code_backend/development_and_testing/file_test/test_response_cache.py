@@ -0,0 +1,106 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from code_backend.shared_config import *
+from code_backend.http_client import HttpClient
+from code_backend.response_cache import ResponseCache
+from code_backend.exceptions import InputException
+import pytest
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        _ETagHandler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        etag = f'"{sha256(self.path.encode()).hexdigest()[:16]}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = json.dumps({"uri": f"spotify:{self.path}"}).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-store" if "no_store" in self.path else "public, max-age=7200")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    response_cache = ResponseCache(
+        cache_file=str(tmp_path / "http_cache.db"),
+        http_client=HttpClient(),
+        ttl_policy={"albums": 3600, "tracks": 0}
+    )
+    _ETagHandler.requests_seen.clear()
+    yield response_cache
+    response_cache.close()
+
+
+def test_fresh_responses_are_served_from_cache(local_server, cache):
+    url = f"{local_server}/albums/abc?market=DE"
+
+    first = cache.send(requests.Request("GET", url))
+    second = cache.send(requests.Request("GET", url))
+
+    assert first.json() == second.json() == {"uri": "spotify:/v1/albums/abc?market=DE"}
+    assert len(_ETagHandler.requests_seen) == 1
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+    # market is part of the key
+    cache.send(requests.Request("GET", f"{local_server}/albums/abc?market=US"))
+    assert len(_ETagHandler.requests_seen) == 2
+
+
+def test_stale_responses_are_revalidated(local_server, cache):
+    url = f"{local_server}/tracks/abc"
+
+    cache.send(requests.Request("GET", url))
+    response = cache.send(requests.Request("GET", url))
+
+    assert response.status_code == 200
+    assert response.json() == {"uri": "spotify:/v1/tracks/abc"}
+    assert _ETagHandler.requests_seen[1][1] is not None
+    assert cache.stats["revalidated"] == 1
+    assert cache.stats["hit_rate"] == 0.5
+
+
+def test_uncacheable_requests(local_server, cache):
+    cache.send(requests.Request("GET", f"{local_server}/me/player"))
+    cache.send(requests.Request("GET", f"{local_server}/me/player"))
+    cache.send(requests.Request("GET", f"{local_server}/albums/no_store"))
+    cache.send(requests.Request("GET", f"{local_server}/albums/no_store"))
+
+    assert len(_ETagHandler.requests_seen) == 4
+    assert cache.stats["bypassed"] == 2
+    assert cache.stats["stored"] == 0
+
+
+def test_clear(local_server, cache):
+    cache.send(requests.Request("GET", f"{local_server}/albums/abc"))
+    cache.send(requests.Request("GET", f"{local_server}/tracks/abc"))
+
+    assert cache.clear(family="albums") == 1
+    assert cache.clear() == 1
+
+    with pytest.raises(InputException):
+        ResponseCache(ttl_policy=[])
@@ -0,0 +1,70 @@
+import asyncio
+import inspect
+
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+import code_backend.spotify_web_api_async as spotify_async
+from code_backend.spotify_web_api_async import AsyncSpotifyClient, run_sync, gather
+from code_backend.exceptions import InputException, CustomException
+import pytest
+
+
+ALBUM_IDS = [f"{'a' * 21}{index}" for index in range(8)]
+
+
+@pytest.fixture
+def slow_api(monkeypatch):
+    running = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def fake_api_request_data(url, request_type, json_data=None, overwrite_header=None, json_as_data=False):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.1)
+        with lock:
+            running["now"] -= 1
+        album_id = url.split("/albums/")[1].split("?")[0]
+        return {"uri": f"spotify:album:{album_id}", "id": album_id}
+
+    monkeypatch.setattr(spotify, "api_request_data", fake_api_request_data)
+    return running
+
+
+def test_same_surface():
+    for name in ("get_album", "get_several_tracks", "get_playlist_items", "get_artists_albums", "get_artists_top_tracks"):
+        assert inspect.iscoroutinefunction(getattr(spotify_async, name))
+        assert inspect.signature(getattr(spotify_async, name)) == inspect.signature(getattr(spotify, name))
+
+    assert not hasattr(spotify_async, "api_request_data")
+
+
+def test_calls_overlap(slow_api):
+    start = time.monotonic()
+    albums = run_sync(gather(*[spotify_async.get_album(album_id) for album_id in ALBUM_IDS]))
+
+    assert time.monotonic() - start < 0.5
+    assert [uri for album in albums for uri in album.keys()] == [f"spotify:album:{album_id}" for album_id in ALBUM_IDS]
+    assert slow_api["max"] > 1
+
+
+def test_concurrency_is_bounded(slow_api):
+    client = AsyncSpotifyClient(max_concurrency=2)
+
+    async def fetch_all():
+        return await asyncio.gather(*[client.call(spotify.get_album, album_id) for album_id in ALBUM_IDS])
+
+    assert len(client.run_sync(fetch_all())) == len(ALBUM_IDS)
+    assert slow_api["max"] == 2
+    client.close()
+
+    with pytest.raises(InputException):
+        AsyncSpotifyClient(max_concurrency=0)
+
+
+def test_run_sync_inside_loop():
+    async def nested():
+        return run_sync(gather())
+
+    with pytest.raises(CustomException):
+        run_sync(nested())
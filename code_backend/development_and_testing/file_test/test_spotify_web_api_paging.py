@@ -0,0 +1,71 @@
+from urllib.parse import urlparse, parse_qs
+
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+from code_backend.exceptions import InputException
+import pytest
+
+
+PLAYLIST_ID = "6bRkO7PLCXgmV4EJH52iU4"
+TOTAL_TRACKS = 523
+
+
+@pytest.fixture
+def paged_api(monkeypatch):
+    requested = {"urls": [], "running": 0, "max_running": 0}
+    lock = threading.Lock()
+
+    def fake_api_request_data(url, request_type, json_data=None, overwrite_header=None, json_as_data=False):
+        query = parse_qs(urlparse(url).query)
+        offset, limit = int(query["offset"][0]), int(query["limit"][0])
+
+        with lock:
+            requested["urls"].append(url)
+            requested["running"] += 1
+            requested["max_running"] = max(requested["max_running"], requested["running"])
+
+        # later pages answer faster, so they finish first
+        time.sleep(0.05 if offset == 0 else 0.05 / (1 + offset // 50))
+
+        with lock:
+            requested["running"] -= 1
+
+        items = [
+            {"track": {"uri": f"spotify:track:{index:022d}", "duration_ms": 1000}}
+            for index in range(offset, min(offset + limit, TOTAL_TRACKS))
+        ]
+        return {"items": items, "total": TOTAL_TRACKS}
+
+    monkeypatch.setattr(spotify, "api_request_data", fake_api_request_data)
+    return requested
+
+
+def test_pages_are_fetched_concurrently_and_merged_in_order(paged_api):
+    tracks, duration = spotify.get_playlist_items(PLAYLIST_ID, get_duration=True, ignore_market=True)
+
+    assert list(tracks.keys()) == [f"spotify:track:{index:022d}" for index in range(TOTAL_TRACKS)]
+    assert duration == TOTAL_TRACKS * 1000
+    assert len(paged_api["urls"]) == 11
+    assert paged_api["max_running"] > 1
+    assert all("market=" not in url for url in paged_api["urls"])
+
+
+def test_limit_is_respected(paged_api):
+    tracks = spotify.get_users_saved_tracks(limit=120)
+
+    assert len(tracks) == 120
+    assert sorted(parse_qs(urlparse(url).query)["limit"][0] for url in paged_api["urls"]) == ["20", "50", "50"]
+
+
+def test_total_of_the_first_page_is_returned(paged_api):
+    # the total of the endpoint, not the number of fetched items (pages can be missing)
+    items, total = spotify._paginate(page_url=lambda offset, page_limit: f"https://api.spotify.com/v1/me/tracks?limit={page_limit}&offset={offset}", limit=60, get_total=True)
+    assert (len(items), total) == (60, TOTAL_TRACKS)
+
+
+def test_paginate_input():
+    with pytest.raises(InputException):
+        spotify._paginate(page_url="https://api.spotify.com/v1/me/tracks")
+
+    with pytest.raises(InputException):
+        spotify._paginate(page_url=lambda offset, page_limit: "", limit=0)
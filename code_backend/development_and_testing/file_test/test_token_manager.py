@@ -0,0 +1,67 @@
+from code_backend.shared_config import *
+from code_backend import token_manager
+from code_backend.token_manager import TokenManager
+from code_backend.exceptions import InputException
+import pytest
+
+
+def _token(access_token: str, expires_in: int) -> dict:
+    return {"access_token": access_token, "token_type": "Bearer", "expires": int(time.time()) + expires_in}
+
+
+@pytest.fixture
+def env_token(monkeypatch):
+    monkeypatch.setenv("TEST_TOKEN", json.dumps(_token("first", 3600)))
+    written = []
+    monkeypatch.setattr(token_manager, "update_env_key", lambda key, value: written.append((key, value)) or os.environ.__setitem__(key, value))
+    return written
+
+
+def test_token_is_cached(env_token):
+    manager = TokenManager("TEST_TOKEN")
+    assert manager.authorization == "Bearer first"
+
+    # the environment is not parsed again
+    os.environ["TEST_TOKEN"] = json.dumps(_token("second", 3600))
+    assert manager.access_token == "first"
+    assert 3590 < manager.expires_in <= 3600
+
+
+def test_expired_token_is_refreshed(env_token):
+    os.environ["TEST_TOKEN"] = json.dumps(_token("expired", -10))
+    calls = []
+
+    def refresh_callback():
+        calls.append(1)
+        os.environ["TEST_TOKEN"] = json.dumps(_token(f"refreshed_{len(calls)}", 3600))
+
+    manager = TokenManager("TEST_TOKEN", refresh_callback=refresh_callback)
+    assert manager.access_token == "refreshed_1"
+    assert manager.access_token == "refreshed_1"
+    assert len(calls) == 1
+    manager.stop()
+
+
+def test_background_refresh(env_token):
+    os.environ["TEST_TOKEN"] = json.dumps(_token("short_lived", 2))
+    manager = TokenManager("TEST_TOKEN", refresh_margin=1)
+    manager._refresh_callback = lambda: manager.store_token(_token("background", 3600))
+
+    manager.token
+    time.sleep(1.5)
+    assert manager._token["access_token"] == "background"
+    assert env_token[-1][0] == "TEST_TOKEN"
+    manager.stop()
+
+
+def test_store_token_only_writes_changes(env_token):
+    manager = TokenManager("TEST_TOKEN")
+    new_token = _token("new", 3600)
+
+    manager.store_token(new_token)
+    manager.store_token(dict(new_token))
+    assert len(env_token) == 1
+    assert manager.authorization == "Bearer new"
+
+    with pytest.raises(InputException):
+        manager.store_token({"token_type": "Bearer"})
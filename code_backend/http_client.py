@@ -0,0 +1,449 @@
+"""
+    Shared HTTP client layer using pooled keep-alive connections and rate limiting for every request of the project
+"""
+
+import copy
+from concurrent.futures import Future
+from email.utils import parsedate_to_datetime
+
+from requests.adapters import HTTPAdapter
+
+from code_backend.shared_config import *
+from code_backend.exceptions import InputException
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Every request takes one token, tokens are refilled with `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, capacity: int = RATE_LIMIT_BURST) -> None:
+        """
+        :param rate: refilled tokens per second (sustained requests per second)
+        :param capacity: maximum number of stored tokens (burst size)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(rate, (int, float)) or rate <= 0:
+            raise InputException(item_value=rate, valid_values="positive number", valid_types=(int, float))
+
+        if not isinstance(capacity, int) or capacity < 1:
+            raise InputException(item_value=capacity, valid_values="positive integer", valid_types=int)
+
+        self.rate: float = float(rate)
+        self.capacity: int = capacity
+        self._tokens: float = float(capacity)
+        self._last_refill: float = time.monotonic()
+        self._blocked_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """
+        Add the tokens earned since the last refill (needs to be called while holding the lock)
+
+        :param now: current time.monotonic() value
+        """
+
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocks until a token is available
+
+        :return: seconds waited for the token
+        """
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._blocked_until:
+                    wait_time = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    wait_time = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Stop handing out tokens to every thread for the given time (e.g. after a 429 response with Retry-After)
+
+        :param seconds: how long no token is handed out
+        """
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client reusing keep-alive connections. Every host gets its own connection pool, which is limited to `pool_maxsize` connections.
+
+    Rate limited requests take a token of the shared `rate_limiter` first. Throttled requests (429) are retried after the full `Retry-After` time (all threads pause, waits longer than `max_retry_after` raise), failed idempotent requests (5xx) are retried with jittered exponential backoff.
+    """
+
+    IDEMPOTENT_METHODS = ("GET", "PUT", "DELETE", "HEAD", "OPTIONS")
+
+    def __init__(
+            self,
+            pool_connections: int = HTTP_POOL_CONNECTIONS,
+            pool_maxsize: int = HTTP_POOL_MAXSIZE,
+            pool_block: bool = HTTP_POOL_BLOCK,
+            timeout: float | tuple[float, float] = HTTP_TIMEOUT,
+            rate_limiter: TokenBucket | None = None,
+            max_retries: int = HTTP_MAX_RETRIES,
+            max_retry_after: float = HTTP_RETRY_AFTER_MAX
+    ) -> None:
+        """
+        :param pool_connections: number of hosts a connection pool is kept for
+        :param pool_maxsize: maximum number of keep-alive connections per host
+        :param pool_block: True: wait for a free connection if a host reached `pool_maxsize`; False: open additional (not reused) connections
+        :param timeout: default timeout for every request, either one value or (connect, read) in seconds
+        :param rate_limiter: token bucket shared by all rate limited requests (None: new TokenBucket with default limits)
+        :param max_retries: how often a throttled (429) or failed (5xx) request is retried
+        :param max_retry_after: longest Retry-After in seconds a throttled request waits for
+        :raises InputException: if input is invalid
+        """
+
+        if rate_limiter is not None and not isinstance(rate_limiter, TokenBucket):
+            raise InputException(item_value=rate_limiter, valid_values="TokenBucket(...)", valid_types=(TokenBucket, None))
+
+        if not isinstance(max_retries, int) or max_retries < 0:
+            raise InputException(item_value=max_retries, valid_values="0 <= max_retries", valid_types=int)
+
+        if not isinstance(max_retry_after, (int, float)) or max_retry_after < 0:
+            raise InputException(item_value=max_retry_after, valid_values="0 <= max_retry_after", valid_types=(int, float))
+
+        self.rate_limiter: TokenBucket = rate_limiter if rate_limiter is not None else TokenBucket()
+        self.max_retries: int = max_retries
+        self.max_retry_after: float = max_retry_after
+        self._stats = {"requests": 0, "throttled": 0, "retried": 0, "server_errors": 0, "waited_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+        self._session: requests.Session | None = None
+        self._session_lock = threading.Lock()
+
+        self.pool_connections: int = HTTP_POOL_CONNECTIONS
+        self.pool_maxsize: int = HTTP_POOL_MAXSIZE
+        self.pool_block: bool = HTTP_POOL_BLOCK
+        self.timeout: float | tuple[float, float] = HTTP_TIMEOUT
+        self.configure_pool(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block, timeout=timeout)
+
+    def configure_pool(
+            self,
+            pool_connections: int | None = None,
+            pool_maxsize: int | None = None,
+            pool_block: bool | None = None,
+            timeout: float | tuple[float, float] | None = None
+    ) -> None:
+        """
+        Tune the connection pool. The current session gets closed and a new one is created with the next request (None keeps the current value).
+
+        :param pool_connections: number of hosts a connection pool is kept for
+        :param pool_maxsize: maximum number of keep-alive connections per host
+        :param pool_block: True: wait for a free connection if a host reached `pool_maxsize`; False: open additional (not reused) connections
+        :param timeout: default timeout for every request, either one value or (connect, read) in seconds
+        :raises InputException: if input is invalid
+        """
+
+        if pool_connections is not None and (not isinstance(pool_connections, int) or pool_connections < 1):
+            raise InputException(item_value=pool_connections, valid_values="positive integer", valid_types=int)
+
+        if pool_maxsize is not None and (not isinstance(pool_maxsize, int) or pool_maxsize < 1):
+            raise InputException(item_value=pool_maxsize, valid_values="positive integer", valid_types=int)
+
+        if pool_block is not None and not isinstance(pool_block, bool):
+            raise InputException(item_value=pool_block, valid_values=(True, False), valid_types=bool)
+
+        if timeout is not None and not isinstance(timeout, (int, float, tuple)):
+            raise InputException(item_value=timeout, valid_values="seconds or (connect, read) seconds", valid_types=(int, float, tuple))
+
+        with self._session_lock:
+            if pool_connections is not None: self.pool_connections = pool_connections
+            if pool_maxsize is not None: self.pool_maxsize = pool_maxsize
+            if pool_block is not None: self.pool_block = pool_block
+            if timeout is not None: self.timeout = timeout
+
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Get the shared session (created on first access)
+
+        :return: requests Session with mounted pooling adapters
+        """
+
+        # read once: configure_pool() or close() of another thread may reset self._session at any time
+        session = self._session
+        if session is None:
+            with self._session_lock:
+                session = self._session
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=self.pool_block,
+                        max_retries=0
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"Connection": "keep-alive"})
+                    self._session = session
+
+        return session
+
+    def send(
+            self,
+            query: requests.Request,
+            timeout: float | tuple[float, float] | None = None,
+            rate_limited: bool = True
+    ) -> requests.Response:
+        """
+        Send a request using a pooled connection. Throttled (429) and failed idempotent (5xx) requests are retried up to `max_retries` times, afterward the last response is returned.
+
+        :param query: request to send
+        :param timeout: timeout for this request (None: use default timeout)
+        :param rate_limited: True: take a token of the rate limiter before every attempt (Spotify API); False: send immediately (e.g. image CDN)
+        :return: response of the server
+        :raises InputException: if input is invalid
+        :raises requests.exceptions.RequestException: if Exception occurs while using requests
+        :raises requests.exceptions.RetryError: if a throttled request should wait longer than `max_retry_after`
+        """
+
+        if not isinstance(query, requests.Request):
+            raise InputException(item_value=query, valid_values="requests.Request(...)", valid_types=requests.Request)
+
+        if not isinstance(rate_limited, bool):
+            raise InputException(item_value=rate_limited, valid_values=(True, False), valid_types=bool)
+
+        session = self.session
+        prepared_query = session.prepare_request(query)
+
+        attempt = 0
+        while True:
+            if rate_limited:
+                self._count("waited_seconds", self.rate_limiter.acquire())
+
+            response = session.send(prepared_query, timeout=timeout if timeout is not None else self.timeout)
+            self._count("requests")
+
+            if response.status_code == 429:
+                self._count("throttled")
+                wait_time = self._retry_after(response, attempt)
+            elif response.status_code >= 500 and prepared_query.method in self.IDEMPOTENT_METHODS:
+                self._count("server_errors")
+                # full jitter: random wait between 0 and the exponential backoff
+                wait_time = random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt))
+            else:
+                return response
+
+            if attempt >= self.max_retries:
+                return response
+
+            if wait_time > self.max_retry_after:
+                response.close()
+                raise requests.exceptions.RetryError(
+                    f"Request was throttled for {wait_time:.0f} seconds (Retry-After), longer than max_retry_after ({self.max_retry_after:.0f} seconds)",
+                    response=response, request=prepared_query
+                )
+
+            attempt += 1
+            self._count("retried")
+            response.close()
+
+            if response.status_code == 429 and rate_limited:
+                # every thread pauses, since the rate limit is shared by all requests
+                self.rate_limiter.block_for(wait_time)
+            else:
+                self._count("waited_seconds", wait_time)
+                time.sleep(wait_time)
+
+    @staticmethod
+    def _retry_after(response: requests.Response, attempt: int) -> float:
+        """
+        Get the time to wait after a throttled response, using the `Retry-After` header (seconds or HTTP date) if available. Retry-After is not capped: retrying earlier is throttled again
+
+        :param response: throttled response
+        :param attempt: number of the current retry (fallback: exponential backoff)
+        :return: seconds to wait
+        """
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+        return min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt)
+
+    def _count(self, counter: str, value: int | float = 1) -> None:
+        """
+        Thread-safe increment of a statistics counter
+
+        :param counter: counter name
+        :param value: value to add
+        """
+
+        if value:
+            with self._stats_lock:
+                self._stats[counter] += value
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get the request statistics
+
+        :return: Dict containing the counters, in the form of {'requests': ..., 'throttled': ..., 'retried': ..., 'server_errors': ..., 'waited_seconds': ...}
+        """
+
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """
+        Reset all request statistics to 0
+        """
+
+        with self._stats_lock:
+            for counter in self._stats.keys():
+                self._stats[counter] = 0
+
+    def request(self, method: Literal["GET", "POST", "DELETE", "PUT"], url: str, rate_limited: bool = True, **kwargs) -> requests.Response:
+        """
+        Shortcut for `send(requests.Request(method, url, ...))`
+
+        :param method: HTTP request method
+        :param url: url to send the request to
+        :param rate_limited: True: take a token of the rate limiter before every attempt (Spotify API); False: send immediately
+        :param kwargs: keyword arguments passed to requests.Request (e.g. headers, json, data)
+        :return: response of the server
+        :raises InputException: if input is invalid
+        :raises requests.exceptions.RequestException: if Exception occurs while using requests
+        """
+
+        timeout = kwargs.pop("timeout", None)
+        return self.send(requests.Request(method=method, url=url, **kwargs), timeout=timeout, rate_limited=rate_limited)
+
+    def close(self) -> None:
+        """
+        Close all pooled connections
+        """
+
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical calls running at the same time: the first caller of a key executes the function, every caller arriving before it finished waits for and shares its result (or exception).
+
+    Shared results are deep-copied for every caller (the executing one included), so callers can modify their result. A result nobody waited for is returned without copy.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executed": 0, "duplicates": 0}
+
+    def do(self, key: Hashable, function: Callable, *args, **kwargs) -> tuple[Any, bool]:
+        """
+        Execute the function, unless a call with the same key is already running
+
+        :param key: identifies identical calls (e.g. (url, authorization))
+        :param function: function to execute
+        :param args: positional arguments of the function
+        :param kwargs: keyword arguments of the function
+        :return: result of the function (a copy, if the result is shared) and whether it was shared with a running call (True: result of another caller)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(key, Hashable):
+            raise InputException(item_value=key, valid_values="hashable key (e.g. tuple of strings)", valid_types=Hashable)
+
+        with self._lock:
+            self._stats["calls"] += 1
+            running_call = self._calls.get(key, None)
+
+            if running_call is not None:
+                self._stats["duplicates"] += 1
+                running_call.waiters += 1
+            else:
+                future = Future()
+                future.waiters = 0
+                self._calls[key] = future
+                self._stats["executed"] += 1
+
+        if running_call is not None:
+            return copy.deepcopy(running_call.result()), True
+
+        try:
+            result = function(*args, **kwargs)
+            future.set_result(result)
+
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = future.waiters > 0
+
+        # the waiting callers copy the stored result, so it must not be modified either
+        return (copy.deepcopy(result) if shared else result), False
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Get the number of running calls
+
+        :return: number of distinct keys currently executed
+        """
+
+        with self._lock:
+            return len(self._calls)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Get the coalescing statistics
+
+        :return: Dict containing the counters, in the form of {'calls': ..., 'executed': ..., 'duplicates': ...}
+        """
+
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """
+        Reset all coalescing statistics to 0
+        """
+
+        with self._lock:
+            for counter in self._stats.keys():
+                self._stats[counter] = 0
+
+
+HTTP_CLIENT = HttpClient()
+SINGLE_FLIGHT = SingleFlight()
+
+if __name__ == '__main__':
+    """"""
@@ -0,0 +1,344 @@
+"""
+    Content-addressed store for the cover images of albums, artists, playlists, tracks and users (table `images` of the main database)
+"""
+
+from collections import OrderedDict
+from types import NoneType
+
+from code_backend.shared_config import *
+from code_backend.secondary_methods import absolute_path, bytes_to_image, image_to_b64
+from code_backend.database_access import DatabaseAccess, APP_DATABASE
+from code_backend.database_writer import WriteBehindQueue, WRITE_QUEUE
+from code_backend.http_client import HttpClient, HTTP_CLIENT
+from code_backend.exceptions import InputException, RequestException
+
+
+# columns referencing an image: {table_name: column}
+IMAGE_COLUMNS: dict[str, str] = {
+    "albums": "album_image",
+    "artists": "artist_image",
+    "playlists": "playlist_image",
+    "tracks": "track_image",
+    "users": "user_image"
+}
+
+
+class ImageStore:
+    """
+    Stores every image once, keyed by the sha256 hash of its bytes. Items only keep the hash in their *_image column (the tracks of an album share the cover of the album), the bytes are loaded when the image is accessed.
+
+    Images are stored as downloaded (no re-encoding). Urls and files already stored are remembered, so e.g. the cover of an album is downloaded once for all of its tracks.
+
+    With a write queue, new images are written by its writer thread together with the queued rows referencing them (the caller does not wait for a commit); reads of images that are not stored yet flush the queue first.
+    """
+
+    def __init__(
+            self,
+            database: DatabaseAccess,
+            http_client: HttpClient = HTTP_CLIENT,
+            cache_size: int = IMAGE_CACHE_SIZE,
+            write_queue: WriteBehindQueue | None = None
+    ) -> None:
+        """
+        :param database: database containing the table `images`
+        :param http_client: client used to download images
+        :param cache_size: number of images whose bytes are kept in memory
+        :param write_queue: queue writing new images (None: written immediately)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(database, DatabaseAccess):
+            raise InputException(item_value=database, valid_values="DatabaseAccess(...)", valid_types=DatabaseAccess)
+
+        if not isinstance(http_client, HttpClient):
+            raise InputException(item_value=http_client, valid_values="HttpClient(...)", valid_types=HttpClient)
+
+        if not isinstance(cache_size, int) or cache_size < 0:
+            raise InputException(item_value=cache_size, valid_values="0 <= cache_size", valid_types=int)
+
+        if write_queue is not None and (not isinstance(write_queue, WriteBehindQueue) or write_queue.database is not database):
+            raise InputException(item_value=write_queue, valid_values="WriteBehindQueue(database) or None", valid_types=(WriteBehindQueue, NoneType))
+
+        self.database: DatabaseAccess = database
+        self.http_client: HttpClient = http_client
+        self.cache_size: int = cache_size
+        self.write_queue: WriteBehindQueue | None = write_queue
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, bytes] = OrderedDict()
+        self._sources: dict[str, str] = {}  # {url or file path: image_hash}
+        self._stats = {"stored": 0, "deduplicated": 0, "downloads_saved": 0, "cache_hits": 0, "loaded": 0}
+
+        self.database.add_change_listener(self._on_change)
+
+    @staticmethod
+    def image_hash(image_bytes: bytes) -> str:
+        """
+        :param image_bytes: image bytes
+        :return: hex digest of the sha256 hash of the bytes
+        """
+
+        return sha256(image_bytes).hexdigest()
+
+    def _count(self, counter: str) -> None:
+        """
+        :param counter: name of the counter to increase
+        """
+
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _on_change(self, table_name: str | None, item_id: str | None) -> None:
+        """
+        Change listener of the database: the cached images and sources are dropped when the images are removed (e.g. by reset_database()), so no hash of a removed image is handed out
+
+        :param table_name: name of the changed table (None: every table)
+        :param item_id: id of the changed item (None: every item of the table)
+        """
+
+        if table_name in (None, "images"):
+            with self._lock:
+                self._cache.clear()
+                self._sources.clear()
+
+    def put(self, image_bytes: bytes, image_format: str = "JPEG") -> str:
+        """
+        Store image bytes (nothing is written if the same bytes are already stored)
+
+        :param image_bytes: encoded image (e.g. JPEG file content)
+        :param image_format: format of the bytes (e.g. 'JPEG', 'PNG')
+        :return: hash of the image, referenced by the items
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(image_bytes, bytes) or not image_bytes:
+            raise InputException(item_value=image_bytes, valid_values="encoded image", valid_types=bytes)
+
+        if not isinstance(image_format, str):
+            raise InputException(item_value=image_format, valid_values="Image formats from (https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html)", valid_types=str)
+
+        image_hash = self.image_hash(image_bytes)
+        with self._lock:
+            if image_hash in self._cache:
+                self._stats["deduplicated"] += 1
+                return image_hash
+
+        if self.database.execute_query("SELECT 1 FROM images WHERE image_hash = ?;", (image_hash,), fetch=True):
+            self._count("deduplicated")
+        elif self.write_queue is not None:
+            self.write_queue.put(table_name="images", row={
+                "image_hash": image_hash, "image_format": image_format.upper(), "byte_size": len(image_bytes), "image_bytes": image_bytes
+            })
+            self._count("stored")
+        else:
+            self.database.execute_query(
+                "INSERT OR IGNORE INTO images (image_hash, image_format, byte_size, image_bytes) VALUES (?, ?, ?, ?);",
+                (image_hash, image_format.upper(), len(image_bytes), image_bytes)
+            )
+            self._count("stored")
+
+        self._remember(image_hash, image_bytes)
+        return image_hash
+
+    def put_url(self, image_url: str) -> str:
+        """
+        Download and store an image (urls stored before are not downloaded again)
+
+        :param image_url: url to image
+        :return: hash of the image
+        :raises InputException: if input is invalid
+        :raises RequestException: if Exception occurs while downloading the image
+        """
+
+        if not isinstance(image_url, str):
+            raise InputException(item_value=image_url, valid_values="valid url", valid_types=str)
+
+        with self._lock:
+            image_hash = self._sources.get(image_url)
+        if image_hash is not None:
+            self._count("downloads_saved")
+            return image_hash
+
+        query = requests.Request('GET', image_url)
+        try:
+            # images are served by Spotify's CDN, which does not count towards the Web API rate limit
+            response = self.http_client.send(query, rate_limited=False)
+            response.raise_for_status()
+
+        except requests.exceptions.RequestException as error:
+            raise RequestException(error=error, request_query=query)
+
+        image_format = response.headers.get("Content-Type", "image/jpeg").split("/")[-1].upper()
+        image_hash = self.put(response.content, image_format="JPEG" if image_format == "JPG" else image_format)
+
+        with self._lock:
+            self._sources[image_url] = image_hash
+        return image_hash
+
+    def put_file(self, image_path: str) -> str:
+        """
+        Store an image file (e.g. NO_IMAGE_PATH)
+
+        :param image_path: path to image
+        :return: hash of the image
+        :raises InputException: if input is invalid
+        """
+
+        image_path = absolute_path(image_path, is_file=True)
+
+        with self._lock:
+            image_hash = self._sources.get(image_path)
+        if image_hash is not None:
+            return image_hash
+
+        with open(image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+
+        image_format = os.path.splitext(image_path)[1].removeprefix(".").upper()
+        image_hash = self.put(image_bytes, image_format="JPEG" if image_format == "JPG" else image_format)
+
+        with self._lock:
+            self._sources[image_path] = image_hash
+        return image_hash
+
+    def _remember(self, image_hash: str, image_bytes: bytes) -> None:
+        """
+        Keep image bytes in the in-memory cache (least recently used images are dropped)
+
+        :param image_hash: hash of the image
+        :param image_bytes: image bytes
+        """
+
+        if self.cache_size == 0:
+            return
+
+        with self._lock:
+            self._cache[image_hash] = image_bytes
+            self._cache.move_to_end(image_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _fetch(self, table_columns: str, image_hash: str) -> list[tuple]:
+        """
+        Query a stored image, images still queued in the write queue are written first
+
+        :param table_columns: selected columns of the table `images`
+        :param image_hash: hash of the image
+        :return: List containing the row (empty if the image is not stored)
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        sql_query = f"SELECT {table_columns} FROM images WHERE image_hash = ?;"
+        result = self.database.execute_query(sql_query, (image_hash,), fetch=True)
+        if not result and self.write_queue is not None:
+            self.write_queue.flush()
+            result = self.database.execute_query(sql_query, (image_hash,), fetch=True)
+
+        return result
+
+    def get(self, image_hash: str) -> bytes | None:
+        """
+        Load the bytes of an image
+
+        :param image_hash: hash of the image (value of a *_image column)
+        :return: image bytes (None if the image is not stored)
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(image_hash, str):
+            raise InputException(item_value=image_hash, valid_values="sha256 hex digest", valid_types=str)
+
+        with self._lock:
+            if image_hash in self._cache:
+                self._cache.move_to_end(image_hash)
+                self._stats["cache_hits"] += 1
+                return self._cache[image_hash]
+
+        result = self._fetch("image_bytes", image_hash)
+        if not result:
+            return None
+
+        self._count("loaded")
+        self._remember(image_hash, result[0][0])
+        return result[0][0]
+
+    def get_image(self, image_hash: str) -> Image:
+        """
+        Load an image as Pillow Image, images that are not stored (e.g. of the dummy items) are replaced by NO_IMAGE_PATH
+
+        :param image_hash: hash of the image (value of a *_image column)
+        :return: Pillow Image
+        :raises CustomException: If Exception occurs
+        """
+
+        image_bytes = self.get(image_hash) if image_hash else None
+        if image_bytes is None:
+            image_bytes = self.get(self.put_file(NO_IMAGE_PATH))
+
+        return bytes_to_image(image_bytes)
+
+    def get_b64(self, image_hash: str) -> str | None:
+        """
+        Load an image as base64 encoded JPEG (e.g. to upload it as playlist cover)
+
+        :param image_hash: hash of the image
+        :return: base64 encoded image (None if the image is not stored)
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        result = self._fetch("image_format, image_bytes", image_hash)
+        if not result:
+            return None
+
+        image_format, image_bytes = result[0]
+        if image_format == "JPEG":
+            return base64.b64encode(image_bytes).decode()
+
+        return image_to_b64(bytes_to_image(image_bytes), "JPEG")
+
+    def remove_unused(self) -> int:
+        """
+        Delete the images no item refers to anymore (rows waiting in the write queue are written first, so their images are kept)
+
+        :return: number of deleted images
+        :raises CustomException: If Exception occurred while writing the queued rows
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if self.write_queue is not None:
+            self.write_queue.flush()
+
+        # NOT IN gives NULL (no row) as soon as the subquery contains NULL
+        referenced = " UNION ".join(f"SELECT {column} FROM {table_name} WHERE {column} IS NOT NULL" for table_name, column in IMAGE_COLUMNS.items())
+
+        # no rows are written between finding and deleting the unused images
+        with self.database.connections.write_lock:
+            unused = self.database.execute_query(f"SELECT image_hash FROM images WHERE image_hash NOT IN ({referenced});", fetch=True)
+            if unused:
+                self.database.execute_many([("DELETE FROM images WHERE image_hash = ?;", unused)])
+
+        unused_hashes = {image_hash for (image_hash,) in unused}
+        with self._lock:
+            for image_hash in unused_hashes:
+                self._cache.pop(image_hash, None)
+            self._sources = {source: image_hash for source, image_hash in self._sources.items() if image_hash not in unused_hashes}
+
+        return len(unused)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        :return: Dict containing the statistics, in the form of {'stored': ..., 'deduplicated': ..., 'downloads_saved': ..., 'cache_hits': ..., 'loaded': ...}
+        """
+
+        with self._lock:
+            return dict(self._stats)
+
+
+IMAGE_STORE = ImageStore(APP_DATABASE, write_queue=WRITE_QUEUE)
+
+
+if __name__ == '__main__':
+    """"""
@@ -3,10 +3,11 @@ from code_backend.shared_config import *
 import code_backend.organize_playlist as organize
 import code_backend.spotify_web_api as spotify
 from code_backend.database_access import APP_DATABASE
+from code_backend.blacklist import BLACKLIST
 from code_backend.exceptions import SpotifyApiException, HttpException, InputException
 from code_backend.music_classes import Album, Artist, Device, Playlist, Track, User
 from code_backend.secondary_methods import (
-    uri_to_id, load_json, url_to_uri, key_from_dict, check_limits
+    uri_to_id, load_json, url_to_uri, key_from_dict, check_limits, load_dict_from_database
 )
 import code
 import readline
@@ -181,29 +182,11 @@ class Player:
         if self.dummy_player:
             return
 
-        collection_id, collection_type = uri_to_id(self.player['context']['uri'], get_type=True)
-        collection_is_blacklisted = APP_DATABASE.fetch_row(
-            table_name=f"{collection_type}s",
-            item_id=collection_id,
-            table_column="blacklisted"
-        )[0]
-        album_is_blacklisted = APP_DATABASE.fetch_row(
-            table_name='albums',
-            item_id=self.current_album.album_id,
-            table_column="blacklisted"
-        )[0]
-        artist_is_blacklisted = APP_DATABASE.fetch_row(
-            table_name='artists',
-            item_id=self.current_artist.artist_id,
-            table_column="blacklisted"
-        )[0]
-        track_is_blacklisted = APP_DATABASE.fetch_row(
-            table_name='tracks',
-            item_id=self.current_track.track_id,
-            table_column="blacklisted"
-        )[0]
-
-        if any([album_is_blacklisted, collection_is_blacklisted, artist_is_blacklisted, track_is_blacklisted]):
+        # checked against the in-memory blacklist, no Database query
+        if any(
+                BLACKLIST.is_blacklisted(item_type=current_item.table_name[:-1], item_id=current_item.item_id)
+                for current_item in (self.current_album, self.current_collection, self.current_artist, self.current_track)
+        ):
             self.next_track()
 
 
@@ -227,6 +210,7 @@ class SpotifyApp:
         select_correct: bool = False,
         limit: int = 20,
         offset: int = 0,
+        remote_fallback: bool = False
     ) -> dict | None:
         """
         Get Spotify catalog information about albums, artists, playlists, tracks, shows, episodes or audiobooks that match a keyword string.
@@ -244,20 +228,40 @@ class SpotifyApp:
         :param select_correct: True: Select correct item with CLI; False: return all items.
         :param limit: The maximum number of results to return in each item type. Default: 20. Minimum: 1. Maximum: 50.
         :param offset: The index of the first result to return. Use with limit to get the next page of search results. Default: 0. Minimum: 0. Maximum: 1000-limit.
+        :param remote_fallback: True: search with the Spotify API if no stored item matches (the stored items are always searched first, using the local search index)
         :return: Dict containing the Search response, in the form of {item_uri: item}
         :raises InputException: if input is invalid
         :raises LimitException: if limit is invalid
         """
 
-        results = spotify.search_for_item(
-            search_query=search_query,
-            item_type=item_type,
-            limit=limit,
-            offset=offset
-        )
+        results = {}
+        local_types = [current_type for current_type in item_type if current_type in ["album", "artist", "playlist", "track"]]
+        if local_types:
+            matches = APP_DATABASE.search_items(search_query=search_query, item_types=local_types, limit=limit, offset=offset)
+
+            stored_items = {}
+            for current_type in local_types:
+                item_ids = [match["item_id"] for match in matches.values() if match["item_type"] == current_type]
+                if item_ids:
+                    rows = APP_DATABASE.fetch_rows_by_id(table_name=f"{current_type}s", item_ids=item_ids, table_columns=[f"{current_type}_json"])
+                    stored_items.update({(current_type, item_id): row[0] for item_id, row in rows.items()})
+
+            # ordered by relevance
+            results = {
+                item_uri: load_dict_from_database(stored_items[(match["item_type"], match["item_id"])])
+                for item_uri, match in matches.items() if (match["item_type"], match["item_id"]) in stored_items
+            }
+
+        if not results and remote_fallback:
+            results = spotify.search_for_item(
+                search_query=search_query,
+                item_type=item_type,
+                limit=limit,
+                offset=offset
+            )
 
         # Choose right one
-        if select_correct:
+        if select_correct and results:
             print(f"\n{TEXTCOLOR}These items are found by your search {search_query}:")
             item_counter = 1
             for item_uri, item in results.items():
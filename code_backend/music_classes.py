@@ -1,17 +1,22 @@
 """
 File to develop and debug methods, class and more
 """
+from collections import OrderedDict
+
 from code_backend.shared_config import *
 from code_backend.secondary_methods import (
-    uri_to_id, list_from_id_string, file_image_bytes,
-    spotify_image_bytes, url_to_uri, exclude_from_dict, id_to_uri,
+    uri_to_id, list_from_id_string, url_to_uri, exclude_from_dict, id_to_uri,
     check_token_expired, load_json, debug_json, print_debug,
     load_list_from_database, value_from_dict,
     check_spotify_uri, check_spotify_uris, check_spotify_id, check_spotify_ids,
     check_limits
 )
 import code_backend.spotify_web_api as spotify
+import code_backend.spotify_web_api_async as spotify_async
+import code_backend.request_batcher as request_batcher
 from code_backend.database_access import APP_DATABASE
+from code_backend.database_writer import WRITE_QUEUE
+from code_backend.image_store import IMAGE_STORE
 from code_backend.exceptions import (
     SpotifyApiException, SpotifyUriException, SpotifyIdException,
     InputException, CustomException
@@ -43,9 +48,10 @@ class _SpotifyObject:
 class NewAlbum(_SpotifyObject):
     """"""
 
-    def __init__(self, spotify_album: dict):
+    def __init__(self, spotify_album: dict, write_to_database: bool = True):
         """
         :param spotify_album: Dict containing Spotify Albums, in the form of {album_uri: album}
+        :param write_to_database: True: the row is queued in WRITE_QUEUE (written in the background); False: the row is only built (self.row), e.g. to add many items at once with APP_DATABASE.add_items_to_table() or APP_DATABASE.upsert_items()
         :raises InputException: if input is invalid
         """
 
@@ -61,17 +67,16 @@ class NewAlbum(_SpotifyObject):
         self.album_url: str = self.album_json['external_urls']['spotify']
 
         if 'url' not in self.album_json['images'][0]:
-            self.album_image: str = file_image_bytes(NO_IMAGE_PATH)
+            self.album_image: str = IMAGE_STORE.put_file(NO_IMAGE_PATH)
         else:
-            self.album_image: str = spotify_image_bytes(self.album_json['images'][0]['url'])
+            self.album_image: str = IMAGE_STORE.put_url(self.album_json['images'][0]['url'])
 
         tracks, self.total_duration = spotify.get_album_tracks(self.album_id, get_duration=True)
         self.track_count: int = self.album_json['total_tracks']
         self.artist_ids: list[str] = [current_artist['id'] for current_artist in self.album_json['artists']]
         self.track_ids: list[str] = [uri_to_id(current_track) for current_track in tracks.keys()]
 
-        APP_DATABASE.add_item_to_table(
-            table_name='albums',
+        self.row: dict = dict(
             album_id=self.album_id,
             album_name=self.album_name,
             album_uri=self.album_uri,
@@ -87,14 +92,18 @@ class NewAlbum(_SpotifyObject):
             album_json=self.album_json
         )
 
+        if write_to_database:
+            WRITE_QUEUE.put(table_name='albums', row=self.row)
+
 
 class NewArtist(_SpotifyObject):
     """"""
 
-    def __init__(self, spotify_artist: dict):
+    def __init__(self, spotify_artist: dict, write_to_database: bool = True):
         """
 
         :param spotify_artist: Dict containing Spotify Artists, in the form of {artist_uri: artist}
+        :param write_to_database: True: the row is queued in WRITE_QUEUE (written in the background); False: the row is only built (self.row), e.g. to add many items at once with APP_DATABASE.add_items_to_table() or APP_DATABASE.upsert_items()
         :raises InputException: if input is invalid
         """
         if not isinstance(spotify_artist, dict):
@@ -109,12 +118,15 @@ class NewArtist(_SpotifyObject):
         self.artist_url: str = self.artist_json['external_urls']['spotify']
 
         if 'url' not in self.artist_json['images'][0]:
-            self.artist_image: str = file_image_bytes(NO_IMAGE_PATH)
+            self.artist_image: str = IMAGE_STORE.put_file(NO_IMAGE_PATH)
         else:
-            self.artist_image: str = spotify_image_bytes(self.artist_json['images'][0]['url'])
+            self.artist_image: str = IMAGE_STORE.put_url(self.artist_json['images'][0]['url'])
 
-        albums: dict = spotify.get_artists_albums(artist_id=self.artist_id)
-        top_tracks: dict = spotify.get_artists_top_tracks(self.artist_id)
+        # both requests are independent, fetch them concurrently
+        albums, top_tracks = spotify_async.run_sync(spotify_async.gather(
+            spotify_async.get_artists_albums(artist_id=self.artist_id),
+            spotify_async.get_artists_top_tracks(self.artist_id)
+        ))
 
         self.follower: int = self.artist_json['followers']['total']
         self.album_ids: list[str] = [uri_to_id(current_album) for current_album in albums.keys()]
@@ -122,8 +134,7 @@ class NewArtist(_SpotifyObject):
         self.playlist_ids: list[str] = []
         self.top_track_ids: list[str] = [uri_to_id(current_track) for current_track in top_tracks.keys()]
 
-        APP_DATABASE.add_item_to_table(
-            table_name='artists',
+        self.row: dict = dict(
             artist_id=self.artist_id,
             artist_name=self.artist_name,
             artist_uri=self.artist_uri,
@@ -139,14 +150,18 @@ class NewArtist(_SpotifyObject):
             artist_json=self.artist_json
         )
 
+        if write_to_database:
+            WRITE_QUEUE.put(table_name='artists', row=self.row)
+
 
 class NewPlaylist(_SpotifyObject):
     """"""
 
-    def __init__(self, spotify_playlist: dict):
+    def __init__(self, spotify_playlist: dict, write_to_database: bool = True):
         """
 
         :param spotify_playlist: Dict containing Spotify Playlists, in the form of {playlist_uri: playlist}
+        :param write_to_database: True: the row is queued in WRITE_QUEUE (written in the background); False: the row is only built (self.row), e.g. to add many items at once with APP_DATABASE.add_items_to_table() or APP_DATABASE.upsert_items()
         :raises InputException: if input is invalid
         """
         if not isinstance(spotify_playlist, dict):
@@ -161,17 +176,16 @@ class NewPlaylist(_SpotifyObject):
         self.playlist_url: str = self.playlist_json['external_urls']['spotify']
 
         if 'url' not in self.playlist_json['images'][0]:
-            self.playlist_image: str = file_image_bytes(NO_IMAGE_PATH)
+            self.playlist_image: str = IMAGE_STORE.put_file(NO_IMAGE_PATH)
         else:
-            self.playlist_image: str = spotify_image_bytes(self.playlist_json['images'][0]['url'])
+            self.playlist_image: str = IMAGE_STORE.put_url(self.playlist_json['images'][0]['url'])
 
         playlist_items, self.total_duration = spotify.get_playlist_items(playlist_id=self.playlist_id, get_duration=True)
         self.track_count: int = self.playlist_json['tracks']['total']
         self.owner_id: str = self.playlist_json['owner']['id']
         self.track_ids: list[str] = [uri_to_id(current_track) for current_track in playlist_items.keys()]
 
-        APP_DATABASE.add_item_to_table(
-            table_name='playlists',
+        self.row: dict = dict(
             playlist_id=self.playlist_id,
             playlist_name=self.playlist_name,
             playlist_uri=self.playlist_uri,
@@ -187,14 +201,18 @@ class NewPlaylist(_SpotifyObject):
             playlist_json=self.playlist_json
         )
 
+        if write_to_database:
+            WRITE_QUEUE.put(table_name='playlists', row=self.row)
+
 
 class NewTrack(_SpotifyObject):
     """"""
 
-    def __init__(self, spotify_track: dict):
+    def __init__(self, spotify_track: dict, write_to_database: bool = True):
         """
 
         :param spotify_track: Dict containing Spotify Tracks, in the form of {track_uri: track}
+        :param write_to_database: True: the row is queued in WRITE_QUEUE (written in the background); False: the row is only built (self.row), e.g. to add many items at once with APP_DATABASE.add_items_to_table() or APP_DATABASE.upsert_items()
         :raises InputException: if input is invalid
         """
         if not isinstance(spotify_track, dict):
@@ -209,9 +227,9 @@ class NewTrack(_SpotifyObject):
         self.track_url: str = self.track_json['external_urls']['spotify']
 
         if 'images' not in self.track_json:
-            self.track_image: str = spotify_image_bytes(self.track_json['album']['images'][0]['url'])
+            self.track_image: str = IMAGE_STORE.put_url(self.track_json['album']['images'][0]['url'])
         else:
-            self.track_image: str = file_image_bytes(NO_IMAGE_PATH)
+            self.track_image: str = IMAGE_STORE.put_file(NO_IMAGE_PATH)
 
         self.track_duration: int = self.track_json['duration_ms']
         self.album_id: str = self.track_json['album']['id']
@@ -219,8 +237,7 @@ class NewTrack(_SpotifyObject):
         # Todo: Playlist ID gets added when the Playlist() is instantiated
         self.playlist_ids: list[str] = []
 
-        APP_DATABASE.add_item_to_table(
-            table_name='tracks',
+        self.row: dict = dict(
             track_id=self.track_id,
             track_name=self.track_name,
             track_uri=self.track_uri,
@@ -236,14 +253,18 @@ class NewTrack(_SpotifyObject):
             track_json=self.track_json
         )
 
+        if write_to_database:
+            WRITE_QUEUE.put(table_name='tracks', row=self.row)
+
 
 class NewUser(_SpotifyObject):
     """"""
 
-    def __init__(self, spotify_user: dict) -> None:
+    def __init__(self, spotify_user: dict, write_to_database: bool = True) -> None:
         """
 
         :param spotify_user: Dict containing Spotify Tracks, in the form of {user_uri: user}
+        :param write_to_database: True: the row is queued in WRITE_QUEUE (written in the background); False: the row is only built (self.row), e.g. to add many items at once with APP_DATABASE.add_items_to_table() or APP_DATABASE.upsert_items()
         :raises InputException: if input is invalid
         """
 
@@ -259,9 +280,9 @@ class NewUser(_SpotifyObject):
         self.user_url: str = self.user_json['external_urls']['spotify']
 
         if 'url' not in self.user_json['images'][0]:
-            self.user_image: str = file_image_bytes(NO_IMAGE_PATH)
+            self.user_image: str = IMAGE_STORE.put_file(NO_IMAGE_PATH)
         else:
-            self.user_image: str = spotify_image_bytes(self.user_json['images'][0]['url'])
+            self.user_image: str = IMAGE_STORE.put_url(self.user_json['images'][0]['url'])
 
         top_artists: dict= spotify.get_users_top_items(item_type="artists", time_range="medium_term")
         playlists: dict = spotify.get_users_playlists(user_id=self.user_id, limit=None)
@@ -272,8 +293,7 @@ class NewUser(_SpotifyObject):
         self.top_track_ids: list[str] = [uri_to_id(current_track) for current_track in top_tracks.keys()]
         self.top_artist_ids: list[str] = [uri_to_id(current_artist) for current_artist in top_artists.keys()]
 
-        APP_DATABASE.add_item_to_table(
-            table_name='users',
+        self.row: dict = dict(
             user_id=self.user_id,
             user_name=self.user_name,
             user_uri=self.user_uri,
@@ -289,6 +309,9 @@ class NewUser(_SpotifyObject):
             user_json=self.user_json
         )
 
+        if write_to_database:
+            WRITE_QUEUE.put(table_name='users', row=self.row)
+
     @property
     def top_genre_names(self) -> list[str]:
         """
@@ -314,94 +337,30 @@ class ItemQueues:
 
     def update_queues(self) -> None:
         """
-        Call `fetch_new_ids_from_database()` for every possible case to update all queues with the new URIs
+        Add the items that are mentioned by other items (e.g. artists of stored albums), but have no Database entry themselves, to their queues. Every type is one indexed anti-join over the relation tables (see database_access.RELATIONS)
 
         :return: updates queues
         """
 
-        def fetch_new_ids_from_database(
-                table_name: Literal['albums', 'artists', 'tracks', 'playlists', 'users'],
-                target_type: Literal['album', 'artist', 'playlist', 'track', 'user']
-        ) -> set | None:
-            """
-            Get the Items that have no Database entry, but are mentioned in the IDs (lists) from other tables. (e.g. Get to database unknown artists mentioned in albums artist_ids)
-
-            :param table_name: source table name (e.g. albums)
-            :param target_type: what type of items to return (e.g. artists)
-            :return: Set containing Spotify Items IDs
-            """
-            type_id_map = {
-                'albums': {
-                    "artist": "artist_ids",
-                    "track": "track_ids"
-                },
-                "artists": {
-                    "album": "album_ids",
-                    "playlist": "playlist_ids",
-                    "track": "top_track_ids"
-                },
-                "playlists": {
-                    "track": "track_ids",
-                    "user": "owner_id"
-                },
-                "tracks": {
-                    "album": "album_id",
-                    "artist": "artist_ids",
-                    "playlist": "playlist_ids"
-                },
-                "users": {
-                    "artist": "top_artist_ids",
-                    "playlist": "playlist_ids",
-                    "track": "top_track_ids"
-                }
-            }
-
-            # get IDs from target column
-            unknown_ids = APP_DATABASE.fetch_column(table_name=table_name, table_column=type_id_map[table_name][target_type])
-            target_list = set()
-            for row in load_list_from_database(unknown_ids):
-                if row != '[]':
-                    target_list.add(row)
-
-            # fetch existing IDs from Database
-
-            existing_items = set(APP_DATABASE.fetch_column(table_name=f"{target_type}s", table_column=f'{target_type}_id'))
-            return target_list - existing_items
-
-        # update albums
-        self.album_queue.update(fetch_new_ids_from_database(table_name="artists", target_type="album"))
-        self.album_queue.update(fetch_new_ids_from_database(table_name="tracks", target_type="album"))
-
-        # update artists
-        self.artist_queue.update(fetch_new_ids_from_database(table_name="albums", target_type="artist"))
-        self.artist_queue.update(fetch_new_ids_from_database(table_name="tracks", target_type="artist"))
-        self.artist_queue.update(fetch_new_ids_from_database(table_name="users", target_type="artist"))
-
-        # update playlists
-        self.playlist_queue.update(fetch_new_ids_from_database(table_name="artists", target_type="playlist"))
-        self.playlist_queue.update(fetch_new_ids_from_database(table_name="tracks", target_type="playlist"))
-        self.playlist_queue.update(fetch_new_ids_from_database(table_name="users", target_type="playlist"))
-
-        # update tracks
-        self.track_queue.update(fetch_new_ids_from_database(table_name="albums", target_type="track"))
-        self.track_queue.update(fetch_new_ids_from_database(table_name="artists", target_type="track"))
-        self.track_queue.update(fetch_new_ids_from_database(table_name="playlists", target_type="track"))
-        self.track_queue.update(fetch_new_ids_from_database(table_name="users", target_type="track"))
-
-        # update users
-        self.user_queue.update(fetch_new_ids_from_database(table_name="playlists", target_type="user"))
+        # rows still waiting in the write queue would be queued (and requested) again
+        WRITE_QUEUE.flush()
+
+        self.album_queue.update(APP_DATABASE.unknown_ids(item_type="album"))
+        self.artist_queue.update(APP_DATABASE.unknown_ids(item_type="artist"))
+        self.playlist_queue.update(APP_DATABASE.unknown_ids(item_type="playlist"))
+        self.track_queue.update(APP_DATABASE.unknown_ids(item_type="track"))
+        self.user_queue.update(APP_DATABASE.unknown_ids(item_type="user"))
 
 
     def process_all_queues(self):
         """
-        iterates through every queue and adds the items to the database
+        iterates through every queue and adds the items to the database (one bulk insert per queue)
         """
 
         if self.album_queue:
             albums = spotify.get_several_albums(album_ids=list(self.album_queue))
-            for uri, current_album in albums.items():
-                NewAlbum(spotify_album=current_album)
-                # print(f"{CGREEN}created Album for {uri}{TEXTCOLOR}")
+            rows = [NewAlbum(spotify_album={uri: current_album}, write_to_database=False).row for uri, current_album in albums.items()]
+            APP_DATABASE.add_items_to_table(table_name="albums", rows=rows)
 
             self.album_queue.clear()
             return
@@ -409,33 +368,29 @@ class ItemQueues:
 
         if self.artist_queue:
             artists = spotify.get_several_artists(artist_ids=list(self.artist_queue))
-            for uri, current_artist in artists.items():
-                NewArtist(spotify_artist=current_artist)
-                # print(f"{CGREEN}created Artist for {uri}{TEXTCOLOR}")
+            rows = [NewArtist(spotify_artist={uri: current_artist}, write_to_database=False).row for uri, current_artist in artists.items()]
+            APP_DATABASE.add_items_to_table(table_name="artists", rows=rows)
 
             self.artist_queue.clear()
 
         if self.playlist_queue:
             playlists = spotify.get_several_playlists(playlist_ids=list(self.playlist_queue))
-            for uri, current_playlist in playlists.items():
-                NewPlaylist(spotify_playlist=current_playlist)
-                # print(f"{CGREEN}created Playlist for {uri}{TEXTCOLOR}")
+            rows = [NewPlaylist(spotify_playlist={uri: current_playlist}, write_to_database=False).row for uri, current_playlist in playlists.items()]
+            APP_DATABASE.add_items_to_table(table_name="playlists", rows=rows)
 
             self.playlist_queue.clear()
 
         if self.track_queue:
             tracks = spotify.get_several_tracks(track_ids=list(self.track_queue))
-            for uri, current_track in tracks.items():
-                NewTrack(spotify_track=current_track)
-                # print(f"{CGREEN}created Track for {uri}{TEXTCOLOR}")
+            rows = [NewTrack(spotify_track={uri: current_track}, write_to_database=False).row for uri, current_track in tracks.items()]
+            APP_DATABASE.add_items_to_table(table_name="tracks", rows=rows)
 
             self.track_queue.clear()
 
         if self.user_queue:
             users = spotify.get_several_users(user_ids=list(self.user_queue))
-            for uri, current_user in users.items():
-                NewUser(spotify_user=current_user)
-                # print(f"{CGREEN}created User for {uri}{TEXTCOLOR}")
+            rows = [NewUser(spotify_user={uri: current_user}, write_to_database=False).row for uri, current_user in users.items()]
+            APP_DATABASE.add_items_to_table(table_name="users", rows=rows)
 
             self.user_queue.clear()
 
@@ -460,8 +415,8 @@ class NewDevice:
         self.supports_volume: bool = bool(self.device_json['supports_volume'])
         self.volume_percent: int = int(self.device_json['volume_percent'])
 
-        APP_DATABASE.add_item_to_table(
-            table_name='devices',
+        # the state of a device (active, volume) changes, so stored devices are updated
+        WRITE_QUEUE.put(table_name='devices', row=dict(
             device_id=self.device_id,
             device_name=self.device_name,
             device_type=self.device_type,
@@ -471,42 +426,262 @@ class NewDevice:
             supports_volume=self.supports_volume,
             volume_percent=self.volume_percent,
             device_json=self.device_json
-        )
+        ))
+
+
+class IdentityMap:
+    """
+    Keeps the loaded Album, Artist, Device, Playlist, Track and User instances, keyed by (table_name, item_id), so constructing the same item again returns the same instance without a Database query.
+
+    Instances are dropped when their item is updated or removed in the Database (registered as change listener, see `DatabaseAccess.add_change_listener()`), after `ttl` seconds or when they are the least recently used of more than `max_size` instances.
+    """
+
+    def __init__(self, max_size: int = MODEL_CACHE_SIZE, ttl: float = MODEL_CACHE_TTL) -> None:
+        """
+        :param max_size: maximum number of kept instances
+        :param ttl: seconds an instance is returned before it is loaded again
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(max_size, int) or max_size < 0:
+            raise InputException(item_value=max_size, valid_values="0 <= max_size", valid_types=int)
+
+        if not isinstance(ttl, (int, float)) or ttl < 0:
+            raise InputException(item_value=ttl, valid_values="0 <= ttl", valid_types=(int, float))
+
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+
+        self._lock = threading.RLock()
+        self._items: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "invalidated": 0}
+
+    def get(self, table_name: str, item_id: str) -> Any | None:
+        """
+        :param table_name: table of the item (e.g. 'tracks')
+        :param item_id: id of the item
+        :return: the kept instance (None if it is not kept or expired)
+        """
+
+        with self._lock:
+            entry = self._items.get((table_name, item_id))
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            loaded_at, instance = entry
+            if time.monotonic() - loaded_at > self.ttl:
+                del self._items[(table_name, item_id)]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._items.move_to_end((table_name, item_id))
+            self._stats["hits"] += 1
+            return instance
+
+    def put(self, table_name: str, item_id: str, instance: Any) -> None:
+        """
+        :param table_name: table of the item (e.g. 'tracks')
+        :param item_id: id of the item
+        :param instance: loaded instance
+        """
+
+        if self.max_size == 0:
+            return
+
+        with self._lock:
+            self._items[(table_name, item_id)] = (time.monotonic(), instance)
+            self._items.move_to_end((table_name, item_id))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self._stats["evicted"] += 1
+
+    def invalidate(self, table_name: str | None = None, item_id: str | None = None) -> None:
+        """
+        Drop kept instances (signature of a Database change listener)
+
+        :param table_name: table of the changed items (None: every table)
+        :param item_id: id of the changed item (None: every item of the table)
+        """
+
+        with self._lock:
+            keys = [
+                key for key in self._items.keys()
+                if (table_name is None or key[0] == table_name) and (item_id is None or key[1] == item_id)
+            ]
+            for key in keys:
+                del self._items[key]
+            self._stats["invalidated"] += len(keys)
+
+    def clear(self) -> None:
+        """
+        Drop every kept instance
+        """
+
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """
+        :return: Dict containing the statistics, in the form of {'hits': ..., 'misses': ..., 'expired': ..., 'evicted': ..., 'invalidated': ..., 'size': ..., 'hit_rate': ...}
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._items)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        Reset all statistics to 0
+        """
+
+        with self._lock:
+            for counter in self._stats.keys():
+                self._stats[counter] = 0
+
+
+MODEL_CACHE = IdentityMap()
+APP_DATABASE.add_change_listener(MODEL_CACHE.invalidate)
+
+
+class _CachedModel(type):
+    """
+    Metaclass of the Database item classes: `Track(track_id)` returns the instance kept by MODEL_CACHE, constructing (and keeping, once its row is loaded) it only if needed
+    """
+
+    def __call__(cls, item_id: str, *args, **kwargs):
+        instance = MODEL_CACHE.get(cls.table_name, item_id)
+        if instance is None:
+            instance = super().__call__(item_id, *args, **kwargs)
+
+            # instances without a loaded row (e.g. the request of a missing item failed) are not kept
+            if cls.core_columns[0] in instance.__dict__:
+                MODEL_CACHE.put(cls.table_name, item_id, instance)
+
+        return instance
+
+
+class _DatabaseItem(metaclass=_CachedModel):
+    """
+    Item loaded from its Database table. Only the slim core columns (`core_columns`) are fetched on construction, the remaining columns (json, image, id lists, ...) are fetched on first access and kept afterwards. `prefetch()` loads columns of many items at once.
+    """
+
+    table_name: str = ""
+    core_columns: tuple[str, ...] = ()
+
+    def _load_core(self, item_id: str) -> bool:
+        """
+        Load the core columns of the item
+
+        :param item_id: id of the item
+        :return: False if the item is not in the Database
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        row = APP_DATABASE.fetch_row(table_name=self.table_name, item_id=item_id, table_column=", ".join(self.core_columns))
+        if row is None:
+            return False
 
+        self.__dict__.update(zip(self.core_columns, row))
+        return True
+
+    @property
+    def item_id(self) -> str:
+        """
+        :return: id of the item (value of the primary key column)
+        """
+
+        return self.__dict__[self.core_columns[0]]
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Fetch a column that is not loaded yet (only called if the attribute does not exist)
+
+        :param name: name of the column
+        :return: value of the column
+        :raises AttributeError: if name is no column of the table
+        """
+
+        if name.startswith("_") or not self.core_columns or self.core_columns[0] not in self.__dict__ or name not in APP_DATABASE.table_columns(self.table_name):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        value = APP_DATABASE.fetch_row(table_name=self.table_name, item_id=self.item_id, table_column=name)[0]
+        self.__dict__[name] = value
+        return value
+
+    @classmethod
+    def prefetch(cls, items: list["_DatabaseItem"], table_columns: list[str] | None = None) -> None:
+        """
+        Load columns of many items with one query (e.g. the images of every track of a playlist before displaying them)
+
+        :param items: instances of the class
+        :param table_columns: columns to load (default: every column that is not part of core_columns)
+        :return:
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(items, list) or not all(isinstance(item, cls) for item in items):
+            raise InputException(item_value=items, valid_values=f"list of {cls.__name__}", valid_types=list)
+
+        if table_columns is None:
+            table_columns = [column for column in APP_DATABASE.table_columns(cls.table_name) if column not in cls.core_columns]
+
+        missing = [item for item in items if not set(table_columns) <= item.__dict__.keys()]
+        if not missing:
+            return
+
+        rows = APP_DATABASE.fetch_rows_by_id(table_name=cls.table_name, item_ids=[item.item_id for item in missing], table_columns=table_columns)
+        for item in missing:
+            if item.item_id in rows:
+                item.__dict__.update(zip(table_columns, rows[item.item_id]))
+
+
+class Album(_DatabaseItem):
+    table_name = "albums"
+    core_columns = ("album_id", "album_name", "album_uri", "album_url", "total_duration", "track_count", "popularity", "blacklisted")
 
-class Album:
     def __init__(self, album_id: str):
         """
 
         :param album_id:
         :raises SpotifyIdException: if spotify id is invalid
         """
+
         if not check_spotify_id(album_id):
             raise SpotifyIdException(invalid_id=album_id, id_type="album")
 
-        album_from_db = APP_DATABASE.fetch_row(table_name="albums", item_id=album_id, table_column="*")
-        if album_from_db is None:
+        if not self._load_core(album_id):
             print(f"{CCYAN}Album with id '{album_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
-            _album = spotify.get_album(album_id=album_id)
+            _album = request_batcher.get_album(album_id=album_id)
             NewAlbum(_album)
-            album_from_db = APP_DATABASE.fetch_row(table_name="albums", item_id=album_id, table_column="*")
-
-        self.album_id, \
-            self.album_name, \
-            self.album_uri, \
-            self.album_url, \
-            self.album_image, \
-            self.genre_names, \
-            self.total_duration, \
-            self.track_count, \
-            self.artist_ids, \
-            self.track_ids, \
-            self.popularity, \
-            self.blacklisted, \
-            self.album_json = album_from_db
-
-
-class Artist:
+            WRITE_QUEUE.flush()
+            self._load_core(album_id)
+
+    @property
+    def image(self) -> Image:
+        """
+        Cover image, loaded from IMAGE_STORE on access (the row only references it by hash)
+
+        :return: Pillow Image
+        """
+
+        return IMAGE_STORE.get_image(self.album_image)
+
+
+class Artist(_DatabaseItem):
+    table_name = "artists"
+    core_columns = ("artist_id", "artist_name", "artist_uri", "artist_url", "follower", "popularity", "blacklisted")
+
     def __init__(self, artist_id: str):
         """
 
@@ -517,29 +692,28 @@ class Artist:
         if not check_spotify_id(artist_id):
             raise SpotifyIdException(invalid_id=artist_id, id_type="artist")
 
-        artist_from_db = APP_DATABASE.fetch_row(table_name="artists", item_id=artist_id, table_column="*")
-        if artist_from_db is None:
+        if not self._load_core(artist_id):
             print(f"{CCYAN}Artist with id '{artist_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
-            _artist = spotify.get_artist(artist_id=artist_id)
+            _artist = request_batcher.get_artist(artist_id=artist_id)
             NewArtist(_artist)
-            artist_from_db = APP_DATABASE.fetch_row(table_name="artists", item_id=artist_id, table_column="*")
-
-        self.artist_id, \
-            self.artist_name, \
-            self.artist_uri, \
-            self.artist_url, \
-            self.artist_image, \
-            self.genre_names, \
-            self.follower, \
-            self.album_ids, \
-            self.playlist_ids, \
-            self.top_track_ids, \
-            self.popularity, \
-            self.blacklisted, \
-            self.artist_json = artist_from_db
-
-
-class Device:
+            WRITE_QUEUE.flush()
+            self._load_core(artist_id)
+
+    @property
+    def image(self) -> Image:
+        """
+        Cover image, loaded from IMAGE_STORE on access (the row only references it by hash)
+
+        :return: Pillow Image
+        """
+
+        return IMAGE_STORE.get_image(self.artist_image)
+
+
+class Device(_DatabaseItem):
+    table_name = "devices"
+    core_columns = ("device_id", "device_name", "device_type", "is_active", "is_private_session", "is_restricted", "supports_volume", "volume_percent")
+
     def __init__(self, device_id: str) -> None:
         """
 
@@ -550,25 +724,18 @@ class Device:
         if not check_spotify_id(device_id, is_device=True):
             raise SpotifyIdException(invalid_id=device_id, id_type="device")
 
-        device_from_db = APP_DATABASE.fetch_row(table_name="devices", item_id=device_id, table_column="*")
-        if device_from_db is None:
+        if not self._load_core(device_id):
             print(f"{CCYAN}Device with id '{device_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
             _device = spotify.get_device(device_id=device_id)
             NewDevice(_device)
-            device_from_db = APP_DATABASE.fetch_row(table_name="devices", item_id=device_id, table_column="*")
+            WRITE_QUEUE.flush()
+            self._load_core(device_id)
 
-        self.device_id, \
-            self.device_name, \
-            self.device_type, \
-            self.is_active, \
-            self.is_private_session, \
-            self.is_restricted, \
-            self.supports_volume, \
-            self.volume_percent, \
-            self.device_json = device_from_db
 
+class Playlist(_DatabaseItem):
+    table_name = "playlists"
+    core_columns = ("playlist_id", "playlist_name", "playlist_uri", "playlist_url", "total_duration", "track_count", "owner_id", "popularity", "blacklisted")
 
-class Playlist:
     def __init__(self, playlist_id: str):
         """
 
@@ -579,29 +746,28 @@ class Playlist:
         if not check_spotify_id(playlist_id):
             raise SpotifyIdException(invalid_id=playlist_id, id_type="playlist")
 
-        playlist_from_db = APP_DATABASE.fetch_row(table_name="playlists", item_id=playlist_id, table_column="*")
-        if playlist_from_db is None:
+        if not self._load_core(playlist_id):
             print(f"{CCYAN}Playlist with id '{playlist_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
             _playlist = spotify.get_playlist(playlist_id=playlist_id)
             NewPlaylist(_playlist)
-            playlist_from_db = APP_DATABASE.fetch_row(table_name="playlists", item_id=playlist_id, table_column="*")
-
-        self.playlist_id, \
-            self.playlist_name, \
-            self.playlist_uri, \
-            self.playlist_url, \
-            self.playlist_image, \
-            self.genre_names, \
-            self.total_duration, \
-            self.track_count, \
-            self.owner_id, \
-            self.track_ids, \
-            self.popularity, \
-            self.blacklisted, \
-            self.playlist_json = playlist_from_db
-
-
-class Track:
+            WRITE_QUEUE.flush()
+            self._load_core(playlist_id)
+
+    @property
+    def image(self) -> Image:
+        """
+        Cover image, loaded from IMAGE_STORE on access (the row only references it by hash)
+
+        :return: Pillow Image
+        """
+
+        return IMAGE_STORE.get_image(self.playlist_image)
+
+
+class Track(_DatabaseItem):
+    table_name = "tracks"
+    core_columns = ("track_id", "track_name", "track_uri", "track_url", "track_duration", "album_id", "popularity", "blacklisted")
+
     def __init__(self, track_id: str):
         """
 
@@ -612,29 +778,28 @@ class Track:
         if not check_spotify_id(track_id):
             raise SpotifyIdException(invalid_id=track_id, id_type="track")
 
-        track_from_db = APP_DATABASE.fetch_row(table_name="tracks", item_id=track_id, table_column="*")
-        if track_from_db is None:
+        if not self._load_core(track_id):
             print(f"{CCYAN}Track with id '{track_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
-            _track = spotify.get_track(track_id=track_id)
+            _track = request_batcher.get_track(track_id=track_id)
             NewTrack(_track)
-            track_from_db = APP_DATABASE.fetch_row(table_name="tracks", item_id=track_id, table_column="*")
-
-        self.track_id, \
-            self.track_name, \
-            self.track_uri, \
-            self.track_url, \
-            self.track_image, \
-            self.genre_names, \
-            self.track_duration, \
-            self.artist_ids, \
-            self.album_id, \
-            self.playlist_ids, \
-            self.popularity, \
-            self.blacklisted, \
-            self.track_json = track_from_db
-
-
-class User:
+            WRITE_QUEUE.flush()
+            self._load_core(track_id)
+
+    @property
+    def image(self) -> Image:
+        """
+        Cover image, loaded from IMAGE_STORE on access (the row only references it by hash)
+
+        :return: Pillow Image
+        """
+
+        return IMAGE_STORE.get_image(self.track_image)
+
+
+class User(_DatabaseItem):
+    table_name = "users"
+    core_columns = ("user_id", "user_name", "user_uri", "user_url", "follower", "popularity", "blacklisted")
+
     def __init__(self, user_id: str):
         """
 
@@ -645,26 +810,22 @@ class User:
         if not check_spotify_id(user_id, is_user=True):
             raise SpotifyIdException(invalid_id=user_id, id_type="user")
 
-        user_from_db = APP_DATABASE.fetch_row(table_name="users", item_id=user_id, table_column="*")
-        if user_from_db is None:
+        if not self._load_core(user_id):
             print(f"{CCYAN}User with id '{user_id}' does not exist in database, requesting now ...{TEXTCOLOR}")
             _user = spotify.get_users_profile(user_id=user_id)
             NewUser(_user)
-            user_from_db = APP_DATABASE.fetch_row(table_name="users", item_id=user_id, table_column="*")
-
-        self.user_id, \
-            self.user_name, \
-            self.user_uri, \
-            self.user_url, \
-            self.user_image, \
-            self.follower, \
-            self.playlist_ids, \
-            self.top_track_ids, \
-            self.top_artist_ids, \
-            self.top_genre_names, \
-            self.popularity, \
-            self.blacklisted, \
-            self.user_json = user_from_db
+            WRITE_QUEUE.flush()
+            self._load_core(user_id)
+
+    @property
+    def image(self) -> Image:
+        """
+        Cover image, loaded from IMAGE_STORE on access (the row only references it by hash)
+
+        :return: Pillow Image
+        """
+
+        return IMAGE_STORE.get_image(self.user_image)
 
 
 
@@ -0,0 +1,289 @@
+"""
+    Micro-batching of single-item lookups: concurrent get_album/get_artist/get_track calls are combined into get_several_* requests
+"""
+
+import copy
+from concurrent.futures import Future
+
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+from code_backend.exceptions import InputException, CustomException, SpotifyIdException
+from code_backend.secondary_methods import check_spotify_id
+
+
+class RequestBatcher:
+    """
+    Collects single-item lookups for up to `window` seconds (or until `batch_size` ids are collected) and fetches them with one request of `fetch_several`. Every caller gets its own item (callers of the same item get copies).
+
+    A blocking lookup (get()) is fetched immediately if no other lookup is pending or being fetched, so a single caller does not wait for the window.
+
+    Lookups with different keyword arguments (e.g. ignore_market) are collected in separate batches.
+    """
+
+    def __init__(self, fetch_several: Callable[..., dict], batch_size: int, window: float = BATCH_WINDOW) -> None:
+        """
+        :param fetch_several: function fetching several items, called as fetch_several(ids, **kwargs) and returning a Dict in the form of {uri: item}
+        :param batch_size: maximum number of ids per request (API limit of the endpoint)
+        :param window: seconds lookups are collected before the batch is sent
+        :raises InputException: if input is invalid
+        """
+
+        if not callable(fetch_several):
+            raise InputException(item_value=fetch_several, valid_values="function(ids, **kwargs) -> {uri: item}", valid_types=Callable)
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise InputException(item_value=batch_size, valid_values="positive integer", valid_types=int)
+
+        if not isinstance(window, (int, float)) or window < 0:
+            raise InputException(item_value=window, valid_values="0 <= window", valid_types=(int, float))
+
+        self.fetch_several = fetch_several
+        self.batch_size: int = batch_size
+        self.window: float = window
+
+        # {group: [(item_id, future), ...]}, group: sorted keyword arguments
+        self._pending: dict[tuple, list[tuple[str, Future]]] = {}
+        self._timers: dict[tuple, threading.Timer] = {}
+        self._in_flight: int = 0
+        self._lock = threading.Lock()
+        self._stats = {"lookups": 0, "batches": 0, "fetched_ids": 0}
+
+    def submit(self, item_id: str, **kwargs) -> Future:
+        """
+        Add a lookup to the current batch
+
+        :param item_id: Spotify ID of the item
+        :param kwargs: keyword arguments of `fetch_several` (e.g. ignore_market=True)
+        :return: concurrent.futures.Future of the item
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(item_id, str):
+            raise InputException(item_value=item_id, valid_values="Spotify ID", valid_types=str)
+
+        group = tuple(sorted(kwargs.items()))
+        future = Future()
+        full_batch = None
+
+        with self._lock:
+            self._stats["lookups"] += 1
+            pending = self._pending.setdefault(group, [])
+            pending.append((item_id, future))
+
+            if len(pending) >= self.batch_size:
+                full_batch = self._take(group)
+            elif len(pending) == 1:
+                timer = threading.Timer(self.window, self._flush_group, args=(group,))
+                timer.daemon = True
+                self._timers[group] = timer
+                timer.start()
+
+        # a full batch is sent by the thread completing it, without waiting for the window
+        if full_batch:
+            self._dispatch(full_batch, group)
+
+        return future
+
+    def get(self, item_id: str, timeout: float | None = None, **kwargs) -> dict:
+        """
+        Look up one item, blocks until its batch was fetched (fetched immediately if no other lookup is pending or being fetched)
+
+        :param item_id: Spotify ID of the item
+        :param timeout: seconds to wait for the item (None: no timeout)
+        :param kwargs: keyword arguments of `fetch_several` (e.g. ignore_market=True)
+        :return: Dict containing the item
+        :raises CustomException: if the item is not part of the response
+        """
+
+        if not isinstance(item_id, str):
+            raise InputException(item_value=item_id, valid_values="Spotify ID", valid_types=str)
+
+        with self._lock:
+            idle = not self._pending and self._in_flight == 0
+            if idle:
+                self._stats["lookups"] += 1
+                self._in_flight += 1
+
+        if not idle:
+            return self.submit(item_id, **kwargs).result(timeout=timeout)
+
+        future = Future()
+        self._fetch([(item_id, future)], tuple(sorted(kwargs.items())))
+        return future.result(timeout=timeout)
+
+    def _take(self, group: tuple) -> list[tuple[str, Future]]:
+        """
+        Remove the pending lookups of a group and stop its timer (needs to be called while holding the lock)
+
+        :param group: sorted keyword arguments of the batch
+        :return: List of (item_id, future)
+        """
+
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+
+        return self._pending.pop(group, [])
+
+    def _flush_group(self, group: tuple) -> None:
+        """
+        Send the pending lookups of a group (target of the window timer)
+
+        :param group: sorted keyword arguments of the batch
+        """
+
+        with self._lock:
+            batch = self._take(group)
+
+        if batch:
+            self._dispatch(batch, group)
+
+    def flush(self) -> None:
+        """
+        Send every pending batch now
+        """
+
+        with self._lock:
+            batches = [(group, self._take(group)) for group in list(self._pending.keys())]
+
+        for group, batch in batches:
+            if batch:
+                self._dispatch(batch, group)
+
+    def _dispatch(self, batch: list[tuple[str, Future]], group: tuple) -> None:
+        """
+        Fetch a batch and hand every caller its item (or the exception of the request)
+
+        :param batch: List of (item_id, future)
+        :param group: sorted keyword arguments of the batch
+        """
+
+        with self._lock:
+            self._in_flight += 1
+
+        self._fetch(batch, group)
+
+    def _fetch(self, batch: list[tuple[str, Future]], group: tuple) -> None:
+        """
+        Fetch a batch counted in `_in_flight` (needs to be incremented by the caller) and hand every caller its item (or the exception of the request)
+
+        :param batch: List of (item_id, future)
+        :param group: sorted keyword arguments of the batch
+        """
+
+        item_ids = list(dict.fromkeys(item_id for item_id, _ in batch))
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["fetched_ids"] += len(item_ids)
+
+        try:
+            response = self.fetch_several(item_ids, **dict(group))
+
+        except BaseException as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        # relinked tracks are returned with another id, the requested one is part of linked_from
+        items_by_id = {}
+        for item in (response or {}).values():
+            if not item:
+                continue
+            items_by_id[item["id"]] = item
+            if item.get("linked_from"):
+                items_by_id[item["linked_from"]["id"]] = item
+
+        # the first caller of an item gets it, every other caller (same id or relinked) a copy
+        handed_out = set()
+        for item_id, future in batch:
+            if item_id in items_by_id:
+                item = items_by_id[item_id]
+                future.set_result(copy.deepcopy(item) if id(item) in handed_out else item)
+                handed_out.add(id(item))
+            else:
+                future.set_exception(CustomException(error_message=f"No item with id '{item_id}' returned", more_infos=f"Batch: {item_ids}"))
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Get the batching statistics
+
+        :return: Dict containing the counters, in the form of {'lookups': ..., 'batches': ..., 'fetched_ids': ...}
+        """
+
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        """
+        Reset all batching statistics to 0
+        """
+
+        with self._lock:
+            for counter in self._stats.keys():
+                self._stats[counter] = 0
+
+
+# batch sizes are the API limits of the get_several_* endpoints
+ALBUM_BATCHER = RequestBatcher(lambda album_ids, **kwargs: spotify.get_several_albums(album_ids=album_ids, **kwargs), batch_size=20)
+ARTIST_BATCHER = RequestBatcher(lambda artist_ids: spotify.get_several_artists(artist_ids=artist_ids), batch_size=50)
+TRACK_BATCHER = RequestBatcher(lambda track_ids, **kwargs: spotify.get_several_tracks(track_ids=track_ids, **kwargs), batch_size=50)
+
+
+def get_album(album_id: str, ignore_market: bool = False) -> dict:
+    """
+    Batched version of spotify_web_api.get_album(): concurrent lookups are combined into get_several_albums() requests
+
+    :param album_id: The Spotify ID of the album.
+    :param ignore_market: Whether to ignore market.
+    :return: Dict containing Spotify Albums, in the form of {album_uri: album}
+    :raises SpotifyIdException: if spotify id is invalid
+    """
+
+    if not check_spotify_id(spotify_id=album_id):
+        raise SpotifyIdException(invalid_id=album_id, id_type="album")
+
+    album = ALBUM_BATCHER.get(album_id, ignore_market=ignore_market)
+    return {album["uri"]: album}
+
+
+def get_artist(artist_id: str) -> dict:
+    """
+    Batched version of spotify_web_api.get_artist(): concurrent lookups are combined into get_several_artists() requests
+
+    :param artist_id: The Spotify ID of the artist.
+    :return: Dict containing Spotify Artists, in the form of {artist_uri: artist}
+    :raises SpotifyIdException: if spotify id is invalid
+    """
+
+    if not check_spotify_id(spotify_id=artist_id):
+        raise SpotifyIdException(invalid_id=artist_id, id_type="artist")
+
+    artist = ARTIST_BATCHER.get(artist_id)
+    return {artist["uri"]: artist}
+
+
+def get_track(track_id: str, ignore_market: bool = False) -> dict:
+    """
+    Batched version of spotify_web_api.get_track(): concurrent lookups are combined into get_several_tracks() requests
+
+    :param track_id: The Spotify ID of the track.
+    :param ignore_market: Whether to ignore market.
+    :return: Dict containing Spotify Tracks, in the form of {track_uri: track}
+    :raises SpotifyIdException: if spotify id is invalid
+    """
+
+    if not check_spotify_id(spotify_id=track_id):
+        raise SpotifyIdException(invalid_id=track_id, id_type="track")
+
+    track = TRACK_BATCHER.get(track_id, ignore_market=ignore_market)
+    return {track["uri"]: track}
+
+
+if __name__ == '__main__':
+    """"""
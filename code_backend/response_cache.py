@@ -0,0 +1,349 @@
+"""
+    Persistent cache for GET responses of the Spotify API (SQLite side file next to the main database), revalidated using ETags
+"""
+
+from urllib.parse import urlparse, parse_qs
+
+from code_backend.shared_config import *
+from code_backend.exceptions import InputException, DatabaseException
+from code_backend.http_client import HttpClient, HTTP_CLIENT
+
+
+class ResponseCache:
+    """
+    Cache for GET responses, keyed by method, url and market.
+
+    Fresh responses (younger than the TTL of their endpoint family, see `HTTP_CACHE_TTL`) are returned without a request. Stale responses are revalidated with `If-None-Match`, a `304 Not Modified` response refreshes the cached response. Responses with `Cache-Control: no-store` are never stored, responses with `no-cache` are revalidated every time.
+    """
+
+    def __init__(
+            self,
+            cache_file: str = HTTP_CACHE_PATH,
+            http_client: HttpClient = HTTP_CLIENT,
+            ttl_policy: dict[str, int] | None = None,
+            enabled: bool = HTTP_CACHE_ENABLED
+    ) -> None:
+        """
+        :param cache_file: path to the SQLite cache file (created if missing)
+        :param http_client: client used to send requests
+        :param ttl_policy: Dict in the form of {endpoint_family: seconds} (None: HTTP_CACHE_TTL)
+        :param enabled: False: every request is sent without using the cache
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(cache_file, str):
+            raise InputException(item_value=cache_file, valid_values="path to a .db file", valid_types=str)
+
+        if not isinstance(http_client, HttpClient):
+            raise InputException(item_value=http_client, valid_values="HttpClient(...)", valid_types=HttpClient)
+
+        if ttl_policy is not None and not isinstance(ttl_policy, dict):
+            raise InputException(item_value=ttl_policy, valid_values="{endpoint_family: seconds}", valid_types=dict)
+
+        if not isinstance(enabled, bool):
+            raise InputException(item_value=enabled, valid_values=(True, False), valid_types=bool)
+
+        self.cache_file: str = cache_file
+        self.http_client: HttpClient = http_client
+        self.ttl_policy: dict[str, int] = dict(HTTP_CACHE_TTL if ttl_policy is None else ttl_policy)
+        self.enabled: bool = enabled
+
+        self._database: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "bypassed": 0}
+
+    @property
+    def database(self) -> sqlite3.Connection:
+        """
+        Get the connection to the cache file (created on first access, needs to be used while holding the lock)
+
+        :return: sqlite3 connection
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        if self._database is None:
+            try:
+                self._database = sqlite3.connect(self.cache_file, check_same_thread=False)
+                self._database.execute("PRAGMA journal_mode=WAL")
+                self._database.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        method TEXT NOT NULL,
+                        url TEXT NOT NULL,
+                        market TEXT,
+                        family TEXT NOT NULL,
+                        status_code INTEGER NOT NULL,
+                        headers TEXT NOT NULL,
+                        body BLOB NOT NULL,
+                        etag TEXT,
+                        cache_control TEXT,
+                        stored_at REAL NOT NULL,
+                        fresh_until REAL NOT NULL,
+                        PRIMARY KEY (method, url)
+                    )
+                """)
+                self._database.commit()
+
+            except sqlite3.Error as error:
+                raise DatabaseException(error_message=error, more_infos=f"Exception occurred while opening response cache: '{self.cache_file}'")
+
+        return self._database
+
+    @staticmethod
+    def endpoint_family(url: str) -> str:
+        """
+        Get the endpoint family of an API url (first path segment after the API version)
+
+        :param url: API url (e.g. https://api.spotify.com/v1/albums/...)
+        :return: endpoint family (e.g. "albums")
+        """
+
+        segments = [segment for segment in urlparse(url).path.split("/") if segment]
+        if "v1" in segments:
+            segments = segments[segments.index("v1") + 1:]
+
+        return segments[0] if segments else ""
+
+    def _ttl(self, query: requests.Request) -> int | None:
+        """
+        Get the TTL of a request
+
+        :param query: request
+        :return: seconds a response is fresh, None: request is not cacheable
+        """
+
+        if not self.enabled or query.method != "GET":
+            return None
+
+        return self.ttl_policy.get(self.endpoint_family(query.url), None)
+
+    def send(self, query: requests.Request, timeout: float | tuple[float, float] | None = None) -> requests.Response:
+        """
+        Send a request using the cache: fresh responses are returned from the cache, stale ones are revalidated (If-None-Match), uncacheable requests are sent directly
+
+        :param query: request to send
+        :param timeout: timeout for this request (None: default timeout of the http client)
+        :return: response of the server or the cache
+        :raises InputException: if input is invalid
+        :raises DatabaseException: If Exception related to the Database occurs
+        :raises requests.exceptions.RequestException: if Exception occurs while using requests
+        """
+
+        if not isinstance(query, requests.Request):
+            raise InputException(item_value=query, valid_values="requests.Request(...)", valid_types=requests.Request)
+
+        ttl = self._ttl(query)
+        if ttl is None:
+            self._count("bypassed")
+            return self.http_client.send(query, timeout=timeout)
+
+        entry = self._load(query.method, query.url)
+        if entry is not None and entry["fresh_until"] > time.time():
+            self._count("hits")
+            return self._to_response(entry, query)
+
+        if entry is not None and entry["etag"]:
+            query.headers = {**(query.headers or {}), "If-None-Match": entry["etag"]}
+
+        response = self.http_client.send(query, timeout=timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self._count("revalidated")
+            self._refresh(query.method, query.url, ttl, response)
+            return self._to_response(entry, query)
+
+        self._count("misses")
+        if response.status_code == 200:
+            self._store(query, ttl, response)
+
+        return response
+
+    def _load(self, method: str, url: str) -> dict | None:
+        """
+        Get a cached response
+
+        :param method: HTTP request method
+        :param url: request url
+        :return: Dict containing the cached response, in the form of {'status_code': ..., 'headers': ..., 'body': ..., 'etag': ..., 'fresh_until': ...} or None
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        try:
+            with self._lock:
+                row = self.database.execute(
+                    "SELECT status_code, headers, body, etag, fresh_until FROM responses WHERE method = ? AND url = ?",
+                    (method, url)
+                ).fetchone()
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while reading cached response of '{url}'")
+
+        if row is None:
+            return None
+
+        return {"status_code": row[0], "headers": json.loads(row[1]), "body": row[2], "etag": row[3], "fresh_until": row[4]}
+
+    @staticmethod
+    def _fresh_until(ttl: int, cache_control: str) -> float | None:
+        """
+        Get the time a response stays fresh
+
+        :param ttl: TTL of the endpoint family
+        :param cache_control: Cache-Control header of the response
+        :return: timestamp, None: response must not be stored
+        """
+
+        directives = {directive.strip().lower() for directive in cache_control.split(",")}
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return time.time()
+
+        return time.time() + ttl
+
+    def _store(self, query: requests.Request, ttl: int, response: requests.Response) -> None:
+        """
+        Store a response (ignored if `Cache-Control: no-store`)
+
+        :param query: sent request
+        :param ttl: TTL of the endpoint family
+        :param response: response of the server
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        cache_control = response.headers.get("Cache-Control", "")
+        fresh_until = self._fresh_until(ttl, cache_control)
+        if fresh_until is None:
+            return
+
+        market = parse_qs(urlparse(query.url).query).get("market", [None])[0]
+        headers = {key: value for key, value in response.headers.items() if key.lower() in ("content-type", "etag", "cache-control")}
+
+        try:
+            with self._lock:
+                self.database.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        query.method, query.url, market, self.endpoint_family(query.url), response.status_code,
+                        json.dumps(headers), response.content, response.headers.get("ETag"), cache_control,
+                        time.time(), fresh_until
+                    )
+                )
+                self.database.commit()
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while caching response of '{query.url}'")
+
+        self._count("stored")
+
+    def _refresh(self, method: str, url: str, ttl: int, response: requests.Response) -> None:
+        """
+        Mark a revalidated (304) response as fresh again
+
+        :param method: HTTP request method
+        :param url: request url
+        :param ttl: TTL of the endpoint family
+        :param response: 304 response of the server
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        fresh_until = self._fresh_until(ttl, response.headers.get("Cache-Control", "")) or time.time()
+
+        try:
+            with self._lock:
+                self.database.execute(
+                    "UPDATE responses SET fresh_until = ?, etag = COALESCE(?, etag) WHERE method = ? AND url = ?",
+                    (fresh_until, response.headers.get("ETag"), method, url)
+                )
+                self.database.commit()
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos=f"Exception occurred while refreshing cached response of '{url}'")
+
+    @staticmethod
+    def _to_response(entry: dict, query: requests.Request) -> requests.Response:
+        """
+        Build a response object out of a cached response
+
+        :param entry: cached response
+        :param query: request the response belongs to
+        :return: requests Response
+        """
+
+        response = requests.Response()
+        response.status_code = entry["status_code"]
+        response.headers.update(entry["headers"])
+        response._content = entry["body"]
+        response.url = query.url
+        response.encoding = "utf-8"
+        return response
+
+    def clear(self, family: str | None = None) -> int:
+        """
+        Remove cached responses
+
+        :param family: endpoint family to remove (e.g. "albums"), None: remove every response
+        :return: number of removed responses
+        :raises DatabaseException: If Exception related to the Database occurs
+        """
+
+        try:
+            with self._lock:
+                if family is None:
+                    cursor = self.database.execute("DELETE FROM responses")
+                else:
+                    cursor = self.database.execute("DELETE FROM responses WHERE family = ?", (family,))
+                self.database.commit()
+                return cursor.rowcount
+
+        except sqlite3.Error as error:
+            raise DatabaseException(error_message=error, more_infos="Exception occurred while clearing response cache")
+
+    def _count(self, counter: str) -> None:
+        """
+        Thread-safe increment of a statistics counter
+
+        :param counter: counter name
+        """
+
+        with self._lock:
+            self._stats[counter] += 1
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        """
+        Get the cache statistics
+
+        :return: Dict containing the counters and the hit rate, in the form of {'hits': ..., 'revalidated': ..., 'misses': ..., 'stored': ..., 'bypassed': ..., 'hit_rate': ...}
+        """
+
+        with self._lock:
+            stats = dict(self._stats)
+
+        cacheable = stats["hits"] + stats["revalidated"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["revalidated"]) / cacheable if cacheable else 0.0
+        return stats
+
+    def reset_stats(self) -> None:
+        """
+        Reset all cache statistics to 0
+        """
+
+        with self._lock:
+            for counter in self._stats.keys():
+                self._stats[counter] = 0
+
+    def close(self) -> None:
+        """
+        Close the connection to the cache file
+        """
+
+        with self._lock:
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+
+
+RESPONSE_CACHE = ResponseCache()
+
+if __name__ == '__main__':
+    """"""
@@ -5,6 +5,7 @@ import os
 
 from code_backend.shared_config import *
 from code_backend.exceptions import InputException, CustomException, SpotifyIdException, SpotifyUriException, RequestException, EnvFileException
+from code_backend.http_client import HTTP_CLIENT
 
 
 def millis_to_minutes(millis: int, to_hours: bool = False) -> str:
@@ -272,7 +273,8 @@ def image_from_url(image_url: str) -> ImageFile:
 
     try:
         query = requests.Request('GET', image_url)
-        response = requests.get(image_url)
+        # images are served by Spotify's CDN, which does not count towards the Web API rate limit
+        response = HTTP_CLIENT.send(query, rate_limited=False)
 
     except requests.exceptions.RequestException as error:
         raise RequestException(error=error, request_query=query)
@@ -422,6 +424,10 @@ def image_to_b64(image: Image, image_format: Literal['PNG', 'JPEG'] | str) -> st
     if not isinstance(image_format, str):
         raise InputException(item_value=image_format, valid_values="Image formats from (https://pillow.readthedocs.io/en/stable/handbook/image-file-formats.html)", valid_types=str)
     
+    # JPEG has no alpha channel (e.g. the PNG icons), saving RGBA/P images as JPEG fails
+    if image_format.upper() in ("JPEG", "JPG") and image.mode not in ("RGB", "L", "CMYK"):
+        image = image.convert("RGB")
+
     output = BytesIO()
     try:
         image.save(output, format=image_format)
@@ -958,13 +964,78 @@ def load_list_from_database(fetched_list: list) -> list:
         raise InputException(item_value=fetched_list, valid_values="any list", valid_types=list)
 
     try:
-        loaded_list = [ast.literal_eval(row) for row in fetched_list]
+        # single ids (e.g. tracks.album_id) are stored without list brackets
+        loaded_list = [ast.literal_eval(row) if row.startswith(("[", "(")) else row for row in fetched_list]
         return flatten(loaded_list)
 
     except Exception as error:
         raise CustomException(error_message=error, more_infos=f"Exception occurred while converting the list string '{fetched_list}' into a list.")
 
 
+def dump_dict_to_database(value: dict, storage: Literal["json", "zlib"] = JSON_STORAGE) -> str | bytes:
+    """
+    Convert a dict into the stored form of a *_json column
+
+    :param value: Dict to store (e.g. Spotify item)
+    :param storage: 'json': JSON text; 'zlib': JSON compressed with JSON_ZLIB_DICTIONARY
+    :return: JSON text or compressed bytes
+    :raises InputException: if input is invalid
+    """
+
+    if storage not in ("json", "zlib"):
+        raise InputException(item_value=storage, valid_values=("json", "zlib"), valid_types=str)
+
+    json_text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if storage == "json":
+        return json_text
+
+    compressor = zlib.compressobj(level=9, zdict=JSON_ZLIB_DICTIONARY)
+    return compressor.compress(json_text.encode()) + compressor.flush()
+
+
+def json_payload_text(fetched_value: str | bytes | None) -> str | None:
+    """
+    Get the JSON text of a stored *_json column value (compressed payloads get decompressed). Registered as SQL function `json_payload()` on every connection, so SQLite's JSON1 functions work for both storage formats
+
+    :param fetched_value: value of the column
+    :return: JSON text (other values are returned unchanged)
+    """
+
+    if not isinstance(fetched_value, bytes):
+        return fetched_value
+
+    decompressor = zlib.decompressobj(zdict=JSON_ZLIB_DICTIONARY)
+    return (decompressor.decompress(fetched_value) + decompressor.flush()).decode()
+
+
+def load_dict_from_database(fetched_value: str | bytes | None) -> dict | None:
+    """
+    Convert a stored *_json column value into a dict (JSON, compressed JSON, or the string representation of a dict written by older versions)
+
+    :param fetched_value: value of the column
+    :return: Dict containing the Spotify item (None if the column is empty)
+    :raises CustomException: If Exception occurs
+    """
+
+    if fetched_value is None or fetched_value == "":
+        return None
+
+    try:
+        fetched_value = json_payload_text(fetched_value)
+    except (zlib.error, UnicodeDecodeError) as error:
+        raise CustomException(error_message=error, more_infos="Exception occurred while decompressing a stored JSON payload.")
+
+    try:
+        return json.loads(fetched_value)
+
+    except json.JSONDecodeError:
+        try:
+            return ast.literal_eval(fetched_value)
+
+        except (ValueError, SyntaxError) as error:
+            raise CustomException(error_message=error, more_infos=f"Exception occurred while converting the dict string '{fetched_value[:100]}' into a dict.")
+
+
 def flatten(lst: list) -> list:
     """
     Recursively flatten a list
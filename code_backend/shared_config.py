@@ -7,6 +7,7 @@ import ast
 import base64
 import importlib
 import io
+import itertools
 import json
 import os
 import random
@@ -18,6 +19,7 @@ import threading
 import time
 import timeit
 import traceback
+import zlib
 from dataclasses import dataclass
 from datetime import timedelta
 from hashlib import sha256
@@ -48,6 +50,11 @@ CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR_PATH = os.path.abspath(os.path.join(CURRENT_DIR, os.pardir))
 NO_IMAGE_PATH = os.path.join(ROOT_DIR_PATH, 'Icons', 'Spotipy_if_no_image.png')
 MAIN_DATABASE_PATH = os.path.join(ROOT_DIR_PATH, 'Databases', 'main_database.db')
+BLACKLIST_DATABASE_PATH = os.path.join(ROOT_DIR_PATH, 'Databases', 'blacklist.db')  # blacklisted items, kept when the main database is reset
+HTTP_CACHE_PATH = os.path.join(ROOT_DIR_PATH, 'Databases', 'http_cache.db')
+SQL_QUERIES_PATH = os.path.join(ROOT_DIR_PATH, 'code_backend', 'sql_queries')
+SQL_MIGRATIONS_PATH = os.path.join(SQL_QUERIES_PATH, 'migrations')  # scripts of the schema migrations (MAIN_MIGRATIONS in database_access.py)
+EXPORT_PATH = os.path.join(ROOT_DIR_PATH, 'Databases', 'Exports')  # Parquet/Arrow exports of the main database (database_export.py)
 JSON_PATH = os.path.join(ROOT_DIR_PATH, 'Databases', 'JSON_Files', 'spotify_devices.json')
 ENV_PATH = os.path.join(ROOT_DIR_PATH,'code_backend', '.env')
 SPOTIFY_HTTP_ERRORS_PATH = os.path.join(ROOT_DIR_PATH, "Databases", "JSON_Files", "http_errors.json")
@@ -63,6 +70,8 @@ SPOTIFY_PASSWORD = os.getenv("SPOTIFY_PASSWORD")
 
 
 # Spotify API constants
+# base url of every Web API request, can be overwritten (env key SPOTIFY_API_URL) to use a local stand-in server (development_and_testing/fake_spotify_server.py)
+SPOTIFY_API_URL = (os.getenv("SPOTIFY_API_URL") or "https://api.spotify.com/v1").rstrip("/")
 MARKET = 'DE'
 SCOPES = " ".join([
     'playlist-modify-private',
@@ -92,6 +101,72 @@ SKIPPING_STEPS: dict = {
 GUI_SIZE = [800, 400]
 WAIT_TIME = 5
 
+# HTTP client constants
+HTTP_POOL_CONNECTIONS = 10  # number of hosts a connection pool is kept for
+HTTP_POOL_MAXSIZE = 20  # maximum number of keep-alive connections per host
+HTTP_POOL_BLOCK = True  # True: wait for a free connection if a host reached HTTP_POOL_MAXSIZE
+HTTP_TIMEOUT = (5, 30)  # (connect, read) timeout in seconds
+RATE_LIMIT_PER_SECOND = 10.0  # sustained requests per second (shared by all threads)
+RATE_LIMIT_BURST = 20  # maximum number of requests sent at once
+HTTP_MAX_RETRIES = 5  # how often a throttled (429) or failed (5xx) request is retried
+HTTP_BACKOFF_BASE = 0.5  # seconds; base of the exponential backoff for 5xx retries
+HTTP_BACKOFF_MAX = 30.0  # seconds; upper limit for a single backoff wait (5xx, 429 without Retry-After)
+HTTP_RETRY_AFTER_MAX = 300.0  # seconds; longest Retry-After a throttled request waits for, longer ones raise instead of retrying early
+ASYNC_MAX_CONCURRENCY = 8  # maximum number of calls the async client runs at the same time (a call of a paged endpoint may send several requests at once)
+PAGINATION_MAX_WORKERS = 8  # maximum number of pages of one paged endpoint fetched at the same time
+PAGE_SIZE = 50  # maximum number of items per page of paged endpoints
+BATCH_WINDOW = 0.02  # seconds single-item lookups are collected before they are sent as one get_several_* request
+
+# HTTP response cache constants
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_TTL: dict = {
+    # endpoint family (first path segment after /v1/): seconds a response is served without revalidation
+    # families missing here (e.g. me, player, playlists, search) are never cached
+    "albums": 7 * 24 * 3600,
+    "artists": 24 * 3600,
+    "audio-features": 30 * 24 * 3600,
+    "markets": 24 * 3600,
+    "tracks": 7 * 24 * 3600
+}
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiration a token gets refreshed in the background
+
+# Database constants
+SQLITE_CACHED_STATEMENTS = 256  # compiled statements kept per connection (sqlite3 default: 128)
+DATABASE_BATCH_SIZE = 500  # maximum number of rows passed to one executemany call of bulk writes
+MIGRATION_CHUNK_SIZE = 1000  # rows converted per transaction by the backfills of schema migrations (database_migrations.py)
+WRITE_QUEUE_SIZE = 10_000  # rows WRITE_QUEUE (database_writer.py) holds before producers are blocked
+WRITE_QUEUE_TIMEOUT = 30  # seconds a producer waits for space in the full write queue before failing
+WRITE_FLUSH_INTERVAL = 0.5  # seconds the writer thread collects rows before writing them in one batch
+EXPORT_CHUNK_SIZE = 10_000  # rows per record batch of Parquet/Arrow exports (database_export.py)
+SQLITE_PRAGMAS: dict = {
+    # set on every connection of ConnectionManager (database_connections.py)
+    "journal_mode": "WAL",  # readers and the writer don't block each other
+    "synchronous": "NORMAL",  # fsync only at WAL checkpoints (safe in WAL mode)
+    "mmap_size": 256 * 1024 * 1024,  # bytes of the database file read via memory mapping
+    "cache_size": -64 * 1024,  # page cache per connection (negative: KiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000  # milliseconds a connection waits for a lock before failing
+}
+IMAGE_CACHE_SIZE = 64  # cover images whose bytes IMAGE_STORE (image_store.py) keeps in memory
+MODEL_CACHE_SIZE = 512  # Album, Artist, Device, Playlist, Track and User instances kept by MODEL_CACHE (music_classes.py)
+MODEL_CACHE_TTL = 600  # seconds a cached instance is returned before it is loaded again
+JSON_STORAGE: Literal["json", "zlib"] = "json"  # format of the *_json columns: JSON text or zlib compressed JSON (BLOB, about 1/5 of the size), the columns of JSON_FIELDS are written in both formats
+JSON_ZLIB_DICTIONARY: bytes = (
+    # preset dictionary of the zlib compressed payloads: substrings shared by most Spotify objects, so even small payloads compress well
+    # written with the compact separators of dump_dict_to_database(), changing it makes stored compressed payloads unreadable
+    b'"available_markets":["AR","AU","AT","BE","BO","BR","BG","CA","CL","CO","CR","CY","CZ","DK","DO","DE","EC","EE","SV","FI",'
+    b'"FR","GR","GT","HN","HK","HU","IS","IE","IT","LV","LT","LU","MY","MT","MX","NL","NZ","NI","NO","PA","PY","PE","PH",'
+    b'"PL","PT","SG","SK","ES","SE","CH","TW","TR","UY","US","GB","AD","LI","MC","ID","JP","TH","VN","RO","IL","ZA","SA"],'
+    b'"images":[{"height":640,"url":"https://i.scdn.co/image/ab67616d0000b273","width":640},{"height":300,"url":"https://i.scdn.co/image/",'
+    b'"width":300},{"height":64,"width":64}],"album_type":"album","total_tracks":,"release_date":"","release_date_precision":"day",'
+    b'"explicit":false,"is_local":false,"disc_number":1,"duration_ms":,"popularity":,"preview_url":null,"track_number":,'
+    b'"external_ids":{"isrc":""},"genres":[],"followers":{"href":null,"total":},"owner":{"display_name":"",'
+    b'"external_urls":{"spotify":"https://open.spotify.com/artist/"},"href":"https://api.spotify.com/v1/artists/","id":"","name":"",'
+    b'"type":"artist","uri":"spotify:artist:"}],"external_urls":{"spotify":"https://open.spotify.com/album/"},'
+    b'"href":"https://api.spotify.com/v1/albums/","type":"album","uri":"spotify:album:","artists":[{'
+    b'"external_urls":{"spotify":"https://open.spotify.com/track/"},"href":"https://api.spotify.com/v1/tracks/","type":"track","uri":"spotify:track:"'
+)
+
 
 # ANSI Macros
 TBOLD = '\033[1m'
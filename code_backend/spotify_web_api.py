@@ -2,6 +2,7 @@
     Implementation of the Spotify Web API to fit project purpose
 """
 import json
+from concurrent.futures import ThreadPoolExecutor
 from types import NoneType
 
 from selenium.common import WebDriverException
@@ -19,6 +20,9 @@ from code_backend.exceptions import (
     HttpException, RequestException, CustomException, InputException,
     SpotifyIdException, SpotifyUriException, LimitException
 )
+from code_backend.http_client import HTTP_CLIENT, SINGLE_FLIGHT
+from code_backend.response_cache import RESPONSE_CACHE
+from code_backend.token_manager import TokenManager
 
 
 # Note: Curl-to-... Converter:
@@ -105,7 +109,7 @@ def request_regular_token(use_credentials: bool = False, force_new_token: bool =
         }
 
         # Exchange the authorization code for an access token
-        response = requests.post(token_url, headers=headers, data=data)
+        response = HTTP_CLIENT.request("POST", token_url, rate_limited=False, headers=headers, data=data)
 
         if response.status_code == 200:
             return jsonify(response.json())
@@ -163,7 +167,7 @@ def request_regular_token(use_credentials: bool = False, force_new_token: bool =
                 'token_type': 'Bearer',
                 'expires': int(time.time()) + token_data['expires_in']
             }
-            update_env_key("REGULAR_TOKEN", json.dumps(relevant_data))
+            REGULAR_TOKEN_MANAGER.store_token(relevant_data)
             update_env_key("REFRESH_TOKEN", json.dumps({"refresh_token": token_data['refresh_token']}))
             update_env_key("AUTHORIZED_SCOPES", json.dumps({"scope": token_data['scope']}))
 
@@ -199,7 +203,7 @@ def refresh_access_token():
     Access tokens are intentionally configured to have a limited lifespan (1 hour), at the end of which, new tokens can be obtained by providing the original refresh token acquired during the authorization token request response.
     Official Documentation: https://developer.spotify.com/documentation/web-api/tutorials/refreshing-tokens
 
-    :return: update REGULAR_TOKEN (and AUTHORIZED_SCOPES) in .env
+    :return: update REGULAR_TOKEN (and AUTHORIZED_SCOPES) in .env, the new REGULAR_TOKEN is cached by REGULAR_TOKEN_MANAGER
     :raises HttpException: if request response code is not good
     :raises CustomException: If Exception occurs
 
@@ -227,11 +231,12 @@ def refresh_access_token():
         'refresh_token': json.loads(os.getenv("REFRESH_TOKEN"))['refresh_token']
     }
 
-    response = requests.post(
+    response = HTTP_CLIENT.request(
+        "POST",
         url=url,
+        rate_limited=False,
         headers=headers,
-        data=form,
-        json=True
+        data=form
     )
 
     # Error handling according to Spotify's Error Codes
@@ -262,7 +267,7 @@ def refresh_access_token():
                 "token_type": "Bearer",
                 "expires": int(time.time()) + refresh_token_data.get('expires_in', 0)
             }
-            update_env_key('REGULAR_TOKEN', json.dumps(new_regular_token))
+            REGULAR_TOKEN_MANAGER.store_token(new_regular_token)
 
             # only update if new Refresh Token is part of Response, When a refresh token is not returned, continue using the existing token
             if refresh_token_data.get('refresh_token', None):
@@ -307,7 +312,7 @@ def request_extended_token() -> None:
             'token_type': 'Bearer',
             'expires': token_data['expires']
         }
-        update_env_key("EXTENDED_TOKEN", json.dumps(relevant_data))
+        EXTENDED_TOKEN_MANAGER.store_token(relevant_data)
 
         driver.close()
 
@@ -329,6 +334,10 @@ def api_request_data(
     """
     Transferring data from or to a server using Curl commands via [requests](https://docs.python-requests.org/en/latest/index.html). Currently supported HTTP regular_api_methods are `GET`, `POST`, `PUT` and `DELETE` (This implementation is designed for Spotify API requests)
 
+    Every request reuses the pooled keep-alive connections of `HTTP_CLIENT` and is rate limited by its token bucket. Throttled (429) requests are retried after `Retry-After`, failed (5xx) requests with jittered backoff (see `http_client.py`)
+
+    GET requests of catalog endpoints (albums, artists, tracks, ...) are cached on disk by `RESPONSE_CACHE` (see `response_cache.py`), identical GET requests running at the same time are coalesced by `SINGLE_FLIGHT`
+
     :param url: url to curl from/to
     :param request_type: HTTP request method
     :param json_data: JSON data to send
@@ -344,8 +353,8 @@ def api_request_data(
     if not isinstance(url, str):
         raise InputException(item_value=url, valid_values="URLs (https://example.com)", valid_types=str)
 
-    if not isinstance(request_type, str):
-        raise InputException(item_value=request_type, valid_values=["GET", "POST", "DELETE", "PUT"], valid_types=str)
+    if not isinstance(request_type, str) or request_type not in ["GET", "POST", "DELETE", "PUT"]:
+        raise InputException(item_value=request_type, valid_values=("GET", "POST", "DELETE", "PUT"), valid_types=str)
 
     if not isinstance(json_data, (dict, str, NoneType)):
         raise InputException(item_value=json_data, valid_values="(depend on specific request)", valid_types=(dict, str, NoneType))
@@ -356,62 +365,47 @@ def api_request_data(
     if not isinstance(json_as_data, bool):
         raise InputException(item_value=json_as_data, valid_values=(True, False), valid_types=bool)
 
-    if check_token_expired(extended_token=False) == 0:
-        refresh_access_token()
-
     # HTTP Headers needed for Spotify API requests
     if overwrite_header:
         headers = overwrite_header
     else:
         headers = {
-            # If the extended Token is needed, this gets overwritten (case above)
-            'Authorization': "Bearer " + json.loads(os.getenv("REGULAR_TOKEN"))["access_token"]
+            # If the extended Token is needed, this gets overwritten (case above), the token is refreshed by REGULAR_TOKEN_MANAGER
+            'Authorization': REGULAR_TOKEN_MANAGER.authorization
         }
         if json_data:
             headers['Content-Type'] = 'application/json'
 
     # print(headers)
-    try:
-        match request_type:
-            # Note: there can be errors depending on whether 'json=' or 'data=' was used, modify cases if needed
-            case "GET":
-                query = requests.Request(method="GET", url=url, headers=headers, json=json_data)
-                response = requests.get(
-                    url=url,
-                    headers=headers,
-                    json=json_data
-                )
-            case "POST":
-                query = requests.Request(method="POST", url=url, headers=headers, json=json_data)
-                response = requests.post(
-                    url=url,
-                    headers=headers,
-                    json=json_data
-                )
+    match request_type:
+        # Note: there can be errors depending on whether 'json=' or 'data=' was used, modify cases if needed
+        case "PUT" if json_as_data:
+            query = requests.Request(method="PUT", url=url, headers=headers, data=json_data)
+        case _:
+            query = requests.Request(method=request_type, url=url, headers=headers, json=json_data)
 
-            case "DELETE":
-                query = requests.Request(method="DELETE", url=url, headers=headers, json=json_data)
-                response = requests.delete(
-                    url=url,
-                    headers=headers,
-                    json=json_data
-                )
+    if request_type == "GET":
+        # identical GET requests running at the same time share one request, every caller gets its own copy of the parsed result
+        return SINGLE_FLIGHT.do((url, headers.get('Authorization')), _send_query, query)[0]
+
+    return _send_query(query)
+
+
+def _send_query(query: requests.Request) -> dict | list | str | None:
+    """
+    Send a request built by `api_request_data()` and parse the response
 
-            case "PUT":
-                if json_as_data:
-                    query = requests.Request(method="PUT", url=url, headers=headers, data=json_data)
-                    response = requests.put(
-                        url=url,
-                        headers=headers,
-                        data=json_data
-                    )
-                else:
-                    query = requests.Request(method="PUT", url=url, headers=headers, json=json_data)
-                    response = requests.put(
-                        url=url,
-                        headers=headers,
-                        json=json_data
-                    )
+    :param query: request to send
+    :return: JSON data fetched from Spotify API
+    :raises RequestException: if Exception occurs while using requests
+    :raises HttpException: if request response code is not good
+    :raises CustomException: If Exception occurs
+    """
+
+    try:
+        # every request shares the pooled keep-alive connections and the rate limit of HTTP_CLIENT (429/5xx are retried there)
+        # catalog GET requests are answered by the persistent RESPONSE_CACHE while fresh and revalidated afterward
+        response = RESPONSE_CACHE.send(query)
 
     except Exception as error:
         raise RequestException(
@@ -468,6 +462,47 @@ def api_request_data(
                 )
 
 
+def _paginate(page_url: Callable[[int, int], str], limit: int | None = None, paging_key: str | None = None, get_total: bool = False) -> list[dict] | tuple[list[dict], int]:
+    """
+    Fetch the items of a paged endpoint. The first page returns `total`, afterward the remaining offsets are fetched concurrently (at most `PAGINATION_MAX_WORKERS` pages at the same time) and merged in offset order.
+
+    :param page_url: function returning the url of one page for (offset, limit)
+    :param limit: The maximum number of items to return (None: all items)
+    :param paging_key: key of the paging object in the response (e.g. "artists"), None: the response is the paging object
+    :param get_total: If to get the `total` of the first page (number of items of the endpoint) as second param
+    :return: List containing the items of every page in offset order (and optional the total as second param)
+    :raises InputException: if input is invalid
+    """
+
+    if not callable(page_url):
+        raise InputException(item_value=page_url, valid_values="function(offset, limit) -> url", valid_types=Callable)
+
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise InputException(item_value=limit, valid_values="positive integer or None", valid_types=(int, NoneType))
+
+    def fetch_page(offset: int, page_limit: int) -> dict:
+        response = api_request_data(url=page_url(offset, page_limit), request_type="GET", json_data=None)
+        return response[paging_key] if paging_key else response
+
+    first_page = fetch_page(0, PAGE_SIZE if limit is None else min(PAGE_SIZE, limit))
+    items = list(first_page["items"])
+
+    stop = first_page["total"] if limit is None else min(first_page["total"], limit)
+    offsets = list(range(PAGE_SIZE, stop, PAGE_SIZE))
+
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(PAGINATION_MAX_WORKERS, len(offsets))) as executor:
+            # map() returns the pages in offset order, regardless of which request finished first
+            pages = executor.map(lambda offset: fetch_page(offset, min(PAGE_SIZE, stop - offset)), offsets)
+            for page in pages:
+                items.extend(page["items"])
+
+    if get_total:
+        return items, first_page["total"]
+
+    return items
+
+
 # <-- Begin Spotify Album Methods -->
 def get_album(album_id: str, ignore_market: bool = False) -> dict:
     """
@@ -491,7 +526,7 @@ def get_album(album_id: str, ignore_market: bool = False) -> dict:
         raise InputException(item_value=ignore_market, valid_values=(True, False), valid_types=bool)
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/albums/{album_id}{f"?market={MARKET}" if not ignore_market else ""}",
+        url=f"{SPOTIFY_API_URL}/albums/{album_id}{f"?market={MARKET}" if not ignore_market else ""}",
         request_type="GET",
         json_data=None
     )
@@ -509,7 +544,7 @@ def get_several_albums(album_ids: list[str], ignore_market: bool = False) -> dic
 
     :param album_ids: A comma-separated list of the Spotify IDs for the albums.
     :param ignore_market: Whether to ignore market.
-    :return: Dict containing Spotify Albums, in the form of {album_uri: album}
+    :return: Dict containing Spotify Albums, in the form of {album_uri: album} (unknown ids are left out)
     :raises SpotifyIdException: if spotify id is invalid
     :raises InputException: if input is invalid
     """
@@ -525,12 +560,13 @@ def get_several_albums(album_ids: list[str], ignore_market: bool = False) -> dic
     for current_chunk in range(0, len(album_ids), 20):
         encoded_chunk = quote(",".join(album_ids[current_chunk: current_chunk + 20]))
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/albums?ids={encoded_chunk}{f"&market={MARKET}" if not ignore_market else ""}",
+            url=f"{SPOTIFY_API_URL}/albums?ids={encoded_chunk}{f"&market={MARKET}" if not ignore_market else ""}",
             request_type="GET",
             json_data=None
         )
 
-        tmp = {item["uri"]: item for item in response["albums"]}
+        # unknown ids are returned as null
+        tmp = {item["uri"]: item for item in response["albums"] if item is not None}
         albums.update(tmp)
 
     return albums
@@ -561,32 +597,10 @@ def get_album_tracks(album_id: str, get_duration: bool = False, ignore_market: b
     if not isinstance(ignore_market, bool):
         raise InputException(item_value=ignore_market, valid_values=(True, False), valid_types=bool)
 
-    track_dicts = {}
-
-    # Get first (up to) 50 tracks
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/albums/{album_id}/tracks?{f"market={MARKET}&" if not ignore_market else ""}limit=50&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/albums/{album_id}/tracks?{f"market={MARKET}&" if not ignore_market else ""}limit={page_limit}&offset={offset}"
     )
-
-    tmp = {item["uri"]: item for item in response["items"]}
-    track_dicts.update(tmp)
-
-    # If there are more than 50 albums:
-    total_albums = response["total"]
-    current_offset = 50
-
-    while current_offset < total_albums:
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/albums/{album_id}/tracks?market={MARKET}&limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-        tmp = {item["uri"]: item for item in response["items"]}
-        track_dicts.update(tmp)
-
-        current_offset += 50
+    track_dicts = {item["uri"]: item for item in items}
 
     if get_duration:
         duration = sum([int(current_track["duration_ms"]) for current_track in track_dicts.values()])
@@ -606,34 +620,11 @@ def get_users_saved_albums() -> dict | None:
     :return: Dict containing Saved Spotify Albums, in the form of {album_uri: album}
     """
 
-    albums = {}
-
-    # Get first (up to) 50 albums
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/albums?limit=50&offset=0&market={MARKET}",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/me/albums?limit={page_limit}&offset={offset}&market={MARKET}"
     )
 
-    tmp = {item["album"]["uri"]: item["album"] for item in response["items"]}
-    albums.update(tmp)
-
-    # If there are more than 50 albums:
-    total_albums = response["total"]
-    current_offset = 50
-
-    while current_offset < total_albums:
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/albums?limit=50&offset={current_offset}&market={MARKET}",
-            request_type="GET",
-            json_data=None
-        )
-        tmp = {item["album"]["uri"]: item["album"] for item in response["items"]}
-        albums.update(tmp)
-
-        current_offset += 50
-
-    return albums
+    return {item["album"]["uri"]: item["album"] for item in items}
 
 
 def check_users_saved_albums(album_ids: list[str]) -> dict | None:
@@ -657,7 +648,7 @@ def check_users_saved_albums(album_ids: list[str]) -> dict | None:
     for current_chunk in range(0, len(album_ids), 50):
         encoded_chunk = quote(",".join(album_ids[current_chunk: current_chunk + 50]))
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/albums/contains?ids={encoded_chunk}",
+            url=f"{SPOTIFY_API_URL}/me/albums/contains?ids={encoded_chunk}",
             request_type="GET",
             json_data=None
         )
@@ -686,7 +677,7 @@ def get_artist(artist_id: str) -> dict | None:
         raise SpotifyIdException(invalid_id=artist_id, id_type="artist")
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/artists/{artist_id}",
+        url=f"{SPOTIFY_API_URL}/artists/{artist_id}",
         request_type="GET",
         json_data=None
     )
@@ -703,7 +694,7 @@ def get_several_artists(artist_ids: list[str]) -> dict | None:
     **Official API Documentation:** https://developer.spotify.com/documentation/web-api/reference/get-multiple-artists
 
     :param artist_ids: A comma-separated list of the Spotify IDs for the artists.
-    :return: Dict containing Spotify Artists, in the form of {artist_uri: artist}
+    :return: Dict containing Spotify Artists, in the form of {artist_uri: artist} (unknown ids are left out)
     :raises SpotifyIdException: if spotify id is invalid
     """
 
@@ -715,12 +706,13 @@ def get_several_artists(artist_ids: list[str]) -> dict | None:
     for current_chunk in range(0, len(artist_ids), 50):
         encoded_chunk = quote(",".join(artist_ids[current_chunk: current_chunk + 50]))
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/artists?ids={encoded_chunk}",
+            url=f"{SPOTIFY_API_URL}/artists?ids={encoded_chunk}",
             request_type="GET",
             json_data=None
         )
 
-        tmp = {item["uri"]: item for item in response["artists"]}
+        # unknown ids are returned as null
+        tmp = {item["uri"]: item for item in response["artists"] if item is not None}
         artists.update(tmp)
 
     return artists
@@ -747,32 +739,12 @@ def get_artists_albums(artist_id: str, limit: int = 20) -> dict | None:
     if check_limits(limit=limit) > 0:
         raise LimitException(invalid_limit=limit)
 
-    albums = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/artists/{artist_id}/albums?market={MARKET}&limit={min(50, limit)}&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/artists/{artist_id}/albums?market={MARKET}&limit={page_limit}&offset={offset}",
+        limit=limit
     )
 
-    tmp = {item["uri"]: item for item in response["items"]}
-    albums.update(tmp)
-
-    # If there are more than 50 albums:
-    total_albums = response["total"]
-
-    for current_offset in range(50, min(total_albums, limit), 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/artists/{artist_id}/albums?market={MARKET}&limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["uri"]: item for item in response["items"]}
-        albums.update(tmp)
-
-    return albums
+    return {item["uri"]: item for item in items}
 
 
 def get_artists_top_tracks(artist_id: str) -> dict | None:
@@ -792,7 +764,7 @@ def get_artists_top_tracks(artist_id: str) -> dict | None:
         raise SpotifyIdException(invalid_id=artist_id, id_type="artist")
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/artists/{artist_id}/top-tracks?market={MARKET}",
+        url=f"{SPOTIFY_API_URL}/artists/{artist_id}/top-tracks?market={MARKET}",
         request_type="GET",
         json_data=None
     )
@@ -813,7 +785,7 @@ def get_available_markets():
     :return: List of available markets.
     """
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/markets",
+        url=f"{SPOTIFY_API_URL}/markets",
         request_type="GET"
     )
     return response["markets"]
@@ -831,7 +803,7 @@ def get_playback_state() -> dict:
     :return: Dict containing information about playback
     """
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/player?market={MARKET}",
+        url=f"{SPOTIFY_API_URL}/me/player?market={MARKET}",
         request_type="GET"
     )
 
@@ -863,7 +835,7 @@ def transfer_playback(new_device_id: str, playback_state: bool = False) -> None:
     }
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player",
+        url=f"{SPOTIFY_API_URL}/me/player",
         request_type="PUT",
         json_data=request_body,
         json_as_data=False
@@ -881,7 +853,7 @@ def get_available_devices():
     :return: Dict containing information about available devices, in the form of {device_uri: device} (Device uri is NOT official)
     """
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/devices",
+        url=f"{SPOTIFY_API_URL}/me/player/devices",
         request_type="GET"
     )
 
@@ -918,7 +890,7 @@ def get_currently_playing_track() -> dict:
     :return: Dict containing information about currently playing track
     """
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/currently-playing?market={MARKET}",
+        url=f"{SPOTIFY_API_URL}/me/player/currently-playing?market={MARKET}",
         request_type="GET"
     )
 
@@ -947,7 +919,7 @@ def start_or_resume_playback(target_device_id: str = None) -> None:
     # only working if Spotify not playing anything (if called while playing -> Error)
     if not get_playback_state()['is_playing']:
         api_request_data(
-            url=f"https://api.spotify.com/v1/me/player/play{"?device_id=" + target_device_id if target_device_id else ""}",
+            url=f"{SPOTIFY_API_URL}/me/player/play{"?device_id=" + target_device_id if target_device_id else ""}",
             request_type="PUT"
         )
 
@@ -963,7 +935,7 @@ def pause_playback() -> None:
     # only working if Spotify playing anything (if called while paused -> Error)
     if get_playback_state()['is_playing']:
         api_request_data(
-            url=f"https://api.spotify.com/v1/me/player/pause",
+            url=f"{SPOTIFY_API_URL}/me/player/pause",
             request_type="PUT"
         )
 
@@ -988,7 +960,7 @@ def skip_to_next(target_device_id: str = None) -> None:
     target_device_id = None
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/next{"?device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/next{"?device_id=" + target_device_id if target_device_id else ""}",
         request_type="POST"
     )
 
@@ -1013,7 +985,7 @@ def skip_to_previous(target_device_id: str = None) -> None:
     target_device_id = None
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/previous{"?device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/previous{"?device_id=" + target_device_id if target_device_id else ""}",
         request_type="POST"
     )
 
@@ -1050,7 +1022,7 @@ def seek_to_position(position_ms: int, target_device_id: str = None):
         )
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/seek?position_ms={position_ms}{"&device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/seek?position_ms={position_ms}{"&device_id=" + target_device_id if target_device_id else ""}",
         request_type="PUT"
     )
 
@@ -1088,7 +1060,7 @@ def set_repeat_mode(new_repeat_mode: Literal["track", "context", "off"], target_
         return
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/repeat?state={new_repeat_mode}{"&device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/repeat?state={new_repeat_mode}{"&device_id=" + target_device_id if target_device_id else ""}",
         request_type="PUT"
     )
 
@@ -1118,7 +1090,7 @@ def set_playback_volume(new_volume: int, target_device_id: str = None) -> None:
     target_device_id = None
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/volume?volume_percent={new_volume}{"&device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/volume?volume_percent={new_volume}{"&device_id=" + target_device_id if target_device_id else ""}",
         request_type="PUT"
     )
 
@@ -1148,7 +1120,7 @@ def toggle_playback_shuffle(new_state: bool, target_device_id: str = None) -> No
     target_device_id = None
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/shuffle?state={new_state}{"&device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/shuffle?state={new_state}{"&device_id=" + target_device_id if target_device_id else ""}",
         request_type="PUT"
     )
 
@@ -1177,7 +1149,7 @@ def get_recently_played_tracks(limit: int, after: int = None, before: int = None
         if not isinstance(after, int):
             raise InputException(item_value=after, valid_values="valid Unix timestamp in milliseconds", valid_types=int)
 
-        url = f"https://api.spotify.com/v1/me/player/recently-played?limit={limit}&after={after}"
+        url = f"{SPOTIFY_API_URL}/me/player/recently-played?limit={limit}&after={after}"
 
         if before:
             print(f"{CORANGE}ignoring parameter before", TEXTCOLOR)
@@ -1185,7 +1157,7 @@ def get_recently_played_tracks(limit: int, after: int = None, before: int = None
         if not isinstance(before, int):
             raise InputException(item_value=before, valid_values="valid Unix timestamp in milliseconds", valid_types=int)
 
-        url = f"https://api.spotify.com/v1/me/player/recently-played?limit={limit}&before={before}"
+        url = f"{SPOTIFY_API_URL}/me/player/recently-played?limit={limit}&before={before}"
 
     else:
         CustomException(
@@ -1215,7 +1187,7 @@ def get_the_users_queue() -> dict:
     :return: ordered Dict containing Spotify queued Tracks, in the form of {track_uri: track}
     """
     response = api_request_data(
-        url="https://api.spotify.com/v1/me/player/queue",
+        url=f"{SPOTIFY_API_URL}/me/player/queue",
         request_type="GET"
     )
 
@@ -1253,7 +1225,7 @@ def add_item_to_playback_queue(track_uri: str, target_device_id: str = None) ->
 
     encoded_uri = quote(track_uri)
     api_request_data(
-        url=f"https://api.spotify.com/v1/me/player/queue?uri={encoded_uri}{"&device_id=" + target_device_id if target_device_id else ""}",
+        url=f"{SPOTIFY_API_URL}/me/player/queue?uri={encoded_uri}{"&device_id=" + target_device_id if target_device_id else ""}",
         request_type="POST"
     )
 
@@ -1280,10 +1252,9 @@ def add_several_items_to_playback_queue(track_uris: list[str], target_device_id:
     target_device_id = None
 
     # Warning: Does not use API optimization, because there is no Web API method for this by Spotify
-    #   If HTTP Error 429 occurs multiple times set time.sleep(X) between the iterations
+    #   (HTTP Error 429 is handled by the rate limiter of HTTP_CLIENT)
     for current_uri in track_uris:
         add_item_to_playback_queue(current_uri, target_device_id=target_device_id)
-        # time.sleep(X)
 
 
 # <-- Begin Spotify Playlist Methods -->
@@ -1306,7 +1277,7 @@ def get_playlist(playlist_id: str) -> dict | None:
     # Note: it could be that private playlists create errors (not tested)
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/playlists/{playlist_id}?market={MARKET}",
+        url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}?market={MARKET}",
         request_type="GET",
         json_data=None
     )
@@ -1335,11 +1306,10 @@ def get_several_playlists(playlist_ids: list) -> dict | None:
 
     playlists = {}
     # Warning: Does not use API optimization, because there is no Web API method for this by Spotify
-    #   If HTTP Error 429 occurs multiple times set time.sleep(X) between the iterations
+    #   (HTTP Error 429 is handled by the rate limiter of HTTP_CLIENT)
     for current_playlist_id in playlist_ids:
         current_playlist = get_playlist(playlist_id=current_playlist_id)
         playlists.update(current_playlist)
-        # time.sleep(X)
 
     return playlists
 
@@ -1385,7 +1355,7 @@ def change_playlist_details(playlist_id: str, name: str, public: bool, collabora
     }
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/playlists/{playlist_id}",
+        url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}",
         request_type="PUT",
         json_data=json_data
     )
@@ -1417,30 +1387,11 @@ def get_playlist_items(playlist_id: str, get_duration: bool = False, ignore_mark
     if not isinstance(ignore_market, bool):
         raise InputException(item_value=ignore_market, valid_values=(True, False), valid_types=bool)
 
-    tracks = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks?limit=50&offset=0{f"&market={MARKET}" if not ignore_market else ""}",
-        request_type="GET",
-        json_data=None
+    items, total_tracks = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/playlists/{playlist_id}/tracks?limit={page_limit}&offset={offset}{f"&market={MARKET}" if not ignore_market else ""}",
+        get_total=True
     )
-
-    tmp = {item["track"]["uri"]: item["track"] for item in response["items"]}
-    tracks.update(tmp)
-
-    # If there are more than 50 albums:
-    total_tracks = response["total"]
-
-    for current_offset in range(50, total_tracks, 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks?limit=50&offset={current_offset}&market={MARKET}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["track"]["uri"]: item["track"] for item in response["items"]}
-        tracks.update(tmp)
+    tracks = {item["track"]["uri"]: item["track"] for item in items}
 
     if len(tracks) != total_tracks:
         CustomException(
@@ -1523,7 +1474,7 @@ def add_items_to_playlist(playlist_id: str, track_uris: list[str]) -> None:
             # "position": position
         }
         api_request_data(
-            url=f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
+            url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}/tracks",
             request_type="POST",
             json_data=json_data
         )
@@ -1560,7 +1511,7 @@ def remove_playlist_items(playlist_id: str, track_uris: list[str]) -> None:
             'tracks': track_dict[current_offset:current_offset + 100],
         }
         api_request_data(
-            url=f"https://api.spotify.com/v1/playlists/{playlist_id}/tracks",
+            url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}/tracks",
             request_type="DELETE",
             json_data=json_data
         )
@@ -1585,32 +1536,12 @@ def get_current_users_playlists(limit: int = 20) -> dict | None:
     if check_limits(limit=limit) == 1:
         return None
 
-    playlists = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/playlists?limit={min(50, limit)}&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/me/playlists?limit={page_limit}&offset={offset}",
+        limit=limit
     )
 
-    tmp = {item["uri"]: item for item in response["items"]}
-    playlists.update(tmp)
-
-    # If there are more than 50 albums:
-    total_playlists = response["total"]
-
-    for current_offset in range(50, min(total_playlists, limit), 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/playlists?limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["uri"]: item for item in response["items"]}
-        playlists.update(tmp)
-
-    return playlists
+    return {item["uri"]: item for item in items}
 
 
 def get_users_playlists(user_id: str, limit: int | None = 20) -> dict | None:
@@ -1640,32 +1571,12 @@ def get_users_playlists(user_id: str, limit: int | None = 20) -> dict | None:
     if check_limits(limit=limit) == 1:
         return None
 
-    playlists = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/users/{user_id}/playlists?limit={min(50, limit)}&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/users/{user_id}/playlists?limit={page_limit}&offset={offset}",
+        limit=limit
     )
 
-    tmp = {item["uri"]: item for item in response["items"]}
-    playlists.update(tmp)
-
-    # If there are more than 50 albums:
-    total_playlists = response["total"]
-
-    for current_offset in range(50, min(total_playlists, limit), 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/users/{user_id}/playlists?limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["uri"]: item for item in response["items"]}
-        playlists.update(tmp)
-
-    return playlists
+    return {item["uri"]: item for item in items}
 
 
 def create_playlist(user_id: str, name: str, public: bool = True, collaborative: bool = False, description: str = None) -> dict | None:
@@ -1708,7 +1619,7 @@ def create_playlist(user_id: str, name: str, public: bool = True, collaborative:
         "collaborative": collaborative,
     }
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/users/{user_id}/playlists",
+        url=f"{SPOTIFY_API_URL}/users/{user_id}/playlists",
         request_type="POST",
         json_data=json_data
     )
@@ -1732,7 +1643,7 @@ def get_playlist_cover_image(playlist_id: str) -> ImageFile:
         raise SpotifyIdException(invalid_id=playlist_id, id_type="playlist")
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/playlists/{playlist_id}/images",
+        url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}/images",
         request_type="GET",
         json_data=None
     )
@@ -1760,16 +1671,13 @@ def add_custom_playlist_cover_image(playlist_id: str, b64_image: str) -> None:
     if not isinstance(b64_image, str):
         raise InputException(item_value=b64_image, valid_values="(valid base64 image string)", valid_types=str)
 
-    if check_token_expired(extended_token=False) == 0:
-        request_regular_token()
-
     header = {
-        'Authorization': "Bearer " + json.loads(os.getenv("REGULAR_TOKEN"))["access_token"],
+        'Authorization': REGULAR_TOKEN_MANAGER.authorization,
         'Content-Type': "image/jpeg"
     }
 
     api_request_data(
-        url=f"https://api.spotify.com/v1/playlists/{playlist_id}/images",
+        url=f"{SPOTIFY_API_URL}/playlists/{playlist_id}/images",
         request_type="PUT",
         json_data=b64_image,
         overwrite_header=header,
@@ -1847,7 +1755,7 @@ def search_for_item(
         raise InputException(item_value=offset, valid_values=f"0 <= offset <= {1000 - limit}", valid_types=int)
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/search?q={search_query}{"&type=" + ','.join(item_type)}&market={MARKET}&limit={limit}&offset={offset}",
+        url=f"{SPOTIFY_API_URL}/search?q={search_query}{"&type=" + ','.join(item_type)}&market={MARKET}&limit={limit}&offset={offset}",
         request_type="GET"
     )
 
@@ -1886,7 +1794,7 @@ def get_track(track_id: str, ignore_market: bool = False) -> dict:
         raise InputException(item_value=ignore_market, valid_values=(True, False), valid_types=bool)
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/tracks/{track_id}{f"?market={MARKET}" if not ignore_market else ""}",
+        url=f"{SPOTIFY_API_URL}/tracks/{track_id}{f"?market={MARKET}" if not ignore_market else ""}",
         request_type="GET",
         json_data=None
     )
@@ -1902,7 +1810,7 @@ def get_several_tracks(track_ids: list[str], ignore_market: bool = False) -> dic
     **Official API Documentation:** https://developer.spotify.com/documentation/web-api/reference/get-several-tracks
 
     :param track_ids: A list of the Spotify IDs to be checked.
-    :return: Dict containing Spotify Tracks, in the form of {track_uri: track}
+    :return: Dict containing Spotify Tracks, in the form of {track_uri: track} (unknown ids are left out)
     :raises SpotifyIdException: if spotify id is invalid
     :raises InputException: if input is invalid
     """
@@ -1920,12 +1828,13 @@ def get_several_tracks(track_ids: list[str], ignore_market: bool = False) -> dic
         encoded_chunk = quote(",".join(track_ids[current_offset: current_offset + 50]))
 
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/tracks?{f"market={MARKET}&" if not ignore_market else ""}ids={encoded_chunk}",
+            url=f"{SPOTIFY_API_URL}/tracks?{f"market={MARKET}&" if not ignore_market else ""}ids={encoded_chunk}",
             request_type="GET",
             json_data=None
         )
 
-        tmp = {item["uri"]: item for item in response["tracks"]}
+        # unknown ids are returned as null
+        tmp = {item["uri"]: item for item in response["tracks"] if item is not None}
         tracks.update(tmp)
 
     return tracks
@@ -1952,32 +1861,12 @@ def get_users_saved_tracks(limit: int = 20, ignore_market: bool = False) -> dict
     if not isinstance(ignore_market, bool):
         raise InputException(item_value=ignore_market, valid_values=(True, False), valid_types=bool)
 
-    tracks = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/tracks?{f"market={MARKET}&" if not ignore_market else ""}limit={min(50, limit)}&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/me/tracks?{f"market={MARKET}&" if not ignore_market else ""}limit={page_limit}&offset={offset}",
+        limit=limit
     )
 
-    tmp = {item["track"]["uri"]: item["track"] for item in response["items"]}
-    tracks.update(tmp)
-
-    # If there are more than 50 albums:
-    total_tracks = response["total"]
-
-    for current_offset in range(50, min(total_tracks, limit), 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/tracks?market={MARKET}&limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["uri"]: item for item in response["items"]}
-        tracks.update(tmp)
-
-    return tracks
+    return {item["track"]["uri"]: item["track"] for item in items}
 
 
 def check_users_saved_tracks(track_ids: list[str]) -> dict | None:
@@ -2003,7 +1892,7 @@ def check_users_saved_tracks(track_ids: list[str]) -> dict | None:
         encoded_chunk = quote(",".join(track_ids[current_offset: current_offset + 50]))
 
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/tracks/contains?ids={encoded_chunk}",
+            url=f"{SPOTIFY_API_URL}/me/tracks/contains?ids={encoded_chunk}",
             request_type="GET",
             json_data=None
         )
@@ -2030,9 +1919,9 @@ def get_tracks_audio_features(track_id: str):
     if not check_spotify_id(spotify_id=track_id):
         raise SpotifyIdException(invalid_id=track_id, id_type="track")
 
-    header = {'Authorization': "Bearer " + json.loads(os.getenv("EXTENDED_TOKEN"))["access_token"]}
+    header = {'Authorization': EXTENDED_TOKEN_MANAGER.authorization}
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/audio-features/{track_id}",
+        url=f"{SPOTIFY_API_URL}/audio-features/{track_id}",
         request_type="GET",
         overwrite_header=header
     )
@@ -2056,14 +1945,14 @@ def get_several_tracks_audio_features(track_ids: list[str]) -> dict | None:
         invalid_tracks = ', '.join(get_invalid_spotify_ids(spotify_ids=track_ids))
         raise SpotifyIdException(invalid_id=invalid_tracks, id_type="track")
 
-    header = {'Authorization': "Bearer " + json.loads(os.getenv("EXTENDED_TOKEN"))["access_token"]}
+    header = {'Authorization': EXTENDED_TOKEN_MANAGER.authorization}
     audio_features = {}
 
     for current_offset in range(0, len(track_ids), 100):
         encoded_chunk = quote(",".join(track_ids[current_offset: current_offset + 100]))
 
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/audio-features?ids={encoded_chunk}",
+            url=f"{SPOTIFY_API_URL}/audio-features?ids={encoded_chunk}",
             request_type="GET",
             json_data=None,
             overwrite_header=header
@@ -2095,16 +1984,21 @@ def get_original_tracks(tracks: dict) -> dict | None:
     if not isinstance(tracks, dict):
         raise InputException(item_value=tracks, valid_values="{'spotify:track:${track_id}': {...}, ..., 'spotify:track:${track_id}': {...}}", valid_types=dict)
 
-    original_tracks = dict()
-    for current_track_uri, current_track in tracks.items():
+    for current_track in tracks.values():
         if not isinstance(current_track, dict):
             raise InputException(item_value=current_track, valid_values="{'spotify:track:${track_id}': {...}}", valid_types=dict)
 
-        if current_track.get("linked_from", False):
-            original_track_id = current_track.get("linked_from")["id"]
-            original_track = get_track(track_id=original_track_id, ignore_market=True)
+    # fetch every original track with get_several_tracks() instead of one request per relinked track
+    original_track_ids = [current_track["linked_from"]["id"] for current_track in tracks.values() if current_track.get("linked_from", False)]
+    fetched_tracks = get_several_tracks(track_ids=original_track_ids, ignore_market=True) if original_track_ids else {}
+    fetched_tracks_by_id = {track["id"]: track for track in fetched_tracks.values()}
 
-            original_tracks.update(original_track)
+    original_tracks = dict()
+    for current_track_uri, current_track in tracks.items():
+        # the relinked track is kept if its original one is not available anymore
+        if current_track.get("linked_from", False) and current_track["linked_from"]["id"] in fetched_tracks_by_id:
+            original_track = fetched_tracks_by_id[current_track["linked_from"]["id"]]
+            original_tracks.update({original_track["uri"]: original_track})
 
         else:
             original_tracks.update({current_track_uri: current_track})
@@ -2125,7 +2019,7 @@ def get_current_users_profile() -> dict:
     """
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/me",
+        url=f"{SPOTIFY_API_URL}/me",
         request_type="GET",
         json_data=None
     )
@@ -2161,32 +2055,12 @@ def get_users_top_items(
     if check_limits(limit=limit) > 0:
         raise LimitException(invalid_limit=limit)
 
-    tracks = {}
-
-    # Get first (up to) 50 artists
-    response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/top/{item_type}?time_range={time_range}&limit={min(50, limit)}&offset=0",
-        request_type="GET",
-        json_data=None
+    items = _paginate(
+        page_url=lambda offset, page_limit: f"{SPOTIFY_API_URL}/me/top/{item_type}?time_range={time_range}&limit={page_limit}&offset={offset}",
+        limit=limit
     )
 
-    tmp = {item["uri"]: item for item in response["items"]}
-    tracks.update(tmp)
-
-    # If there are more than 50 albums:
-    total_artists = response["total"]
-
-    for current_offset in range(50, min(total_artists, limit), 50):
-        response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/top/{item_type}?time_range={time_range}&limit=50&offset={current_offset}",
-            request_type="GET",
-            json_data=None
-        )
-
-        tmp = {item["uri"]: item for item in response["items"]}
-        tracks.update(tmp)
-
-    return tracks
+    return {item["uri"]: item for item in items}
 
 
 def get_users_profile(user_id: str) -> dict:
@@ -2206,7 +2080,7 @@ def get_users_profile(user_id: str) -> dict:
         raise SpotifyIdException(invalid_id=user_id, id_type="user")
 
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/users/{user_id}",
+        url=f"{SPOTIFY_API_URL}/users/{user_id}",
         request_type="GET",
         json_data=None
     )
@@ -2230,11 +2104,10 @@ def get_several_users(user_ids: list) -> dict | None:
     users = {}
 
     # Warning: Does not use API optimization, because there is no Web API method for this by Spotify
-    #   If HTTP Error 429 occurs multiple times set time.sleep(X) between the iterations
+    #   (HTTP Error 429 is handled by the rate limiter of HTTP_CLIENT)
     for current_user_id in user_ids:
         current_playlist = get_users_profile(user_id=current_user_id)
         users.update(current_playlist)
-        # time.sleep(X)
 
     return users
 
@@ -2259,7 +2132,7 @@ def get_followed_artists(get_type: str = "artist") -> dict | None:
 
     # Get first (up to) 50 artists
     response = api_request_data(
-        url=f"https://api.spotify.com/v1/me/following?type={get_type}&limit=50",
+        url=f"{SPOTIFY_API_URL}/me/following?type={get_type}&limit=50",
         request_type="GET",
         json_data=None
     )
@@ -2274,7 +2147,7 @@ def get_followed_artists(get_type: str = "artist") -> dict | None:
         last_id = artists[list(artists.keys())[-1]]["id"]
 
         response = api_request_data(
-            url=f"https://api.spotify.com/v1/me/following?type={get_type}&limit=50&after={last_id}",
+            url=f"{SPOTIFY_API_URL}/me/following?type={get_type}&limit=50&after={last_id}",
             request_type="GET",
             json_data=None
         )
@@ -2284,5 +2157,9 @@ def get_followed_artists(get_type: str = "artist") -> dict | None:
     return artists
 
 
+# cached tokens, REGULAR_TOKEN is refreshed in the background before it expires
+REGULAR_TOKEN_MANAGER = TokenManager("REGULAR_TOKEN", refresh_callback=refresh_access_token)
+EXTENDED_TOKEN_MANAGER = TokenManager("EXTENDED_TOKEN")
+
 if __name__ == '__main__':
     """"""
@@ -0,0 +1,179 @@
+"""
+    Asynchronous version of spotify_web_api.py: every public API function is available as coroutine function with the same name and signature
+
+    Example::
+
+        albums, top_tracks = run_sync(gather(get_artists_albums(artist_id), get_artists_top_tracks(artist_id)))
+"""
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from code_backend.shared_config import *
+import code_backend.spotify_web_api as spotify
+from code_backend.exceptions import InputException, CustomException
+
+
+class AsyncSpotifyClient:
+    """
+    Runs the blocking functions of spotify_web_api.py on one shared event loop (daemon thread).
+
+    Calls are executed by a worker pool of `max_concurrency` threads, so they share the pooled connections, the rate limiter of `HTTP_CLIENT` and the cached token of `REGULAR_TOKEN_MANAGER`. At most `max_concurrency` calls run at the same time, independent calls overlap. This does not limit the requests: a call of a paged endpoint (e.g. get_playlist_items) fetches up to `PAGINATION_MAX_WORKERS` pages at the same time, the request rate of all calls is limited by the rate limiter of `HTTP_CLIENT`.
+    """
+
+    def __init__(self, max_concurrency: int = ASYNC_MAX_CONCURRENCY) -> None:
+        """
+        :param max_concurrency: maximum number of calls running at the same time (worker threads)
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise InputException(item_value=max_concurrency, valid_values="positive integer", valid_types=int)
+
+        self.max_concurrency: int = max_concurrency
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: threading.Thread | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the shared event loop (started in a daemon thread on first access)
+
+        :return: running event loop
+        """
+
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="spotify_async")
+                    loop.set_default_executor(self._executor)
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+                    self._loop_thread = threading.Thread(target=loop.run_forever, name="spotify_async_loop", daemon=True)
+                    self._loop_thread.start()
+                    self._loop = loop
+
+        return self._loop
+
+    async def call(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking function in the worker pool, limited by the shared semaphore
+
+        :param function: blocking function (e.g. of spotify_web_api.py)
+        :param args: positional arguments of the function
+        :param kwargs: keyword arguments of the function
+        :return: return value of the function
+        :raises CustomException: if called outside the shared event loop
+        """
+
+        if asyncio.get_running_loop() is not self.loop:
+            raise CustomException(error_message="Wrong event loop", more_infos="Coroutines of the async client need to run on its shared loop, use run_sync() or run_async().")
+
+        async with self._semaphore:
+            return await self.loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+    def run_async(self, coroutine: Coroutine) -> Future:
+        """
+        Schedule a coroutine on the shared event loop without waiting for it
+
+        :param coroutine: coroutine to run (e.g. get_album(...))
+        :return: concurrent.futures.Future of the result
+        :raises InputException: if input is invalid
+        """
+
+        if not asyncio.iscoroutine(coroutine):
+            raise InputException(item_value=coroutine, valid_values="coroutine (e.g. get_album(...))", valid_types=Coroutine)
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run_sync(self, coroutine: Coroutine, timeout: float | None = None) -> Any:
+        """
+        Run a coroutine on the shared event loop and wait for its result (sync facade)
+
+        :param coroutine: coroutine to run (e.g. get_album(...))
+        :param timeout: seconds to wait for the result (None: no timeout)
+        :return: result of the coroutine
+        :raises InputException: if input is invalid
+        :raises CustomException: if called from inside the shared event loop (would deadlock)
+        """
+
+        if self._loop_thread is not None and threading.current_thread() is self._loop_thread:
+            coroutine.close()
+            raise CustomException(error_message="Deadlock", more_infos="run_sync() can't be called from inside the shared event loop, use 'await' instead.")
+
+        return self.run_async(coroutine).result(timeout=timeout)
+
+    def close(self) -> None:
+        """
+        Stop the shared event loop and the worker pool (a new loop is started on the next call)
+        """
+
+        with self._lock:
+            if self._loop is None:
+                return
+
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._executor.shutdown(wait=True)
+            self._loop = self._loop_thread = self._executor = self._semaphore = None
+
+
+ASYNC_CLIENT = AsyncSpotifyClient()
+
+
+def run_sync(coroutine: Coroutine, timeout: float | None = None) -> Any:
+    """
+    Run a coroutine on the shared event loop of `ASYNC_CLIENT` and wait for its result
+
+    :param coroutine: coroutine to run (e.g. gather(get_album(...), get_artist(...)))
+    :param timeout: seconds to wait for the result (None: no timeout)
+    :return: result of the coroutine
+    """
+
+    return ASYNC_CLIENT.run_sync(coroutine, timeout=timeout)
+
+
+async def gather(*coroutines: Coroutine) -> list:
+    """
+    Run coroutines concurrently (asyncio.gather, usable with run_sync())
+
+    :param coroutines: coroutines to run
+    :return: List of the results in the same order as the coroutines
+    """
+
+    return list(await asyncio.gather(*coroutines))
+
+
+def _async_version(function: Callable) -> Callable[..., Coroutine]:
+    """
+    Create the coroutine function of a blocking API function
+
+    :param function: function of spotify_web_api.py
+    :return: coroutine function with the same name, signature and docstring
+    """
+
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        return await ASYNC_CLIENT.call(function, *args, **kwargs)
+
+    wrapper.__module__ = __name__
+    return wrapper
+
+
+# token handling and the raw request function stay synchronous
+_EXCLUDED_FUNCTIONS = ("request_regular_token", "refresh_access_token", "request_extended_token", "api_request_data")
+
+for _name, _function in inspect.getmembers(spotify, inspect.isfunction):
+    if _function.__module__ == spotify.__name__ and not _name.startswith("_") and _name not in _EXCLUDED_FUNCTIONS:
+        globals()[_name] = _async_version(_function)
+
+
+if __name__ == '__main__':
+    """"""
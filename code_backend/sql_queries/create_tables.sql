@@ -1,3 +1,5 @@
+-- tables of schema version 0, every later change of the schema is a migration (migrations/, MAIN_MIGRATIONS in database_access.py)
+
 CREATE TABLE IF NOT EXISTS albums (
     album_id TEXT PRIMARY KEY,
     album_name TEXT,
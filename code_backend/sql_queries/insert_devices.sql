@@ -1,2 +1,2 @@
-INSERT OR IGNORE INTO devices (device_id, device_name, device_type, is_active, is_private_session, is_restricted, supports_volume, volume_percent, device_json)
-VALUES (:device_id, :device_name, :device_type, :is_active, :is_private_session, :is_restricted, :supports_volume, :volume_percent, :device_json);
\ No newline at end of file
+INSERT OR IGNORE INTO devices (device_id, device_name, device_type, is_active, is_private_session, is_restricted, supports_volume, volume_percent, device_json, content_hash)
+VALUES (:device_id, :device_name, :device_type, :is_active, :is_private_session, :is_restricted, :supports_volume, :volume_percent, :device_json, :content_hash);
\ No newline at end of file
@@ -1,2 +1,2 @@
-INSERT OR IGNORE INTO playlists (playlist_id, playlist_name, playlist_uri, playlist_url, playlist_image, genre_names, total_duration, track_count, owner_id, track_ids, popularity, blacklisted, playlist_json)
-VALUES (:playlist_id, :playlist_name, :playlist_uri, :playlist_url, :playlist_image, :genre_names, :total_duration, :track_count, :owner_id, :track_ids, :popularity, :blacklisted, :playlist_json);
\ No newline at end of file
+INSERT OR IGNORE INTO playlists (playlist_id, playlist_name, playlist_uri, playlist_url, playlist_image, genre_names, total_duration, track_count, owner_id, track_ids, popularity, blacklisted, playlist_json, content_hash)
+VALUES (:playlist_id, :playlist_name, :playlist_uri, :playlist_url, :playlist_image, :genre_names, :total_duration, :track_count, :owner_id, :track_ids, :popularity, :blacklisted, :playlist_json, :content_hash);
\ No newline at end of file
@@ -1,2 +1,2 @@
-INSERT OR IGNORE INTO tracks (track_id, track_name, track_uri, track_url, track_image, genre_names, track_duration, artist_ids, album_id, playlist_ids, popularity, blacklisted, track_json)
-VALUES (:track_id, :track_name, :track_uri, :track_url, :track_image, :genre_names, :track_duration, :artist_ids, :album_id, :playlist_ids, :popularity, :blacklisted, :track_json);
\ No newline at end of file
+INSERT OR IGNORE INTO tracks (track_id, track_name, track_uri, track_url, track_image, genre_names, track_duration, artist_ids, album_id, playlist_ids, popularity, blacklisted, track_json, release_date, explicit, spotify_popularity, content_hash)
+VALUES (:track_id, :track_name, :track_uri, :track_url, :track_image, :genre_names, :track_duration, :artist_ids, :album_id, :playlist_ids, :popularity, :blacklisted, :track_json, :release_date, :explicit, :spotify_popularity, :content_hash);
\ No newline at end of file
@@ -1,2 +1,2 @@
-INSERT OR IGNORE INTO users (user_id, user_name, user_uri, user_url, user_image, follower, playlist_ids, top_track_ids, top_artist_ids, top_genre_names, popularity, blacklisted, user_json)
-VALUES (:user_id, :user_name, :user_uri, :user_url, :user_image, :follower, :playlist_ids, :top_track_ids, :top_artist_ids, :top_genre_names, :popularity, :blacklisted, :user_json);
\ No newline at end of file
+INSERT OR IGNORE INTO users (user_id, user_name, user_uri, user_url, user_image, follower, playlist_ids, top_track_ids, top_artist_ids, top_genre_names, popularity, blacklisted, user_json, content_hash)
+VALUES (:user_id, :user_name, :user_uri, :user_url, :user_image, :follower, :playlist_ids, :top_track_ids, :top_artist_ids, :top_genre_names, :popularity, :blacklisted, :user_json, :content_hash);
\ No newline at end of file
@@ -0,0 +1,93 @@
+-- relation tables: one row per entry of the id lists (e.g. albums.track_ids -> album_tracks), position keeps the list order
+
+CREATE TABLE IF NOT EXISTS album_artists (
+    album_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist_id TEXT NOT NULL,
+    PRIMARY KEY (album_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_album_artists_artist_id ON album_artists (artist_id);
+
+CREATE TABLE IF NOT EXISTS album_tracks (
+    album_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (album_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_album_tracks_track_id ON album_tracks (track_id);
+
+CREATE TABLE IF NOT EXISTS artist_albums (
+    artist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    album_id TEXT NOT NULL,
+    PRIMARY KEY (artist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artist_albums_album_id ON artist_albums (album_id);
+
+CREATE TABLE IF NOT EXISTS artist_playlists (
+    artist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    playlist_id TEXT NOT NULL,
+    PRIMARY KEY (artist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artist_playlists_playlist_id ON artist_playlists (playlist_id);
+
+CREATE TABLE IF NOT EXISTS artist_top_tracks (
+    artist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (artist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artist_top_tracks_track_id ON artist_top_tracks (track_id);
+
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (playlist_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_playlist_tracks_track_id ON playlist_tracks (track_id);
+
+CREATE TABLE IF NOT EXISTS track_artists (
+    track_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist_id TEXT NOT NULL,
+    PRIMARY KEY (track_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_track_artists_artist_id ON track_artists (artist_id);
+
+CREATE TABLE IF NOT EXISTS track_playlists (
+    track_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    playlist_id TEXT NOT NULL,
+    PRIMARY KEY (track_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_track_playlists_playlist_id ON track_playlists (playlist_id);
+
+CREATE TABLE IF NOT EXISTS user_playlists (
+    user_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    playlist_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_playlists_playlist_id ON user_playlists (playlist_id);
+
+CREATE TABLE IF NOT EXISTS user_top_artists (
+    user_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_top_artists_artist_id ON user_top_artists (artist_id);
+
+CREATE TABLE IF NOT EXISTS user_top_tracks (
+    user_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    track_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_user_top_tracks_track_id ON user_top_tracks (track_id);
+
+-- single id references
+CREATE INDEX IF NOT EXISTS idx_tracks_album_id ON tracks (album_id);
+CREATE INDEX IF NOT EXISTS idx_playlists_owner_id ON playlists (owner_id);
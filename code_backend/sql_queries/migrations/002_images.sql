@@ -0,0 +1,7 @@
+-- content-addressed cover images: items keep the hash (sha256 of the bytes) in their *_image column
+CREATE TABLE IF NOT EXISTS images (
+    image_hash TEXT PRIMARY KEY,
+    image_format TEXT NOT NULL,
+    byte_size INTEGER NOT NULL,
+    image_bytes BLOB NOT NULL
+);
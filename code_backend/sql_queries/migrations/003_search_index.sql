@@ -0,0 +1,94 @@
+-- full-text search index (FTS5, rowid = rowid of the item), kept in sync by the triggers below
+CREATE VIRTUAL TABLE IF NOT EXISTS album_search USING fts5(album_name, artist_names, genre_names, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3');
+CREATE VIRTUAL TABLE IF NOT EXISTS artist_search USING fts5(artist_name, genre_names, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3');
+CREATE VIRTUAL TABLE IF NOT EXISTS playlist_search USING fts5(playlist_name, genre_names, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3');
+CREATE VIRTUAL TABLE IF NOT EXISTS track_search USING fts5(track_name, artist_names, genre_names, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3');
+
+CREATE TRIGGER IF NOT EXISTS albums_search_insert AFTER INSERT ON albums BEGIN
+    INSERT INTO album_search (rowid, album_name, artist_names, genre_names) VALUES (
+        new.rowid,
+        new.album_name,
+        (SELECT group_concat(artists.artist_name, ' ') FROM album_artists JOIN artists ON artists.artist_id = album_artists.artist_id WHERE album_artists.album_id = new.album_id),
+        new.genre_names
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS albums_search_update AFTER UPDATE OF album_name, genre_names ON albums BEGIN
+    UPDATE album_search SET album_name = new.album_name, genre_names = new.genre_names WHERE rowid = new.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS albums_search_delete AFTER DELETE ON albums BEGIN
+    DELETE FROM album_search WHERE rowid = old.rowid;
+END;
+-- only artists with a stored name change the indexed artist names
+CREATE TRIGGER IF NOT EXISTS album_artists_search_insert AFTER INSERT ON album_artists
+WHEN EXISTS (SELECT 1 FROM artists WHERE artist_id = new.artist_id) BEGIN
+    UPDATE album_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM album_artists JOIN artists ON artists.artist_id = album_artists.artist_id WHERE album_artists.album_id = new.album_id
+    ) WHERE rowid = (SELECT rowid FROM albums WHERE album_id = new.album_id);
+END;
+CREATE TRIGGER IF NOT EXISTS album_artists_search_delete AFTER DELETE ON album_artists
+WHEN EXISTS (SELECT 1 FROM artists WHERE artist_id = old.artist_id) BEGIN
+    UPDATE album_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM album_artists JOIN artists ON artists.artist_id = album_artists.artist_id WHERE album_artists.album_id = old.album_id
+    ) WHERE rowid = (SELECT rowid FROM albums WHERE album_id = old.album_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS artists_search_insert AFTER INSERT ON artists BEGIN
+    INSERT INTO artist_search (rowid, artist_name, genre_names) VALUES (new.rowid, new.artist_name, new.genre_names);
+    -- albums and tracks stored before their artist get its name
+    UPDATE album_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM albums JOIN album_artists ON album_artists.album_id = albums.album_id JOIN artists ON artists.artist_id = album_artists.artist_id WHERE albums.rowid = album_search.rowid
+    ) WHERE rowid IN (SELECT albums.rowid FROM album_artists JOIN albums ON albums.album_id = album_artists.album_id WHERE album_artists.artist_id = new.artist_id);
+    UPDATE track_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM tracks JOIN track_artists ON track_artists.track_id = tracks.track_id JOIN artists ON artists.artist_id = track_artists.artist_id WHERE tracks.rowid = track_search.rowid
+    ) WHERE rowid IN (SELECT tracks.rowid FROM track_artists JOIN tracks ON tracks.track_id = track_artists.track_id WHERE track_artists.artist_id = new.artist_id);
+END;
+CREATE TRIGGER IF NOT EXISTS artists_search_update AFTER UPDATE OF artist_name, genre_names ON artists BEGIN
+    UPDATE artist_search SET artist_name = new.artist_name, genre_names = new.genre_names WHERE rowid = new.rowid;
+    UPDATE album_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM albums JOIN album_artists ON album_artists.album_id = albums.album_id JOIN artists ON artists.artist_id = album_artists.artist_id WHERE albums.rowid = album_search.rowid
+    ) WHERE rowid IN (SELECT albums.rowid FROM album_artists JOIN albums ON albums.album_id = album_artists.album_id WHERE album_artists.artist_id = new.artist_id);
+    UPDATE track_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM tracks JOIN track_artists ON track_artists.track_id = tracks.track_id JOIN artists ON artists.artist_id = track_artists.artist_id WHERE tracks.rowid = track_search.rowid
+    ) WHERE rowid IN (SELECT tracks.rowid FROM track_artists JOIN tracks ON tracks.track_id = track_artists.track_id WHERE track_artists.artist_id = new.artist_id);
+END;
+CREATE TRIGGER IF NOT EXISTS artists_search_delete AFTER DELETE ON artists BEGIN
+    DELETE FROM artist_search WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS playlists_search_insert AFTER INSERT ON playlists BEGIN
+    INSERT INTO playlist_search (rowid, playlist_name, genre_names) VALUES (new.rowid, new.playlist_name, new.genre_names);
+END;
+CREATE TRIGGER IF NOT EXISTS playlists_search_update AFTER UPDATE OF playlist_name, genre_names ON playlists BEGIN
+    UPDATE playlist_search SET playlist_name = new.playlist_name, genre_names = new.genre_names WHERE rowid = new.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS playlists_search_delete AFTER DELETE ON playlists BEGIN
+    DELETE FROM playlist_search WHERE rowid = old.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS tracks_search_insert AFTER INSERT ON tracks BEGIN
+    INSERT INTO track_search (rowid, track_name, artist_names, genre_names) VALUES (
+        new.rowid,
+        new.track_name,
+        (SELECT group_concat(artists.artist_name, ' ') FROM track_artists JOIN artists ON artists.artist_id = track_artists.artist_id WHERE track_artists.track_id = new.track_id),
+        new.genre_names
+    );
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_search_update AFTER UPDATE OF track_name, genre_names ON tracks BEGIN
+    UPDATE track_search SET track_name = new.track_name, genre_names = new.genre_names WHERE rowid = new.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS tracks_search_delete AFTER DELETE ON tracks BEGIN
+    DELETE FROM track_search WHERE rowid = old.rowid;
+END;
+-- only artists with a stored name change the indexed artist names
+CREATE TRIGGER IF NOT EXISTS track_artists_search_insert AFTER INSERT ON track_artists
+WHEN EXISTS (SELECT 1 FROM artists WHERE artist_id = new.artist_id) BEGIN
+    UPDATE track_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM track_artists JOIN artists ON artists.artist_id = track_artists.artist_id WHERE track_artists.track_id = new.track_id
+    ) WHERE rowid = (SELECT rowid FROM tracks WHERE track_id = new.track_id);
+END;
+CREATE TRIGGER IF NOT EXISTS track_artists_search_delete AFTER DELETE ON track_artists
+WHEN EXISTS (SELECT 1 FROM artists WHERE artist_id = old.artist_id) BEGIN
+    UPDATE track_search SET artist_names = (
+        SELECT group_concat(artists.artist_name, ' ') FROM track_artists JOIN artists ON artists.artist_id = track_artists.artist_id WHERE track_artists.track_id = old.track_id
+    ) WHERE rowid = (SELECT rowid FROM tracks WHERE track_id = old.track_id);
+END;
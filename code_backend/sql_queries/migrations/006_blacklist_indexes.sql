@@ -0,0 +1,6 @@
+-- blacklisted items (partial indexes: only the few blacklisted rows are indexed)
+CREATE INDEX IF NOT EXISTS idx_albums_blacklisted ON albums (album_id) WHERE blacklisted = 1;
+CREATE INDEX IF NOT EXISTS idx_artists_blacklisted ON artists (artist_id) WHERE blacklisted = 1;
+CREATE INDEX IF NOT EXISTS idx_playlists_blacklisted ON playlists (playlist_id) WHERE blacklisted = 1;
+CREATE INDEX IF NOT EXISTS idx_tracks_blacklisted ON tracks (track_id) WHERE blacklisted = 1;
+CREATE INDEX IF NOT EXISTS idx_users_blacklisted ON users (user_id) WHERE blacklisted = 1;
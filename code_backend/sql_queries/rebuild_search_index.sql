@@ -0,0 +1,25 @@
+DELETE FROM album_search;
+INSERT INTO album_search (rowid, album_name, artist_names, genre_names)
+SELECT
+    albums.rowid,
+    albums.album_name,
+    (SELECT group_concat(artists.artist_name, ' ') FROM album_artists JOIN artists ON artists.artist_id = album_artists.artist_id WHERE album_artists.album_id = albums.album_id),
+    albums.genre_names
+FROM albums;
+
+DELETE FROM artist_search;
+INSERT INTO artist_search (rowid, artist_name, genre_names)
+SELECT artists.rowid, artists.artist_name, artists.genre_names FROM artists;
+
+DELETE FROM playlist_search;
+INSERT INTO playlist_search (rowid, playlist_name, genre_names)
+SELECT playlists.rowid, playlists.playlist_name, playlists.genre_names FROM playlists;
+
+DELETE FROM track_search;
+INSERT INTO track_search (rowid, track_name, artist_names, genre_names)
+SELECT
+    tracks.rowid,
+    tracks.track_name,
+    (SELECT group_concat(artists.artist_name, ' ') FROM track_artists JOIN artists ON artists.artist_id = track_artists.artist_id WHERE track_artists.track_id = tracks.track_id),
+    tracks.genre_names
+FROM tracks;
@@ -0,0 +1,211 @@
+"""
+    In-memory cache for the access tokens stored in the .env file, refreshing them ahead of expiration in the background
+"""
+
+from code_backend.shared_config import *
+from code_backend.exceptions import InputException, CustomException
+from code_backend.secondary_methods import update_env_key
+
+
+class TokenManager:
+    """
+    Keeps a parsed access token (and its expiration) in memory, so requests don't need to reload and parse the .env file.
+
+    If a `refresh_callback` is given, the token is refreshed `refresh_margin` seconds before it expires by a daemon timer thread (or by the requesting thread if the token already expired). The .env file is only written if the token actually changed.
+    """
+
+    def __init__(self, env_key: str, refresh_callback: Callable[[], Any] | None = None, refresh_margin: int = TOKEN_REFRESH_MARGIN) -> None:
+        """
+        :param env_key: .env key of the token (value in the form of {"access_token": ..., "token_type": ..., "expires": ...})
+        :param refresh_callback: function requesting a new token, which either calls `store_token()` or updates the env key itself (None: token is never refreshed)
+        :param refresh_margin: seconds before expiration the token gets refreshed
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(env_key, str) or not env_key:
+            raise InputException(item_value=env_key, valid_values="any non-empty string", valid_types=str)
+
+        if refresh_callback is not None and not callable(refresh_callback):
+            raise InputException(item_value=refresh_callback, valid_values="function", valid_types=(Callable, None))
+
+        if not isinstance(refresh_margin, int) or refresh_margin < 0:
+            raise InputException(item_value=refresh_margin, valid_values="0 <= refresh_margin", valid_types=int)
+
+        self.env_key: str = env_key
+        self.refresh_margin: int = refresh_margin
+        self._refresh_callback = refresh_callback
+
+        self._token: dict | None = None
+        self._authorization: str = ""
+        self._lock = threading.RLock()
+        self._refresh_timer: threading.Timer | None = None
+
+    def _load(self) -> None:
+        """
+        Load the token from the environment, the .env file is only read if the key is not part of the environment yet (needs to be called while holding the lock)
+
+        :raises CustomException: If Exception occurs
+        """
+
+        if os.getenv(self.env_key) is None:
+            load_dotenv(find_dotenv())
+
+        try:
+            self._set_token(json.loads(os.getenv(self.env_key)))
+
+        except Exception as error:
+            raise CustomException(error_message=error, more_infos=f"Exception occurred while loading token '{self.env_key}'.")
+
+    def _set_token(self, token: dict) -> None:
+        """
+        Replace the cached token and reschedule the background refresh (needs to be called while holding the lock)
+
+        :param token: new token in the form of {"access_token": ..., "token_type": ..., "expires": ...}
+        """
+
+        self._token = token
+        self._authorization = f"{token.get('token_type', 'Bearer')} {token['access_token']}"
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        """
+        (Re)start the daemon timer refreshing the token `refresh_margin` seconds before expiration (needs to be called while holding the lock)
+        """
+
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+        expires_in = self.expires_in
+        if self._refresh_callback is None or expires_in == 0:
+            # expired tokens are refreshed by the next requesting thread
+            return
+
+        # tokens with a shorter lifetime than refresh_margin are refreshed when they expire
+        delay = expires_in - self.refresh_margin if expires_in > self.refresh_margin else expires_in
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self) -> None:
+        """
+        Target of the refresh timer, errors are printed, the next request refreshes the token itself if it expired meanwhile
+        """
+
+        try:
+            self.refresh()
+
+        except Exception as error:
+            print(f"{CORANGE}Background refresh of token '{self.env_key}' failed:{TEXTCOLOR} {error}")
+
+    @property
+    def token(self) -> dict:
+        """
+        Get the cached token (loaded on first access)
+
+        :return: Dict in the form of {"access_token": ..., "token_type": ..., "expires": ...}
+        :raises CustomException: If Exception occurs
+        """
+
+        if self._token is None:
+            with self._lock:
+                if self._token is None:
+                    self._load()
+
+        return self._token
+
+    @property
+    def expires_in(self) -> int:
+        """
+        Get the time till the token expires
+
+        :return: seconds till expiration (0 if the token did expire)
+        :raises CustomException: If Exception occurs
+        """
+
+        return max(0, self.token.get("expires", 0) - int(time.time()))
+
+    def _ensure_valid(self) -> None:
+        """
+        Refresh the token in the requesting thread if it already expired (a valid token is returned without locking, even while a background refresh is running)
+
+        :raises CustomException: If Exception occurs
+        """
+
+        if self.expires_in == 0 and self._refresh_callback is not None:
+            with self._lock:
+                # another thread might have refreshed the token while waiting for the lock
+                if self.expires_in == 0:
+                    self.refresh()
+
+    @property
+    def authorization(self) -> str:
+        """
+        Get the value of the Authorization header, refreshing the token first if it expired
+
+        :return: string in the form of "Bearer <access_token>"
+        :raises CustomException: If Exception occurs
+        """
+
+        self._ensure_valid()
+        return self._authorization
+
+    @property
+    def access_token(self) -> str:
+        """
+        Get the access token, refreshing it first if it expired
+
+        :return: access token
+        :raises CustomException: If Exception occurs
+        """
+
+        self._ensure_valid()
+        return self._token["access_token"]
+
+    def refresh(self) -> None:
+        """
+        Request a new token using the refresh callback. Callbacks not calling `store_token()` need to update the env key, which is reloaded afterward.
+
+        :raises CustomException: If Exception occurs
+        """
+
+        if self._refresh_callback is None:
+            raise CustomException(error_message="No refresh callback", more_infos=f"Token '{self.env_key}' can't be refreshed.")
+
+        with self._lock:
+            self._refresh_callback()
+            self._load()
+
+    def store_token(self, new_token: dict) -> None:
+        """
+        Cache a new token, the .env file is only written if the token changed
+
+        :param new_token: Dict in the form of {"access_token": ..., "token_type": ..., "expires": ...}
+        :raises InputException: if input is invalid
+        """
+
+        if not isinstance(new_token, dict) or "access_token" not in new_token:
+            raise InputException(item_value=new_token, valid_values="{'access_token': ..., 'token_type': ..., 'expires': ...}", valid_types=dict)
+
+        with self._lock:
+            if new_token == self._token:
+                return
+
+            token_string = json.dumps(new_token)
+            if os.getenv(self.env_key) != token_string:
+                update_env_key(self.env_key, token_string)
+            self._set_token(new_token)
+
+    def stop(self) -> None:
+        """
+        Cancel the background refresh
+        """
+
+        with self._lock:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+                self._refresh_timer = None
+
+
+if __name__ == '__main__':
+    """"""